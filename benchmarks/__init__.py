@@ -0,0 +1 @@
+# Benchmarks voor de cutlist -> G-code pijplijn (python -m benchmarks.run)
@@ -0,0 +1,96 @@
+"""
+Benchmark: gevectoriseerde extract_holes t.o.v. de oude groupby/iterrows-versie.
+
+    python benchmarks/bench_extract_holes.py --profiles 10000 --holes 6
+
+Controleert ook dat beide versies dezelfde uitvoer geven (unieke profielnamen).
+"""
+from __future__ import annotations
+import argparse, json, os, sys, time
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [_ROOT, os.path.join(_ROOT, "src")]
+from benchmarks.synth import make_cutlist_df  # noqa: E402
+from cncapp.holes import extract_holes, HOLE_RE, HEADER_COLS_CANON, _find_col, _std_side_label  # noqa: E402
+
+def _extract_holes_reference(df: pd.DataFrame) -> pd.DataFrame:
+    """De oorspronkelijke implementatie (groupby op ffilled headers + iterrows + regex per cel)."""
+    name_col = _find_col(df, HEADER_COLS_CANON["name"])
+    type_col = _find_col(df, HEADER_COLS_CANON["type"])
+    orient_col = _find_col(df, HEADER_COLS_CANON["orient"])
+    len_col = _find_col(df, HEADER_COLS_CANON["lenmm"])
+    qty_col = _find_col(df, HEADER_COLS_CANON["qty"])
+    side_col = _find_col(df, HEADER_COLS_CANON["side"])
+    side_idx = list(df.columns).index(side_col)
+    possible_hole_cols = list(df.columns)[side_idx+1:]
+    work = df.copy()
+    for c in [name_col, type_col, orient_col, len_col, qty_col]:
+        if c:
+            work[c] = work[c].ffill()
+    if qty_col:
+        work[qty_col] = pd.to_numeric(work[qty_col], errors="coerce").fillna(1).astype(int)
+    group_cols = [c for c in [name_col, len_col, type_col, orient_col, qty_col] if c]
+    records = []
+    for keys, g in work.groupby(group_cols, dropna=False, sort=False):
+        holes_by_side: Dict[str, List[Tuple[float, float]]] = {}
+        for _, row in g.iterrows():
+            side_val = str(row.get(side_col, "")).strip()
+            if side_val == "" or side_val.lower().startswith("nan"):
+                continue
+            parsed = []
+            for c in possible_hole_cols:
+                v = row.get(c, None)
+                if pd.isna(v):
+                    continue
+                m = HOLE_RE.match(str(v))
+                if m:
+                    parsed.append((float(m.group(1)), float(m.group(2))))
+            if parsed:
+                holes_by_side.setdefault(_std_side_label(side_val), []).extend(parsed)
+        if not holes_by_side:
+            continue
+        key_map = dict(zip(group_cols, keys))
+        records.append({
+            "profile_name": key_map.get(name_col),
+            "length_mm": float(key_map.get(len_col)),
+            "qty": int(key_map.get(qty_col)),
+            "holes_json": json.dumps({s: [{"x": x, "d": d} for x, d in lst] for s, lst in holes_by_side.items()}),
+        })
+    out = pd.DataFrame.from_records(records)
+    return out.sort_values(by=["profile_name"], kind="stable").reset_index(drop=True)
+
+def _timed(fn, *args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--profiles", type=int, default=10000)
+    ap.add_argument("--holes", type=int, default=6, help="gaten per zijde-rij")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    df = make_cutlist_df(args.profiles, args.holes)
+    new = extract_holes(df)
+    ref = _extract_holes_reference(df)
+    cols = ["profile_name", "length_mm", "qty", "holes_json"]
+    assert new[cols].equals(ref[cols]), "uitvoer wijkt af van de referentie-implementatie"
+
+    t_ref = _timed(_extract_holes_reference, df, repeat=args.repeat)
+    t_new = _timed(extract_holes, df, repeat=args.repeat)
+    t_model = _timed(lambda d: extract_holes(d, serialize=False), df, repeat=args.repeat)
+    holes = sum(p.hole_count for p in new["profile"])
+    print(f"{args.profiles} profielen, {len(df)} rijen, {holes} gaten")
+    print(f"  referentie (groupby/iterrows): {t_ref:8.3f} s")
+    print(f"  gevectoriseerd               : {t_new:8.3f} s   ({t_ref / t_new:.1f}x sneller)")
+    print(f"  gevectoriseerd, zonder JSON  : {t_model:8.3f} s   ({t_ref / t_model:.1f}x sneller)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: Excel-inlezen via read_cutlist + extract_holes (hele sheet als DataFrame)
+t.o.v. de gestreamde extract_holes_stream (openpyxl read-only, één profiel tegelijk).
+
+    python benchmarks/bench_ingest.py --profiles 5000
+
+Meet wandkloktijd en piekgeheugen (tracemalloc) per variant.
+"""
+from __future__ import annotations
+import argparse, os, sys, tempfile, time, tracemalloc
+
+_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [_ROOT, os.path.join(_ROOT, "src")]
+from benchmarks.synth import make_cutlist_df  # noqa: E402
+from cncapp.excel_import import read_cutlist  # noqa: E402
+from cncapp.holes import extract_holes, extract_holes_stream  # noqa: E402
+
+def _measure(fn, *args):
+    # tijd en geheugen apart meten: tracemalloc vertraagt de run flink
+    t0 = time.perf_counter()
+    out = fn(*args)
+    dt = time.perf_counter() - t0
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, dt, peak / 1e6
+
+def _key(p):
+    # orientatie is NaN (DataFrame-pad) of None (stream) voor lege cellen; niet vergelijken
+    return (p.name, p.ptype, p.length, p.qty, p.sides)
+
+def _via_dataframe(path: str):
+    return extract_holes(read_cutlist(path)["df"], serialize=False)
+
+def _via_stream(path: str):
+    return extract_holes_stream(path, serialize=False)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--profiles", type=int, default=5000)
+    ap.add_argument("--holes", type=int, default=6)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "cutlist.xlsx")
+        df = make_cutlist_df(args.profiles, args.holes)
+        df.to_excel(path, index=False)
+        print(f"{args.profiles} profielen, {len(df)} rijen, {os.path.getsize(path) / 1e6:.1f} MB xlsx")
+
+        ref, t_ref, m_ref = _measure(_via_dataframe, path)
+        new, t_new, m_new = _measure(_via_stream, path)
+        assert len(ref) == len(new)
+        assert [_key(p) for p in ref["profile"]] == [_key(p) for p in new["profile"]]
+        print(f"  read_cutlist + extract_holes : {t_ref:8.3f} s   piek {m_ref:8.1f} MB")
+        print(f"  extract_holes_stream         : {t_new:8.3f} s   piek {m_new:8.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Benchmark-suite: tijd per pijplijnstap op synthetische cutlists.
+
+    python -m benchmarks.run                         # 100, 10k en 100k profielen
+    python -m benchmarks.run --sizes 100,10000       # snelle variant
+    python -m benchmarks.run --compare <commit|pad> --max-regression 1.25
+    python -m benchmarks.run --sizes "" --startup-target 0.3   # alleen opstarttijd
+
+Werkt offline: werkboeken worden lokaal gegenereerd (en hergebruikt) in --data-dir.
+Resultaten gaan naar benchmarks/results/<commit>.json; met --compare volgt een
+vergelijking per stap en met --max-regression een exitcode 1 bij een regressie
+(bruikbaar als release-poort). De opstarttijd van main.py (--help en het snelle
+--model-pad) wordt altijd gemeten; boven --startup-target volgt ook exitcode 1.
+"""
+from __future__ import annotations
+import argparse, glob, json, os, platform, subprocess, sys, tempfile, time
+from typing import Dict, List
+
+_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [_ROOT, os.path.join(_ROOT, "src")]
+
+import pandas as pd  # noqa: E402
+from tabulate import tabulate  # noqa: E402
+
+from benchmarks.synth import write_cutlist  # noqa: E402
+from cncapp.clean import _profiles_with_holes  # noqa: E402
+from cncapp.excel_import import read_cutlist  # noqa: E402
+from cncapp.gcode_gen import estimate_cycle_saving, generate_all_profiles  # noqa: E402
+from cncapp.holes import extract_holes, extract_holes_stream  # noqa: E402
+from cncapp.instrument import Instrument  # noqa: E402
+from cncapp.model import save_model  # noqa: E402
+from cncapp.structure import expand_holes_columns, flatten_to_long  # noqa: E402
+from cncapp.validate import validate_holes  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_SIZES = "100,10000,100000"
+# Stappen korter dan dit (s) tellen niet mee voor de regressiepoort (te veel ruis)
+MIN_GATE_S = 0.05
+# Opstarttijd van main.py: beste van STARTUP_RUNS processtarts moet hieronder blijven (s)
+STARTUP_TARGET_S = 0.3
+STARTUP_RUNS = 5
+STARTUP_PROFILES = 100
+MAIN = os.path.join(_ROOT, "src", "main.py")
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=_ROOT,
+                             capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=_ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "onbekend"
+
+def _workbook(data_dir: str, n: int, holes: int, seed: int) -> str:
+    path = os.path.join(data_dir, f"cutlist_{n}_{holes}_{seed}.xlsx")
+    if not os.path.exists(path):
+        t0 = time.perf_counter()
+        write_cutlist(path, n, holes, seed)
+        print(f"[INFO] werkboek {n} profielen gegenereerd in {time.perf_counter() - t0:.1f} s", file=sys.stderr)
+    return path
+
+def _count_lines(path: str) -> int:
+    with open(path, "rb") as f:
+        return sum(1 for _ in f)
+
+def run_size(path: str, out_dir: str) -> List[Dict]:
+    """Alle stappen voor één werkboek; geeft de Instrument-stappen terug."""
+    inst = Instrument(enabled=True)
+    with inst.stage("read_cutlist") as st:
+        df_raw = read_cutlist(path)["df"]
+        st["rows"] = len(df_raw)
+    with inst.stage("clean._profiles_with_holes") as st:
+        st["rows"] = int(_profiles_with_holes(df_raw).sum())
+    with inst.stage("extract_holes") as st:
+        dfh = extract_holes(df_raw, serialize=False)
+        st["profiles"] = len(dfh)
+        st["holes"] = sum(p.hole_count for p in dfh["profile"])
+    with inst.stage("extract_holes_stream") as st:
+        st["profiles"] = len(extract_holes_stream(path, serialize=False))
+    with inst.stage("flatten_to_long") as st:
+        dfl = flatten_to_long(dfh)
+        st["rows"] = len(dfl)
+    with inst.stage("validate_holes") as st:
+        st["rows"] = len(validate_holes(dfl))
+    with inst.stage("expand_holes_columns") as st:
+        st["rows"] = len(expand_holes_columns(dfh))
+    with inst.stage("generate_all_profiles(one_file)") as st:
+        tap = generate_all_profiles(dfh, out_dir, one_file=True)
+    inst.stages[-1]["lines"] = _count_lines(tap)
+    with inst.stage("estimate_cycle_saving") as st:
+        st["rows"] = len(estimate_cycle_saving(dfh))
+    return inst.stages
+
+def _startup_time(argv: List[str]) -> Dict:
+    """Beste (wall, cpu) van STARTUP_RUNS starts van main.py in een vers proces."""
+    best = None
+    for _ in range(STARTUP_RUNS):
+        c0, t0 = os.times(), time.perf_counter()
+        subprocess.run([sys.executable, MAIN] + argv, check=True, stdout=subprocess.DEVNULL)
+        wall, c1 = time.perf_counter() - t0, os.times()
+        cpu = (c1.children_user - c0.children_user) + (c1.children_system - c0.children_system)
+        if best is None or wall < best[0]:
+            best = (wall, cpu)
+    return {"wall_s": best[0], "cpu_s": best[1]}
+
+def run_startup(work_dir: str) -> List[Dict]:
+    """Opstarttijd: alleen argparse (--help) en G-code uit een opgeslagen model (--model)."""
+    from benchmarks.synth import make_cutlist_df
+    model = os.path.join(work_dir, "model.json")
+    save_model(extract_holes(make_cutlist_df(STARTUP_PROFILES), serialize=False)["profile"], model)
+    out = os.path.join(work_dir, "out")
+    stages = [dict(stage="startup(--help)", **_startup_time(["--help"]))]
+    # de eerste start schrijft de .tap's; de beste run is dus een ongewijzigde, interactieve herhaling
+    stages.append(dict(stage="startup(--model)", profiles=STARTUP_PROFILES,
+                       **_startup_time(["--model", model, "--export-dir", out])))
+    return stages
+
+def _load_result(ref: str) -> Dict:
+    if os.path.exists(ref):
+        path = ref
+    else:
+        hits = sorted(glob.glob(os.path.join(RESULTS_DIR, f"{ref}*.json")))
+        if not hits:
+            raise SystemExit(f"[FOUT] Geen resultaat gevonden voor {ref!r} in {RESULTS_DIR}")
+        path = hits[-1]
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def compare(base: Dict, cur: Dict, max_regression: float | None) -> bool:
+    """Print een vergelijking per (grootte, stap); False als de poort faalt."""
+    old = {(r["size"], s["stage"]): s["wall_s"] for r in base["runs"] for s in r["stages"]}
+    rows, ok = [], True
+    for r in cur["runs"]:
+        for s in r["stages"]:
+            prev = old.get((r["size"], s["stage"]))
+            if prev is None:
+                continue
+            ratio = s["wall_s"] / prev if prev > 0 else float("inf")
+            flag = ""
+            if max_regression and prev >= MIN_GATE_S and ratio > max_regression:
+                flag, ok = "REGRESSIE", False
+            rows.append([r["size"], s["stage"], prev, s["wall_s"], ratio, flag])
+    print(f"Vergelijking met {base['commit']}:")
+    print(tabulate(rows, headers=["profielen", "stap", "basis_s", "nu_s", "factor", ""],
+                   tablefmt="github", floatfmt=".3f"))
+    return ok
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", default=DEFAULT_SIZES, help=f"aantallen profielen, komma-gescheiden (default {DEFAULT_SIZES})")
+    ap.add_argument("--holes", type=int, default=6, help="max. gaten per zijde-rij")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "cncapp-bench"),
+                    help="map voor gegenereerde werkboeken (hergebruikt tussen runs)")
+    ap.add_argument("--out", default=None, help="resultaatbestand (default benchmarks/results/<commit>.json)")
+    ap.add_argument("--compare", default=None, help="commit-prefix of pad van een eerder resultaat")
+    ap.add_argument("--max-regression", type=float, default=None, help="faal als een stap zoveel keer trager is")
+    ap.add_argument("--startup-target", type=float, default=STARTUP_TARGET_S,
+                    help=f"faal als main.py trager start dan dit (s, default {STARTUP_TARGET_S})")
+    args = ap.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    commit = _git_commit()
+    result = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "holes_per_side": args.holes,
+        "runs": [],
+    }
+    for n in sizes:
+        path = _workbook(args.data_dir, n, args.holes, args.seed)
+        with tempfile.TemporaryDirectory() as out_dir:
+            stages = run_size(path, out_dir)
+        result["runs"].append({"size": n, "stages": stages})
+        print(f"== {n} profielen ==")
+        print(tabulate([[s["stage"], s["wall_s"], s["cpu_s"], s.get("rss_peak_mb"),
+                         s.get("profiles", s.get("rows", s.get("lines")))] for s in stages],
+                       headers=["stap", "wall_s", "cpu_s", "rss_peak_mb", "aantal"],
+                       tablefmt="github", floatfmt=".3f"))
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        startup = run_startup(work_dir)
+    result["runs"].append({"size": "startup", "stages": startup})
+    print("== opstarttijd main.py ==")
+    print(tabulate([[s["stage"], s["wall_s"], s["cpu_s"]] for s in startup],
+                   headers=["stap", "wall_s", "cpu_s"], tablefmt="github", floatfmt=".3f"))
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=1)
+    print(f"[OK] Resultaten: {out}")
+
+    slow = [s for s in startup if s["wall_s"] > args.startup_target]
+    for s in slow:
+        print(f"[FOUT] {s['stage']}: {s['wall_s']:.3f} s > doel {args.startup_target:.3f} s")
+    ok = not slow
+    if args.compare:
+        ok = compare(_load_result(args.compare), result, args.max_regression) and ok
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Synthetische cutlists in de layout van de ERP-export: een headerrij per profiel
+(profiel_naam, profiel_type, orientatie, length_mm, qty) met daaronder
+BOVENKANT/ZIJKANT-subrijen en 'x@d'-cellen in g1..gN.
+"""
+from __future__ import annotations
+import os, random
+from typing import Iterator, List
+
+import pandas as pd
+
+COLUMNS = ["profiel_naam", "profiel_type", "orientatie", "length_mm", "qty", "zijde"]
+TYPES = ["20x20", "20x40", "40x40", "40x80"]
+LENGTHS = [600, 800, 1280, 1760, 2400]
+DIAMETERS = [4.3, 4.3, 4.3, 6.5]
+SIDES = ["BOVENKANT Y10", "BOVENKANT Y30", "ZIJKANT Y10", "ZIJKANT Y20", "ZIJKANT Y30"]
+
+def iter_cutlist_rows(n_profiles: int, holes_per_side: int = 6, seed: int = 1) -> Iterator[List]:
+    """Rijen (lijsten, kolommen = COLUMNS + g1..gN) voor n_profiles profielen."""
+    rnd = random.Random(seed)
+    for i in range(n_profiles):
+        length = rnd.choice(LENGTHS)
+        orient = "staand" if rnd.random() < 0.1 else None
+        yield [f"Profiel {i}", rnd.choice(TYPES), orient, length, rnd.randint(1, 4), None] + [None] * holes_per_side
+        if rnd.random() < 0.05:
+            continue  # profiel zonder gaten (komt in echte lijsten ook voor)
+        for side in SIDES:
+            if rnd.random() < 0.5:
+                continue
+            xs = sorted(round(rnd.uniform(10, length - 10), 1) for _ in range(rnd.randint(1, holes_per_side)))
+            cells = [f"{x}@{rnd.choice(DIAMETERS)}" for x in xs]
+            yield [None, None, None, None, None, side] + cells + [None] * (holes_per_side - len(cells))
+
+def make_cutlist_df(n_profiles: int, holes_per_side: int = 6, seed: int = 1) -> pd.DataFrame:
+    """Ruwe sheet-layout als DataFrame (zoals read_cutlist hem teruggeeft, zonder lege rijen)."""
+    cols = COLUMNS + [f"g{k + 1}" for k in range(holes_per_side)]
+    return pd.DataFrame(list(iter_cutlist_rows(n_profiles, holes_per_side, seed)), columns=cols)
+
+def write_cutlist(path: str, n_profiles: int, holes_per_side: int = 6, seed: int = 1) -> str:
+    """Schrijf een .xlsx (openpyxl write-only: ook 100k profielen zonder alles in geheugen)."""
+    from openpyxl import Workbook
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Blad1")
+    ws.append(COLUMNS + [f"g{k + 1}" for k in range(holes_per_side)])
+    for row in iter_cutlist_rows(n_profiles, holes_per_side, seed):
+        ws.append(row)
+    wb.save(path)
+    return path
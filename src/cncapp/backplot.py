@@ -0,0 +1,381 @@
+from __future__ import annotations
+# Backplot en machinetijd-schatting: .tap (of de emitter-stroom) regel voor regel naspelen
+import re, sys
+from typing import Dict, Iterable, List
+
+from cncapp.config import (
+    RAPID_RATE_X, RAPID_RATE_Y, RAPID_RATE_Z, ACCEL_MM_S2, MAX_FEED, MACHINE_HOME,
+    TOOL_CHANGE_S, STOP_S, SPINDLE_SPINUP_S
+)
+from cncapp.writer import GCodeSink
+from cncapp.tokens import tokens
+COMMENT_RE = re.compile(r"\([^)]*\)|;.*$")
+# Kopregel per profiel zoals _emit_header hem schrijft: '(Profiel 47 - 20x40 L=1280.0 mm)'
+HEADER_RE = re.compile(r"^\((.+?) - [^()]*L=[\d.]+ mm\)$")
+SURFACE_RE = re.compile(r"hoogte=([\d.]+)")
+
+STAT_KEYS = (
+    "rapid_mm", "rapid_s", "cut_mm", "cut_s", "air_cut_mm", "air_cut_s", "dwell_s",
+    "stops", "stop_s", "tool_changes", "tool_change_s", "spinup_s", "drill_cycles", "lines",
+)
+
+def move_seconds(dist: float, rate_mm_min: float, accel: float | None = None) -> float:
+    """Tijd (s) voor een beweging van dist mm met trapeziumprofiel (start en eind in stilstand)."""
+    if dist <= 0.0:
+        return 0.0
+    if accel is None:
+        accel = ACCEL_MM_S2
+    v = rate_mm_min / 60.0
+    if accel <= 0.0:
+        return dist / v
+    if dist >= v * v / accel:
+        return dist / v + v / accel
+    return 2.0 * (dist / accel) ** 0.5  # haalt topsnelheid niet
+
+# gegenereerde G-code herhaalt dezelfde regels heel vaak ('G0 Z42.000', 'G1 Z-1.000 F150')
+_PARSE_CACHE: Dict[str, tuple] = {}
+_PARSE_CACHE_MAX = 200_000
+
+def _parse_line(line: str) -> tuple:
+    """(G-codes, M-codes, {as: waarde}, [(F/R/Q/P, waarde)]) voor één regel, zonder commentaar."""
+    src = line
+    if "(" in line or ";" in line:
+        line = COMMENT_RE.sub("", line)
+    gcodes: List[float] = []
+    mcodes: List[int] = []
+    axes: Dict[str, float] = {}
+    params: List[tuple] = []
+    for letter, val in tokens(line.upper()):
+        if letter == "G":
+            gcodes.append(float(val))
+        elif letter == "M":
+            mcodes.append(int(float(val)))
+        elif letter in "XYZ":
+            axes[letter] = float(val)
+        elif letter in "FRQPL":
+            params.append((letter, float(val)))
+    parsed = (gcodes, mcodes, axes, params)
+    if len(_PARSE_CACHE) >= _PARSE_CACHE_MAX:
+        _PARSE_CACHE.clear()
+    _PARSE_CACHE[src] = parsed
+    return parsed
+
+def _new_stats(name: str) -> Dict:
+    st: Dict = {"name": name}
+    st.update({k: 0 if k in ("stops", "tool_changes", "drill_cycles", "lines") else 0.0 for k in STAT_KEYS})
+    return st
+
+class Backplot(GCodeSink):
+    """
+    Speelt G-code na met modale toestand (G0/G1/G8x, G90/G91, G20/G21, G98/G99, F)
+    en subprogramma's (O-blok .. M99, M98 P.. L..; of LinuxCNC o-woorden)
+    en telt per profiel: ijlgang- en voedingsafstand/-tijd, 'air-cut' (voeding boven
+    het materiaal, als de BEWERKING-commentaarregel de hoogte noemt), dwell,
+    M0-stops, gereedschapswissels en spindel-opstart.
+
+    Als sink te gebruiken (generate_all_profiles(..., sink=Backplot())) of via
+    feed_line()/analyse_file() op bestaande .tap-bestanden. Profielen worden herkend aan
+    de kopregel van _emit_header; een --schedule-job telt als één blok 'JOB'.
+    """
+
+    def __init__(self):
+        self.profiles: List[Dict] = []
+        self.cur = _new_stats("(programma)")
+        self._flushed = False
+        self.pos = list(MACHINE_HOME)
+        self.absolute = True
+        self.scale = 1.0
+        self.motion = 0
+        self.feed = 0.0
+        self.retract_r = True    # G99
+        self.cycle = {"Z": 0.0, "R": 0.0, "Q": 0.0, "P": 0.0}
+        self.cycle_z0 = self.pos[2]
+        self.spindle = False
+        self.surface: float | None = None
+        # subprogramma's: O-blokken worden opgeslagen, M98-aanroepen bij close() nagespeeld
+        self.subs: Dict[int, List[str]] = {}
+        self.calls: List[tuple] = []
+        self._capture: List[str] | None = None
+        self._repeat = 1
+        self._closed = False
+
+    # --- sink-interface ---
+    def append(self, line: str):
+        self.lines_written += 1
+        self.feed_line(line)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._flush()
+        for block, o, n in self.calls:
+            # tijd van de aanroep telt bij het blok waarin M98 stond
+            self.cur, self._flushed = block, True
+            for _ in range(n):
+                for line in self.subs.get(o, ()):
+                    self.feed_line(line)
+        self._flush()
+
+    # --- tijd/afstand ---
+    def _rapid(self, target: List[float]):
+        d = [abs(t - p) for t, p in zip(target, self.pos)]
+        dist = (d[0] ** 2 + d[1] ** 2 + d[2] ** 2) ** 0.5
+        if dist <= 0.0:
+            return
+        # assen bewegen gelijktijdig: de traagste as bepaalt de tijd
+        t = max(move_seconds(d[0], RAPID_RATE_X), move_seconds(d[1], RAPID_RATE_Y), move_seconds(d[2], RAPID_RATE_Z))
+        self.cur["rapid_mm"] += dist
+        self.cur["rapid_s"] += t
+        self.pos = target
+
+    def _cut(self, target: List[float]):
+        d = [t - p for t, p in zip(target, self.pos)]
+        dist = (d[0] ** 2 + d[1] ** 2 + d[2] ** 2) ** 0.5
+        if dist <= 0.0:
+            return
+        f = min(self.feed, MAX_FEED) if self.feed > 0 else MAX_FEED
+        t = move_seconds(dist, f)
+        self.cur["cut_mm"] += dist
+        self.cur["cut_s"] += t
+        if self.surface is not None:
+            z0, z1 = self.pos[2], target[2]
+            hi, lo = max(z0, z1), min(z0, z1)
+            if lo >= self.surface:
+                frac = 1.0
+            elif hi <= self.surface:
+                frac = 0.0
+            else:
+                frac = (hi - self.surface) / (hi - lo)
+            self.cur["air_cut_mm"] += dist * frac
+            self.cur["air_cut_s"] += t * frac
+        self.pos = target
+
+    def _drill_cycle(self, code: int, x: float, y: float):
+        """Eén G81/G82/G83-gat: XY, naar R, boren (G83 in stappen van Q), dwell, terug."""
+        r, z = self.cycle["R"], self.cycle["Z"]
+        self._rapid([x, y, self.pos[2]])
+        self._rapid([x, y, r])
+        if code == 83 and self.cycle["Q"] > 0:
+            depth = r
+            while depth > z:
+                nxt = max(z, depth - self.cycle["Q"])
+                self._rapid([x, y, depth])
+                self._cut([x, y, nxt])
+                depth = nxt
+                if depth > z:
+                    self._rapid([x, y, r])
+        else:
+            self._cut([x, y, z])
+        if code == 82:
+            self.cur["dwell_s"] += self.cycle["P"]
+        self._rapid([x, y, r if self.retract_r else max(r, self.cycle_z0)])
+        self.cur["drill_cycles"] += 1
+
+    # --- parser ---
+    def _flush(self):
+        if self.cur["lines"] and not self._flushed:
+            self.profiles.append(self.cur)
+            self._flushed = True
+
+    def _start(self, name: str):
+        self._flush()
+        self.cur = _new_stats(name)
+        self._flushed = False
+
+    def feed_line(self, raw: str):
+        line = raw.strip()
+        if not line:
+            return
+        if self._capture is not None:
+            if line.upper().startswith("M99") or line.lower().endswith(" endsub"):
+                self._capture = None
+            else:
+                self._capture.append(line)
+            return
+        if line[0] in "Oo":
+            if line[1:].strip().isdigit():
+                self._capture = self.subs.setdefault(int(line[1:]), [])
+                return
+            if self._o_word(line.lower()):
+                return
+        if line[0] == "(":
+            m = HEADER_RE.match(line) if " L=" in line else None
+            if m:
+                self._start(m.group(1))
+            elif line.startswith("(JOB: "):
+                self._start("JOB")
+            elif "hoogte=" in line:
+                m = SURFACE_RE.search(line)
+                if m:
+                    self.surface = float(m.group(1))
+            if line[-1] == ")" and line.count("(") == 1:
+                self.cur["lines"] += 1  # alleen commentaar
+                return
+        self.cur["lines"] += 1
+        parsed = _PARSE_CACHE.get(line)
+        if parsed is None:
+            parsed = _parse_line(line)
+        gcodes, mcodes, axes, params = parsed
+        if not (gcodes or mcodes or axes or params):
+            return
+        if 98 in mcodes:
+            p = dict(params)
+            self.calls.append((self.cur, int(p.get("P", 0)), int(p.get("L", 1))))
+            return
+        for letter, val in params:
+            if letter == "F":
+                self.feed = val * self.scale
+            else:
+                self.cycle[letter] = val * (self.scale if letter != "P" else 1.0)
+        if self.scale != 1.0:
+            axes = {a: v * self.scale for a, v in axes.items()}
+
+        home = dwell = False
+        for gc in gcodes:
+            if gc in (0, 1):
+                self.motion = int(gc)
+            elif gc in (81, 82, 83):
+                if self.motion not in (81, 82, 83):
+                    self.cycle_z0 = self.pos[2]
+                self.motion = int(gc)
+            elif gc == 80:
+                self.motion = 0
+            elif gc == 90:
+                self.absolute = True
+            elif gc == 91:
+                self.absolute = False
+            elif gc == 20:
+                self.scale = 25.4
+            elif gc == 21:
+                self.scale = 1.0
+            elif gc == 98:
+                self.retract_r = False
+            elif gc == 99:
+                self.retract_r = True
+            elif gc == 28:
+                home = True
+            elif gc == 4:
+                dwell = True
+
+        for mc in mcodes:
+            if mc in (0, 1):
+                self.cur["stops"] += 1
+                self.cur["stop_s"] += STOP_S
+            elif mc == 6:
+                self.cur["tool_changes"] += 1
+                self.cur["tool_change_s"] += TOOL_CHANGE_S
+            elif mc in (3, 4):
+                if not self.spindle:
+                    self.cur["spinup_s"] += SPINDLE_SPINUP_S
+                self.spindle = True
+            elif mc in (5, 30, 2):
+                self.spindle = False
+
+        if dwell:
+            self.cur["dwell_s"] += self.cycle["P"]
+            return
+        if home:
+            # G28: genoemde assen (via het tussenpunt, hier altijd 0 incrementeel) naar MACHINE_HOME
+            target = list(self.pos)
+            for i, a in enumerate("XYZ"):
+                if a in axes:
+                    target[i] = MACHINE_HOME[i]
+            self._rapid(target)
+            return
+        if not axes:
+            return
+
+        target = list(self.pos)
+        for i, a in enumerate("XYZ"):
+            if a in axes:
+                target[i] = axes[a] if self.absolute else self.pos[i] + axes[a]
+        if self.motion in (81, 82, 83):
+            if "Z" in axes:
+                self.cycle["Z"] = target[2]
+            if "X" in axes or "Y" in axes or "Z" in axes:
+                self._drill_cycle(self.motion, target[0], target[1])
+        elif self.motion == 1:
+            self._cut(target)
+        else:
+            self._rapid(target)
+
+    def _o_word(self, line: str) -> bool:
+        """LinuxCNC-subroutines (cncapp.post): o100 sub/endsub/call, o<..> repeat [n]."""
+        head, _, rest = line.partition(" ")
+        if rest == "sub" and head[1:].isdigit():
+            self._capture = self.subs.setdefault(int(head[1:]), [])
+        elif rest == "call" and head[1:].isdigit():
+            self.calls.append((self.cur, int(head[1:]), self._repeat))
+        elif rest.startswith("repeat"):
+            self._repeat = int(float(rest[6:].strip(" []") or 1))
+        elif rest == "endrepeat":
+            self._repeat = 1
+        else:
+            return False
+        return True
+
+    # --- rapportage ---
+    def result(self) -> Dict:
+        """{'profiles': [...], 'job': totaal}; total_s per blok = alle tijden opgeteld."""
+        self.close()
+        blocks = self.profiles
+        job = _new_stats("JOB TOTAAL")
+        for b in blocks:
+            b["total_s"] = (b["rapid_s"] + b["cut_s"] + b["dwell_s"] + b["stop_s"]
+                            + b["tool_change_s"] + b["spinup_s"])
+            for k in STAT_KEYS + ("total_s",):
+                job[k] = job.get(k, 0) + b[k]
+        return {"profiles": blocks, "job": job}
+
+def analyse_lines(lines: Iterable[str]) -> Dict:
+    bp = Backplot()
+    for line in lines:
+        bp.feed_line(line)
+    bp.close()
+    return bp.result()
+
+def analyse_file(path: str) -> Dict:
+    """Analyseer een .tap-bestand (gestreamd; ook voor grote gebundelde bestanden)."""
+    with open(path, "r", encoding="ascii", errors="ignore") as f:
+        return analyse_lines(f)
+
+def analyse_files(paths: Iterable[str]) -> Dict:
+    """Meerdere .tap-bestanden (elk met eigen begintoestand) samengevoegd tot één rapport."""
+    profiles: List[Dict] = []
+    for p in paths:
+        profiles.extend(analyse_file(p)["profiles"])
+    job = _new_stats("JOB TOTAAL")
+    job["total_s"] = 0.0
+    for b in profiles:
+        for k in STAT_KEYS + ("total_s",):
+            job[k] += b[k]
+    return {"profiles": profiles, "job": job}
+
+RESULT_COLUMNS = ["name", "total_s", "rapid_mm", "rapid_s", "cut_mm", "cut_s", "air_cut_s",
+                  "dwell_s", "stops", "tool_changes", "drill_cycles"]
+
+def result_rows(result: Dict) -> List[Dict]:
+    """Profielen + totaalregel als lijst dicts (RESULT_COLUMNS); tabulate-klaar zonder pandas."""
+    return [{c: b[c] for c in RESULT_COLUMNS} for b in result["profiles"] + [result["job"]]]
+
+def result_frame(result: Dict):
+    """Profielen + totaalregel als DataFrame (tijden in s, afstanden in mm)."""
+    import pandas as pd
+    return pd.DataFrame(result_rows(result), columns=RESULT_COLUMNS)
+
+def main(argv: List[str] | None = None):
+    import argparse
+    from tabulate import tabulate
+    ap = argparse.ArgumentParser(description="Machinetijd-schatting voor .tap-bestanden")
+    ap.add_argument("files", nargs="+", help=".tap-bestanden")
+    args = ap.parse_args(argv)
+    for path in args.files:
+        res = analyse_file(path)
+        print(f"== {path}")
+        print(tabulate(result_rows(res), headers="keys", tablefmt="github", showindex=False, floatfmt=".1f"))
+        print(f"[INFO] Geschatte machinetijd: {res['job']['total_s'] / 60.0:.1f} min "
+              f"({res['job']['stops']} stops, {res['job']['tool_changes']} gereedschapswissels)")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,155 @@
+from __future__ import annotations
+# Batchmodus: mappen/globs met werkboeken, per sheet verwerken in een procespool
+import os, glob, json, time, traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Tuple
+
+EXCEL_EXT = (".xlsx", ".xlsm")
+
+def _is_workbook(path: str) -> bool:
+    name = os.path.basename(path)
+    # '~$...' = Office-lockbestand van een geopend werkboek
+    return name.lower().endswith(EXCEL_EXT) and not name.startswith("~$")
+
+def discover_sources(patterns: Iterable[str]) -> List[str]:
+    """Werkboeken uit mappen (recursief), globs of losse paden; gesorteerd en uniek."""
+    found: Dict[str, None] = {}
+    for pat in patterns:
+        if os.path.isdir(pat):
+            for root, _, files in os.walk(pat):
+                for f in sorted(files):
+                    p = os.path.join(root, f)
+                    if _is_workbook(p):
+                        found[os.path.normpath(p)] = None
+            continue
+        for p in sorted(glob.glob(pat, recursive=True)) or ([pat] if os.path.exists(pat) else []):
+            if os.path.isfile(p) and _is_workbook(p):
+                found[os.path.normpath(p)] = None
+    return sorted(found)
+
+def list_sheets(path: str) -> List[str]:
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+def _safe(name: str) -> str:
+    return "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in str(name)).strip("._") or "blad"
+
+def _result(job: Dict, **kw) -> Dict:
+    rec = {"file": job["file"], "sheet": job["sheet"], "out": job["out"], "status": "ok",
+           "profiles": 0, "written": 0, "unchanged": 0, "seconds": 0.0, "error": None}
+    rec.update(kw)
+    return rec
+
+def plan_batch(sources: List[str], export_dir: str, all_sheets: bool = False,
+               sheet: str | int | None = 0) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Bouw de lijst (werkboek, sheet, uitvoermap). Uitvoer per bron:
+    <export_dir>/<werkboek>[/<sheet>]. Geeft (jobs, fouten) terug; een werkboek
+    dat niet te openen is, wordt een fout in het rapport i.p.v. een afbreking.
+    """
+    jobs: List[Dict] = []
+    errors: List[Dict] = []
+    used: Dict[str, int] = {}
+    for path in sources:
+        stem = _safe(os.path.splitext(os.path.basename(path))[0])
+        n = used.get(stem, 0)
+        used[stem] = n + 1
+        base = os.path.join(export_dir, stem if n == 0 else f"{stem}_{n + 1}")
+        if not all_sheets:
+            jobs.append({"file": path, "sheet": sheet, "out": base})
+            continue
+        try:
+            names = list_sheets(path)
+        except Exception as exc:
+            errors.append(_result({"file": path, "sheet": None, "out": base}, status="fout",
+                                  error=f"{type(exc).__name__}: {exc}"))
+            continue
+        for name in names:
+            # bladen zonder cutlist-kop (notities, tekeningen) worden overgeslagen, geen fout
+            jobs.append({"file": path, "sheet": name, "out": os.path.join(base, _safe(name)), "optional": True})
+    return jobs, errors
+
+def process_job(job: Dict) -> Dict:
+    """Eén werkboek/sheet: inlezen, G-code genereren. Fouten komen in het resultaat."""
+    from cncapp.excel_import import HeaderNotFound
+    from cncapp.holes import extract_holes_stream
+    from cncapp.incremental import generate_incremental
+
+    opts = job.get("options", {})
+    rec = _result(job)
+    t0 = time.perf_counter()
+    try:
+        dfh = extract_holes_stream(job["file"], sheet_name=job["sheet"], serialize=False,
+                                   cache=opts.get("cache", True))
+        rec["profiles"] = len(dfh)
+        if dfh.empty:
+            rec["status"] = "leeg"
+        else:
+            report = generate_incremental(dfh, output_dir=job["out"], one_file=opts.get("one_file", False),
+                                          schedule=opts.get("schedule", False), workers=1,
+                                          force=opts.get("force", False),
+                                          subprograms=opts.get("subprograms", False),
+                                          dialect=opts.get("dialect"), max_lines=opts.get("max_lines"),
+                                          max_bytes=opts.get("max_bytes"))
+            rec["written"] = len(report["added"]) + len(report["changed"])
+            rec["unchanged"] = len(report["unchanged"])
+    except HeaderNotFound as exc:
+        rec["status"] = "overgeslagen" if job.get("optional") else "fout"
+        rec["error"] = str(exc)
+    except Exception as exc:
+        rec["status"] = "fout"
+        rec["error"] = f"{type(exc).__name__}: {exc}"
+        rec["traceback"] = traceback.format_exc(limit=3)
+    rec["seconds"] = time.perf_counter() - t0
+    return rec
+
+def run_batch(jobs: List[Dict], workers: int | None = None, options: Dict | None = None,
+              progress=None) -> List[Dict]:
+    """
+    Verwerk alle jobs; workers > 1 gebruikt een ProcessPoolExecutor (imports één
+    keer per proces i.p.v. per sheet). Resultaten in dezelfde volgorde als jobs.
+    progress: optionele callback(rec) per afgeronde job.
+    """
+    from cncapp.gcode_gen import _resolve_workers
+
+    jobs = [dict(j, options=options or {}) for j in jobs]
+    if not jobs:
+        return []
+    n = min(_resolve_workers(workers), max(1, len(jobs)))
+    results: List[Dict | None] = [None] * len(jobs)
+    if n <= 1:
+        for i, j in enumerate(jobs):
+            results[i] = process_job(j)
+            if progress:
+                progress(results[i])
+        return results
+    with ProcessPoolExecutor(max_workers=n) as ex:
+        futs = {ex.submit(process_job, j): i for i, j in enumerate(jobs)}
+        for fut in as_completed(futs):
+            i = futs[fut]
+            try:
+                results[i] = fut.result()
+            except Exception as exc:  # bv. een gecrasht werkproces
+                results[i] = _result(jobs[i], status="fout", error=f"{type(exc).__name__}: {exc}")
+            if progress:
+                progress(results[i])
+    return results
+
+def write_report(results: List[Dict], export_dir: str) -> str:
+    path = os.path.join(export_dir, "batch_report.json")
+    os.makedirs(export_dir, exist_ok=True)
+    summary = {
+        "jobs": len(results),
+        "ok": sum(r["status"] == "ok" for r in results),
+        "leeg": sum(r["status"] == "leeg" for r in results),
+        "overgeslagen": sum(r["status"] == "overgeslagen" for r in results),
+        "fout": sum(r["status"] == "fout" for r in results),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=1, default=str)
+    return path
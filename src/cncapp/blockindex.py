@@ -0,0 +1,146 @@
+from __future__ import annotations
+# Blokindex: profielnaam -> rijbereik in de sheet, voor --only (enkele profielen opnieuw maken)
+import os, json, hashlib, pickle, tempfile
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Tuple
+
+from cncapp.cache import cache_dir, code_version, file_digest
+
+if TYPE_CHECKING:
+    from cncapp.excel_import import CutlistBlock
+
+INDEX_VERSION = 1
+
+# Een xlsx is een zip met XML: een rij halverwege de sheet lezen kost evenveel als
+# alles ervoor parsen. Daarom bewaart de index naast het rijbereik ook het ruwe blok
+# (gepickeld in <sleutel>.blocks, positie + lengte in de index). Een geldige index
+# leest dus alleen de gevraagde blokken, hoe lang de cutlist ook is.
+
+def _key(path: str, sheet_name) -> str:
+    h = hashlib.sha256()
+    for part in (os.path.abspath(path), repr(sheet_name), code_version()):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+def _paths(path: str, sheet_name) -> Tuple[str, str]:
+    base = os.path.join(cache_dir(), f"index_{_key(path, sheet_name)}")
+    return base + ".json", base + ".blocks"
+
+def _stat(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+def _replace(target: str, write) -> None:
+    """Atomair schrijven: write(f) naar een tijdelijk bestand, daarna hernoemen."""
+    fd, tmp = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=os.path.dirname(target))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def build_index(path: str, sheet_name: str | int | None = 0) -> Dict:
+    """
+    Lees de sheet één keer volledig (streaming) en bewaar per profielblok het
+    rijbereik en het ruwe blok. Dubbele namen krijgen elk een eigen item.
+    """
+    from cncapp.excel_import import iter_profile_blocks
+
+    idx_path, data_path = _paths(path, sheet_name)
+    os.makedirs(cache_dir(), exist_ok=True)
+    mtime, size = _stat(path)
+    info: Dict = {}
+    blocks: Dict[str, List[List[int]]] = {}
+
+    def _write(f):
+        for block in iter_profile_blocks(path, sheet_name, info):
+            data = pickle.dumps(block, protocol=pickle.HIGHEST_PROTOCOL)
+            blocks.setdefault(str(block.header.get("name")), []).append(
+                [block.span[0], block.span[1], f.tell(), len(data)])
+            f.write(data)
+
+    _replace(data_path, _write)
+    index = {"version": INDEX_VERSION, "source": os.path.abspath(path), "sheet_name": info.get("sheet_name"),
+             "mtime_ns": mtime, "size": size, "digest": file_digest(path), "blocks": blocks}
+    _replace(idx_path, lambda f: f.write(json.dumps(index).encode("utf-8")))
+    return index
+
+def load_index(path: str, sheet_name: str | int | None = 0) -> Dict | None:
+    """
+    Index voor (werkboek, sheet), of None als die ontbreekt of verouderd is.
+    Gelijke mtime en grootte: geldig zonder het bestand te lezen. Anders beslist
+    de inhoudshash (bv. opnieuw opgeslagen zonder wijziging); dan worden mtime en
+    grootte bijgewerkt.
+    """
+    idx_path, data_path = _paths(path, sheet_name)
+    try:
+        with open(idx_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        stat = _stat(path)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != INDEX_VERSION or not os.path.exists(data_path):
+        return None
+    if (index["mtime_ns"], index["size"]) == stat:
+        return index
+    if index.get("digest") != file_digest(path):
+        return None
+    index["mtime_ns"], index["size"] = stat
+    try:
+        _replace(idx_path, lambda f: f.write(json.dumps(index).encode("utf-8")))
+    except OSError:
+        pass  # index blijft bruikbaar; volgende keer opnieuw de hash
+    return index
+
+def match_names(names: Iterable[str], patterns: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """
+    Namen die op minstens één patroon passen (fnmatch: '*', '?', '[..]';
+    hoofdlettergevoelig), in de volgorde van names, plus de patronen zonder treffer.
+    """
+    patterns = list(patterns)
+    hit = {p: False for p in patterns}
+    out: List[str] = []
+    for name in names:
+        ok = False
+        for p in patterns:
+            if fnmatchcase(name, p):
+                hit[p] = ok = True
+        if ok:
+            out.append(name)
+    return out, [p for p in patterns if not hit[p]]
+
+def read_blocks(path: str, sheet_name, index: Dict, names: Iterable[str]) -> Iterator[CutlistBlock]:
+    """De bewaarde blokken van names, in sheetvolgorde (alleen die bytes worden gelezen)."""
+    _, data_path = _paths(path, sheet_name)
+    entries = sorted(e for n in set(names) for e in index["blocks"].get(n, []))
+    with open(data_path, "rb") as f:
+        for _, _, offset, length in entries:
+            f.seek(offset)
+            yield pickle.loads(f.read(length))
+
+def all_blocks(path: str, sheet_name: str | int | None = 0) -> Iterator[CutlistBlock]:
+    """Alle profielblokken (ook zonder gaten) uit de index; bouwt die zo nodig eerst."""
+    index = load_index(path, sheet_name) or build_index(path, sheet_name)
+    return read_blocks(path, sheet_name, index, index["blocks"])
+
+def select_blocks(path: str, sheet_name: str | int | None, patterns: Iterable[str],
+                  info: Dict | None = None) -> Iterator[CutlistBlock]:
+    """
+    Profielblokken waarvan de naam op een van de patronen past. Bouwt de index als
+    die ontbreekt of niet meer bij het werkboek hoort.
+    info: optionele dict; krijgt sheet_name, rebuilt (bool), unmatched (patronen
+    zonder treffer) en spans ({naam: [(eerste, laatste rij), ...]}).
+    """
+    index = load_index(path, sheet_name)
+    rebuilt = index is None
+    if rebuilt:
+        index = build_index(path, sheet_name)
+    names, unmatched = match_names(index["blocks"], patterns)
+    if info is not None:
+        info.update(sheet_name=index["sheet_name"], rebuilt=rebuilt, unmatched=unmatched,
+                    spans={n: [tuple(e[:2]) for e in index["blocks"][n]] for n in names})
+    return read_blocks(path, sheet_name, index, names)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+# Lokale cache van ingelezen werkboeken: xlsx-parsing overslaan bij een ongewijzigd bestand
+import os, hashlib, pickle, tempfile
+from typing import Callable, Dict, List
+
+from cncapp.config import CACHE_DIR, CACHE_MAX_MB
+
+CACHE_VERSION = 1
+
+# Broncode die het inleesresultaat bepaalt; een wijziging maakt alle items ongeldig.
+# config.py hoort erbij: DEFAULT_SIDE bepaalt de gaten van een sheet zonder 'zijde'.
+_CODE_MODULES = ("config.py", "excel_import.py", "holes.py", "model.py")
+
+def cache_dir() -> str:
+    return CACHE_DIR or os.path.join(os.path.expanduser("~"), ".cache", "cncapp")
+
+def file_digest(path: str) -> str:
+    """sha256 van de bestandsinhoud (in blokken; goedkoop t.o.v. xlsx-parsing)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+_code_version: str | None = None
+
+def code_version() -> str:
+    global _code_version
+    if _code_version is None:
+        h = hashlib.sha256(str(CACHE_VERSION).encode("ascii"))
+        pkg_dir = os.path.dirname(os.path.abspath(__file__))
+        for mod in _CODE_MODULES:
+            with open(os.path.join(pkg_dir, mod), "rb") as f:
+                h.update(f.read())
+        _code_version = h.hexdigest()
+    return _code_version
+
+def cache_key(path: str, sheet_name, kind: str) -> str:
+    """Sleutel uit bestandsinhoud, sheet, soort resultaat en codeversie."""
+    h = hashlib.sha256()
+    for part in (file_digest(path), repr(sheet_name), kind, code_version()):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+def _entry_path(key: str) -> str:
+    return os.path.join(cache_dir(), f"{key}.pkl")
+
+def load(key: str):
+    """Object uit de cache, of None. Een treffer telt als recent gebruik (mtime)."""
+    p = _entry_path(key)
+    try:
+        with open(p, "rb") as f:
+            obj = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    try:
+        os.utime(p)
+    except OSError:
+        pass
+    return obj
+
+def store(key: str, obj, max_mb: float | None = None):
+    """Schrijf obj atomair weg en ruim daarna de oudste items op boven max_mb."""
+    d = cache_dir()
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=d)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, _entry_path(key))
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    evict(CACHE_MAX_MB if max_mb is None else max_mb)
+
+def evict(max_mb: float) -> List[str]:
+    """Verwijder minst recent gebruikte items tot de cache binnen max_mb past."""
+    d = cache_dir()
+    try:
+        entries = [os.path.join(d, n) for n in os.listdir(d) if n.endswith(".pkl")]
+    except OSError:
+        return []
+    stats = []
+    for p in entries:
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        stats.append((st.st_mtime, st.st_size, p))
+    total = sum(s for _, s, _ in stats)
+    limit = max_mb * 1e6
+    removed: List[str] = []
+    for _, size, p in sorted(stats):
+        if total <= limit:
+            break
+        try:
+            os.remove(p)
+        except OSError:
+            continue
+        total -= size
+        removed.append(p)
+    return removed
+
+def cached(path: str, sheet_name, kind: str, compute: Callable[[], object], enabled: bool = True,
+           stats: Dict | None = None):
+    """
+    Haal het resultaat van compute() voor (bestand, sheet, kind) uit de cache,
+    of bereken en bewaar het. enabled=False slaat de cache volledig over.
+    stats: optionele dict; krijgt 'hit' = True/False.
+    """
+    if not enabled:
+        return compute()
+    key = cache_key(path, sheet_name, kind)
+    obj = load(key)
+    if stats is not None:
+        stats["hit"] = obj is not None
+    if obj is None:
+        obj = compute()
+        try:
+            store(key, obj)
+        except OSError:
+            pass  # cache is een versnelling, geen vereiste
+    return obj
@@ -59,7 +59,7 @@ def _profiles_with_holes(df_raw: pd.DataFrame) -> pd.Series:
     hole_candidate_cols = [c for c in gdf.columns if c not in KEEP_COLS_CANDIDATES]
 
     # Markeer per rij of er een gat staat
-    row_has_hole = gdf[hole_candidate_cols].applymap(_has_hole_string).any(axis=1)
+    row_has_hole = gdf[hole_candidate_cols].map(_has_hole_string).any(axis=1)
 
     # Per profiel: heeft één van de rijen in de groep een gat?
     has_holes_per_profile = row_has_hole.groupby(gdf[namecol]).any()
@@ -129,14 +129,121 @@ EXTRA_DEPTH = 1.0         # mm doorboren onder de onderkant
 Z_CLEAR_ADD = 15.0        # mm boven oppervlak als safe height: Zc = side_height + 15
 SOFT_MM = 3.0             # eerste 3 mm traag (vanaf oppervlak omlaag)
 
+# Aanloop/terugtrek per gat
+APPROACH_MODE = "rapid"   # "rapid" = G0 tot vlak boven oppervlak, "legacy" = G1 F{FEED_SOFT} vanaf Zc
+Z_APPROACH_ADD = 2.0      # mm boven oppervlak waar de ijlgang stopt en de soft plunge begint
+Z_RETRACT_ADD = 3.0       # mm boven oppervlak: laag R-vlak tussen gaten in dezelfde rij (Zc alleen bij rijwissel)
+
+# Boorcyclus-uitvoer
+DRILL_CYCLE = "explicit"  # "explicit" (G0/G1 per gat) of canned cycle "G81", "G82" (dwell) of "G83" (pecken)
+PECK_MM = 3.0             # Q: peckdiepte per slag bij G83
+DWELL_S = 0.5             # P: wachttijd op diepte bij G82 (seconden)
+# Let op: een canned cycle kent één voeding (FEED_DRILL vanaf het R-vlak); de soft-zone vervalt dan.
+
 # Feeds
 FEED_SOFT = 50.0          # mm/min (soft plunge)
 FEED_DRILL = 150.0        # mm/min (rest van de diepte)
+RAPID_RATE_Z = 3000.0     # mm/min, ijlgang Z (alleen voor tijdsschatting)
+RAPID_RATE_X = 5000.0     # mm/min, ijlgang X (gewicht voor padoptimalisatie)
+RAPID_RATE_Y = 5000.0     # mm/min, ijlgang Y
+
+# Volgorde van de gaten per zijde (zie cncapp.pathopt)
+PATH_STRATEGY = "serpentine"  # "row" (oud: elke rij vanaf X0), "serpentine", "tsp" of "auto"
+TSP_MAX_POINTS = 300      # boven dit aantal gaten per zijde geen 2-opt (alleen nearest-neighbour)
+
+# --- Gereedschapstabel: diameter (mm) -> gereedschap, toerental en voedingen ---
+# optioneel per gereedschap "length": lengte (mm) t.o.v. het gereedschap waarmee Z
+# genuld wordt; alleen gebruikt door GRBL (G43.1), die geen gereedschapstabel heeft
+TOOL_TABLE = {
+    4.3: {"tool": 1, "rpm": 6000, "feed_soft": 50.0, "feed_drill": 150.0},
+    6.5: {"tool": 2, "rpm": 5000, "feed_soft": 40.0, "feed_drill": 120.0},
+}
+TOOL_DIA_TOL = 0.05       # mm tolerantie bij het opzoeken van een diameter
+DEFAULT_TOOL = 1          # gereedschap voor diameters die niet in TOOL_TABLE staan (globale feeds/toerental)
+
+def tool_length(tool_no: int) -> float | None:
+    """Lengte van gereedschap tool_no uit TOOL_TABLE, of None als die niet bekend is."""
+    for spec in TOOL_TABLE.values():
+        if int(spec["tool"]) == tool_no and spec.get("length") is not None:
+            return float(spec["length"])
+    return None
+
+def resolve_tool(d: float) -> dict:
+    """
+    Zoek gereedschap voor diameter d (mm). Geeft dict met tool, rpm, feed_soft,
+    feed_drill, dia en known (False = fallback naar DEFAULT_TOOL en globale waarden).
+    """
+    for dia, spec in TOOL_TABLE.items():
+        if abs(float(dia) - float(d)) <= TOOL_DIA_TOL:
+            return {"tool": int(spec["tool"]), "rpm": spec.get("rpm", SPINDLE_RPM),
+                    "feed_soft": spec.get("feed_soft", FEED_SOFT), "feed_drill": spec.get("feed_drill", FEED_DRILL),
+                    "dia": float(dia), "known": True}
+    return {"tool": DEFAULT_TOOL, "rpm": SPINDLE_RPM, "feed_soft": FEED_SOFT, "feed_drill": FEED_DRILL,
+            "dia": float(d), "known": False}
 
 # Veilig wisselen
 Y_CLEAR = 300.0           # vrije Y na zijde/profiel klaar
 Z_PARK = 50.0             # extra park Z voor M0/rotatie (boven oppervlak)
 
+# Job-planning (--schedule): meerdere profielen tegelijk op het bed
+FIXTURE_Y_OFFSETS = [0.0, 60.0, 120.0, 180.0]  # Y-offset per klemplaats; aantal = profielen per opspanning
+ORIENT_SIDE_UP = ("staand", "zijkant", "side")  # 'orientatie'-waarden waarbij de ZIJKANT eerst boven ligt
+
+# Cutlist zonder kolom 'zijde': alle gatencellen horen bij deze zijde
+DEFAULT_SIDE = "BOVENKANT Y10"
+
+# Parallelle generatie (--workers): 1 = serieel, 0 = os.cpu_count()
+WORKERS = 1
+
+# Serieproductie (--subprograms): identieke profielen één keer als O-blok, aangeroepen met M98 P.. L<qty>
+SUBPROGRAM_START = 1000   # eerste O-nummer
+
+# Machinetijd-schatting uit .tap (cncapp.backplot); ijlgangen gebruiken RAPID_RATE_X/Y/Z
+ACCEL_MM_S2 = 400.0       # versnelling per as (mm/s²), trapeziumprofiel per beweging
+MAX_FEED = 5000.0         # mm/min, bovengrens voor F
+MACHINE_HOME = (0.0, 0.0, 100.0)  # G28-positie in werkcoördinaten (X, Y, Z), schatting
+TOOL_CHANGE_S = 20.0      # handmatige gereedschapswissel (M6)
+STOP_S = 30.0             # operatortijd per M0 (draaien, inklemmen)
+SPINDLE_SPINUP_S = 2.0    # M3 na M5
+
+# --watch: werkboek pollen en bij wijziging incrementeel opnieuw genereren
+WATCH_INTERVAL_S = 0.1    # pollinterval (os.stat)
+WATCH_DEBOUNCE_S = 0.2    # zo lang moet het bestand ongewijzigd zijn (Excel schrijft in stappen)
+
+# Postprocessor (cncapp.post): dialect van de besturing, modale woorden weglaten
+POST_DIALECT = "mach3"    # "mach3", "linuxcnc" of "grbl" (CLI: --dialect)
+POST_SUPPRESS = True      # alleen woorden schrijven die de modale toestand veranderen
+
+# Gebundelde job (--one-file/--schedule) opsplitsen voor trage besturingen; 0 = geen limiet
+SPLIT_MAX_LINES = 0       # max. regels per deel (CLI: --max-lines)
+SPLIT_MAX_BYTES = 0       # max. bytes per deel (CLI: --max-bytes)
+
+# Zaagplan (--cutplan): handelslengtes per profieltype ("*" = alle andere types)
+STOCK_LENGTHS = {
+    "*": [6000.0],
+    # "40x80": [6000.0, 3000.0],
+}
+KERF_MM = 3.0             # breedte van de zaagsnede
+STOCK_TRIM_MM = 10.0      # begin van elke staaf haaks afzagen
+CUT_EXACT_MAX_PARTS = 30  # exacte optimalisatie tot zoveel stuks per type (anders alleen FFD)
+CUT_EXACT_NODES = 50000   # zoekbudget van de exacte solver; daarna blijft de FFD-oplossing staan
+
+def resolve_stock(profiel_type: str | None) -> list[float]:
+    """Staaflengtes (mm, oplopend) voor een profieltype; anders STOCK_LENGTHS['*']."""
+    key = str(profiel_type or "").strip().lower().replace("×", "x")
+    for k, v in STOCK_LENGTHS.items():
+        if k.lower().replace("×", "x") == key:
+            return sorted(float(x) for x in v)
+    return sorted(float(x) for x in STOCK_LENGTHS.get("*", []))
+
+# Validatie van de gatengeometrie (vóór export; --strict blokkeert bij fouten)
+VALIDATE_TOL_MM = 0.01    # gaten dichter bij elkaar dan dit = dubbel
+VALIDATE_MIN_WEB_MM = 1.0 # minimaal materiaal tussen twee gaten / tot de rand (anders waarschuwing)
+
+# Cache van ingelezen werkboeken (uit te zetten met --no-cache)
+CACHE_DIR = None          # None = ~/.cache/cncapp
+CACHE_MAX_MB = 256        # oudste items eruit zodra de cache groter wordt
+
 # Opmaak
 COMMENT_PREFIX = "("
 COMMENT_SUFFIX = ")"
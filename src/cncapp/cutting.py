@@ -0,0 +1,255 @@
+from __future__ import annotations
+# Zaagplan (1D cutting stock): stukken length_mm x qty per profieltype over handelslengtes verdelen
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from cncapp.config import KERF_MM, STOCK_TRIM_MM, CUT_EXACT_MAX_PARTS, CUT_EXACT_NODES, resolve_stock
+from cncapp.excel_import import CutlistBlock
+from cncapp.model import is_missing
+
+CUT_COLUMNS = ["profiel_type", "staaf", "staaf_mm", "positie", "profile_name", "length_mm", "start_mm", "einde_mm"]
+BAR_COLUMNS = ["profiel_type", "staaf", "staaf_mm", "stuks", "gebruikt_mm", "rest_mm", "afval_pct"]
+SUMMARY_COLUMNS = ["profiel_type", "stuks", "staven", "staaf_mm_totaal", "stukken_mm", "afval_mm", "afval_pct",
+                   "methode", "te_lang"]
+_EPS = 1e-6
+
+class CutPlan(NamedTuple):
+    cuts: pd.DataFrame      # één rij per stuk, in zaagvolgorde (CUT_COLUMNS)
+    bars: pd.DataFrame      # één rij per staaf met rest/afval (BAR_COLUMNS)
+    summary: pd.DataFrame   # één rij per profieltype (SUMMARY_COLUMNS)
+    too_long: List[str]     # profielen langer dan de langste staaf (niet ingepland)
+
+# Snede-model: n stukken uit één staaf vragen n-1 sneden, dus met w = lengte + kerf
+# en capaciteit = staaf - trim + kerf is 'past' gewoon sum(w) <= capaciteit.
+
+def _capacity(stock: float, kerf: float, trim: float) -> float:
+    return stock - trim + kerf
+
+def _ffd(sizes: List[float], counts: List[int], cap: float) -> List[List[int]]:
+    """
+    First-fit-decreasing over unieke maten (aflopend) met aantallen. Identieke
+    stukken gaan in bulk: per maat één gevectoriseerde zoektocht naar staven met
+    ruimte, elke staaf krijgt er zoveel als passen. Geeft per staaf de maat-indexen.
+    """
+    rem = np.empty(64)
+    bars: List[List[int]] = []
+    for k, (w, c) in enumerate(zip(sizes, counts)):
+        if bars:
+            for b in np.flatnonzero(rem[:len(bars)] >= w - _EPS).tolist():
+                n = min(c, int((rem[b] + _EPS) // w))
+                bars[b].extend([k] * n)
+                rem[b] -= n * w
+                c -= n
+                if not c:
+                    break
+        per = int((cap + _EPS) // w)
+        while c > 0:
+            n = min(c, per)
+            if len(bars) == len(rem):
+                rem = np.concatenate([rem, np.empty(len(rem))])
+            rem[len(bars)] = cap - n * w
+            bars.append([k] * n)
+            c -= n
+    return bars
+
+def _shortest_stock(used: float, stocks: List[Tuple[float, float]]) -> float:
+    """Kortste staaflengte waarvan de capaciteit 'used' (som van w) bevat."""
+    return next(L for L, cap in stocks if cap >= used - _EPS)
+
+def _heuristic(sizes: List[float], counts: List[int], stocks: List[Tuple[float, float]]) -> List[Tuple[float, List[int]]]:
+    """FFD per mogelijke openingslengte, daarna elke staaf zo kort mogelijk; de zuinigste wint."""
+    best = None
+    for L, cap in stocks:
+        if cap < sizes[0] - _EPS:
+            continue
+        plan = []
+        for bar in _ffd(sizes, counts, cap):
+            plan.append((_shortest_stock(sum(sizes[k] for k in bar), stocks), bar))
+        total = sum(L for L, _ in plan)
+        if best is None or total < best[0] - _EPS:
+            best = (total, plan)
+    return best[1]
+
+class _Budget(Exception):
+    pass
+
+def _exact(items: List[float], stocks: List[Tuple[float, float]], incumbent: float,
+           max_nodes: int) -> Tuple[List[Tuple[float, List[int]]] | None, bool]:
+    """
+    Branch-and-bound over stukken (aflopend): in een open staaf of in een nieuwe
+    staaf van elke lengte; doel = minimale totale staaflengte. Ondergrens: wat nog
+    niet in de vrije ruimte past, kost minstens die lengte (x kleinste staaf/capaciteit).
+    Geeft (beste plan of None als niets beter dan incumbent, bewezen optimaal).
+    """
+    n = len(items)
+    suffix = [0.0] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        suffix[i] = suffix[i + 1] + items[i]
+    ratio = min(L / cap for L, cap in stocks)
+    rem: List[float] = []
+    lens: List[float] = []
+    assign = [0] * n
+    best: Dict = {"total": incumbent, "plan": None}
+    nodes = 0
+
+    def dfs(i: int, used: float):
+        nonlocal nodes
+        nodes += 1
+        if nodes > max_nodes:
+            raise _Budget
+        if i == n:
+            if used < best["total"] - _EPS:
+                best["total"] = used
+                bars = [(L, []) for L in lens]
+                for j, b in enumerate(assign):
+                    bars[b][1].append(j)
+                best["plan"] = bars
+            return
+        need = suffix[i] - sum(rem)
+        if used + (need * ratio if need > 0 else 0.0) >= best["total"] - _EPS:
+            return
+        w = items[i]
+        # gelijke stukken: niet in een eerdere staaf dan het vorige (symmetrie)
+        start = assign[i - 1] if i and items[i - 1] == w else 0
+        seen = set()
+        for b in range(start, len(rem)):
+            r = rem[b]
+            key = round(r, 6)
+            if r >= w - _EPS and key not in seen:
+                seen.add(key)
+                rem[b] = r - w
+                assign[i] = b
+                dfs(i + 1, used)
+                rem[b] = r
+        for L, cap in stocks:
+            if cap >= w - _EPS:
+                rem.append(cap - w)
+                lens.append(L)
+                assign[i] = len(rem) - 1
+                dfs(i + 1, used + L)
+                rem.pop()
+                lens.pop()
+
+    try:
+        dfs(0, 0.0)
+    except _Budget:
+        return best["plan"], False
+    return best["plan"], True
+
+def _pieces(df: pd.DataFrame) -> Dict[str, List[Tuple[float, str]]]:
+    """(lengte, profielnaam) per stuk, gegroepeerd per profieltype; qty = aantal stukken."""
+    name_col = next((c for c in ("profile_name", "profiel_naam") if c in df.columns), None)
+    names = df[name_col] if name_col else pd.Series("", index=df.index)
+    types = df["profiel_type"] if "profiel_type" in df.columns else pd.Series(None, index=df.index)
+    qtys = df["qty"] if "qty" in df.columns else pd.Series(1, index=df.index)
+    out: Dict[str, List[Tuple[float, str]]] = {}
+    for name, ptype, length, qty in zip(names, types, df["length_mm"], qtys):
+        if is_missing(length) or float(length) <= 0:
+            continue
+        n = 1 if is_missing(qty) else max(1, int(qty))
+        key = "" if is_missing(ptype) else str(ptype)
+        out.setdefault(key, []).extend([(float(length), "" if is_missing(name) else str(name))] * n)
+    return out
+
+def blocks_frame(blocks: Iterable[CutlistBlock]) -> pd.DataFrame:
+    """Stukkenlijst (profile_name, profiel_type, length_mm, qty) uit profielblokken, ook zonder gaten."""
+    df = pd.DataFrame([{"profile_name": b.header.get("name"), "profiel_type": b.header.get("type"),
+                        "length_mm": b.header.get("lenmm"), "qty": b.header.get("qty")} for b in blocks],
+                      columns=["profile_name", "profiel_type", "length_mm", "qty"])
+    df["length_mm"] = pd.to_numeric(df["length_mm"], errors="coerce")
+    df["qty"] = pd.to_numeric(df["qty"], errors="coerce")
+    return df
+
+def plan_cuts(df: pd.DataFrame, kerf: float | None = None, trim: float | None = None,
+              exact: bool = True, exact_max_parts: int | None = None) -> CutPlan:
+    """
+    Zaagplan voor de uitvoer van extract_holes of clean_cutlist (kolommen
+    profile_name/profiel_naam, profiel_type, length_mm, qty). Per profieltype:
+    staaflengtes uit config.STOCK_LENGTHS, kerf per snede, trim aan het begin van
+    elke staaf. First-fit-decreasing voor alle jobs; tot exact_max_parts stukken per
+    type zoekt een exacte branch-and-bound (met zoekbudget) een zuiniger plan.
+    Zaagvolgorde: staaf na staaf, per staaf het langste stuk eerst.
+    """
+    kerf = KERF_MM if kerf is None else kerf
+    trim = STOCK_TRIM_MM if trim is None else trim
+    limit = CUT_EXACT_MAX_PARTS if exact_max_parts is None else exact_max_parts
+    cuts, bars_out, summary, too_long = [], [], [], []
+    for ptype, pieces in sorted(_pieces(df).items()):
+        stocks = [(L, _capacity(L, kerf, trim)) for L in resolve_stock(ptype)]
+        longest = max((cap for _, cap in stocks), default=0.0)
+        fit = [p for p in pieces if p[0] + kerf <= longest + _EPS]
+        too_long += [name for length, name in pieces if length + kerf > longest + _EPS]
+        rec = {"profiel_type": ptype, "stuks": len(fit), "staven": 0, "staaf_mm_totaal": 0.0,
+               "stukken_mm": 0.0, "afval_mm": 0.0, "afval_pct": 0.0, "methode": "-",
+               "te_lang": len(pieces) - len(fit)}
+        summary.append(rec)
+        if not fit:
+            continue
+
+        # unieke maten aflopend; per maat een wachtrij met profielnamen (invoervolgorde)
+        fit.sort(key=lambda p: -p[0])
+        sizes: List[float] = []
+        queues: List[List[str]] = []
+        for length, name in fit:
+            if not sizes or sizes[-1] != length + kerf:
+                sizes.append(length + kerf)
+                queues.append([])
+            queues[-1].append(name)
+        plan = _heuristic(sizes, [len(q) for q in queues], stocks)
+        rec["methode"] = "ffd"
+        if exact and len(fit) <= limit:
+            items = [sizes[k] for k, q in enumerate(queues) for _ in q]
+            found, proven = _exact(items, stocks, sum(L for L, _ in plan) + _EPS, CUT_EXACT_NODES)
+            if found is not None:
+                index = [k for k, q in enumerate(queues) for _ in q]
+                plan = [(L, [index[j] for j in bar]) for L, bar in found]
+            if proven:
+                rec["methode"] = "exact"
+
+        # stukken aan staven koppelen; langste staven/stukken eerst zagen
+        taken = [0] * len(queues)
+        plan.sort(key=lambda b: (-b[0], sorted(b[1])))
+        for nr, (L, bar) in enumerate(plan, start=1):
+            pos = trim
+            bar.sort()
+            for p, k in enumerate(bar, start=1):
+                name = queues[k][taken[k]]
+                taken[k] += 1
+                length = sizes[k] - kerf
+                cuts.append({"profiel_type": ptype, "staaf": nr, "staaf_mm": L, "positie": p,
+                             "profile_name": name, "length_mm": length,
+                             "start_mm": round(pos, 3), "einde_mm": round(pos + length, 3)})
+                pos += length + kerf
+            used = sum(sizes[k] - kerf for k in bar)
+            # rest = bruikbaar eindstuk na de laatste snede
+            bars_out.append({"profiel_type": ptype, "staaf": nr, "staaf_mm": L, "stuks": len(bar),
+                             "gebruikt_mm": round(used, 3), "rest_mm": round(max(0.0, L - pos), 3),
+                             "afval_pct": round(100.0 * (L - used) / L, 2)})
+        rec["staven"] = len(plan)
+        rec["staaf_mm_totaal"] = sum(L for L, _ in plan)
+        rec["stukken_mm"] = round(sum(p[0] for p in fit), 3)
+        rec["afval_mm"] = round(rec["staaf_mm_totaal"] - rec["stukken_mm"], 3)
+        rec["afval_pct"] = round(100.0 * rec["afval_mm"] / rec["staaf_mm_totaal"], 2)
+    return CutPlan(pd.DataFrame(cuts, columns=CUT_COLUMNS), pd.DataFrame(bars_out, columns=BAR_COLUMNS),
+                   pd.DataFrame(summary, columns=SUMMARY_COLUMNS), too_long)
+
+def cut_tags(plan: CutPlan) -> Dict[str, str]:
+    """
+    Per profielnaam een korte tekst voor in de .tap, bv.
+    '20x40 staaf 3/12 van 6000 mm pos 1,2 + 20x40 staaf 7/12 van 6000 mm pos 1'.
+    Zonder haakjes: die zouden het G-code-commentaar afsluiten.
+    """
+    totals = plan.bars.groupby("profiel_type")["staaf"].max().to_dict() if not plan.bars.empty else {}
+    per: Dict[str, Dict[Tuple[str, int], List[int]]] = {}
+    stock: Dict[Tuple[str, int], float] = {}
+    for ptype, bar, L, pos, name in plan.cuts[["profiel_type", "staaf", "staaf_mm", "positie",
+                                               "profile_name"]].itertuples(index=False, name=None):
+        per.setdefault(name, {}).setdefault((ptype, bar), []).append(pos)
+        stock[(ptype, bar)] = L
+    out = {}
+    for name, bars in per.items():
+        parts = [f"{ptype} staaf {bar}/{totals[ptype]} van {stock[(ptype, bar)]:g} mm pos {','.join(map(str, pos))}"
+                 for (ptype, bar), pos in bars.items()]
+        out[name] = " + ".join(parts)
+    return out
@@ -1,6 +1,9 @@
 from __future__ import annotations
 import pandas as pd
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+from cncapp.cache import cached
+from cncapp.config import DEFAULT_SIDE
 
 # Verwachte basiskolommen (optioneel in v0.1, maar we geven waarschuwingen als ze ontbreken)
 EXPECTED_COLUMNS = {
@@ -9,6 +12,16 @@ EXPECTED_COLUMNS = {
     "qty": ["qty", "aantal", "quantity", "q"],
 }
 
+def _alias_targets(lowered: List[str]) -> Dict[int, str]:
+    """Kolomindex -> doelnaam uit EXPECTED_COLUMNS (per doel de eerste passende kolom)."""
+    found: Dict[int, str] = {}
+    for target, candidates in EXPECTED_COLUMNS.items():
+        for idx, c in enumerate(lowered):
+            if c in candidates:
+                found[idx] = target
+                break
+    return found
+
 def _normalize_columns(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, str], List[str]]:
     """
     Normaliseer kolomnamen naar een vaste set waar mogelijk.
@@ -19,12 +32,9 @@ def _normalize_columns(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, str],
     mapping: Dict[str, str] = {}  # source -> target
     used_targets: Dict[str, str] = {}  # target -> source
 
-    for target, candidates in EXPECTED_COLUMNS.items():
-        for idx, c in enumerate(lowered):
-            if c in candidates:
-                mapping[original_cols[idx]] = target
-                used_targets[target] = original_cols[idx]
-                break
+    for idx, target in _alias_targets(lowered).items():
+        mapping[original_cols[idx]] = target
+        used_targets[target] = original_cols[idx]
 
     # Hernoem kolommen op basis van mapping
     df2 = df.rename(columns=mapping)
@@ -34,7 +44,7 @@ def _normalize_columns(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, str],
 
     return df2, used_targets, missing
 
-def read_cutlist(path: str, sheet_name: str | int | None = 0) -> Dict:
+def read_cutlist(path: str, sheet_name: str | int | None = 0, cache: bool = False) -> Dict:
     """
     Lees een Excel-cutlist in (eerste sheet standaard). Geeft dict terug met:
       - df: pandas.DataFrame (met genormaliseerde kolommen waar mogelijk)
@@ -44,10 +54,15 @@ def read_cutlist(path: str, sheet_name: str | int | None = 0) -> Dict:
       - normalized_mapping: mapping target->bron voor gevonden kolommen
       - missing_expected: lijst met ontbrekende expected kolommen (informatief in v0.1)
       - warnings: lijst met tekstuele waarschuwingen
+    cache: resultaat bewaren/hergebruiken via cncapp.cache (sleutel: inhoudshash + sheet).
     """
-    xls = pd.ExcelFile(path)
-    sheet_to_read = xls.sheet_names[sheet_name] if isinstance(sheet_name, int) else (sheet_name or xls.sheet_names[0])
-    df = pd.read_excel(path, sheet_name=sheet_to_read)
+    return cached(path, sheet_name, "read_cutlist", lambda: _read_cutlist(path, sheet_name), enabled=cache)
+
+def _read_cutlist(path: str, sheet_name: str | int | None) -> Dict:
+    # één keer openen: sheetnaam bepalen en inlezen via hetzelfde ExcelFile-object
+    with pd.ExcelFile(path) as xls:
+        sheet_to_read = xls.sheet_names[sheet_name] if isinstance(sheet_name, int) else (sheet_name or xls.sheet_names[0])
+        df = xls.parse(sheet_to_read)
 
     # Drop volledig lege rijen
     df = df.dropna(how="all").reset_index(drop=True)
@@ -72,3 +87,106 @@ def read_cutlist(path: str, sheet_name: str | int | None = 0) -> Dict:
         "warnings": warnings,
     }
     return result
+
+# --- Streaming inlezen (openpyxl read-only) ---------------------------------
+
+# Zoveel rijen bovenaan de sheet worden bekeken om de kopregel te vinden
+HEADER_SCAN_ROWS = 25
+
+class HeaderNotFound(ValueError):
+    """Sheet zonder herkenbare cutlist-kopregel (bv. een notitieblad)."""
+
+class CutlistBlock(NamedTuple):
+    """Eén profielblok: headerwaarden plus de BOVENKANT/ZIJKANT-subrijen eronder."""
+    header: Dict[str, object]          # name, type, orient, lenmm, qty
+    rows: List[Tuple[object, tuple]]   # (waarde uit 'zijde', gatencellen rechts van 'zijde')
+    span: Tuple[int, int] = (0, 0)     # eerste en laatste (niet-lege) rij in de sheet, 1-based
+
+def _map_header(cells: tuple) -> Dict[str, int]:
+    """
+    Kolomposities voor de headervelden. Eerst dezelfde aliassen als
+    _normalize_columns (Profiel, Lengte, Aantal, ...), dan de kandidaten van
+    extract_holes: zelfde resultaat als read_cutlist + extract_holes.
+    """
+    from cncapp.holes import HEADER_COLS_CANON
+    low = [str(c).strip().lower() if c is not None else "" for c in cells]
+    for idx, target in _alias_targets(low).items():
+        low[idx] = target
+    pos: Dict[str, int] = {}
+    for key, candidates in HEADER_COLS_CANON.items():
+        for c in candidates:
+            if c in low:
+                pos[key] = low.index(c)
+                break
+    return pos
+
+def iter_profile_blocks(path: str, sheet_name: str | int | None = 0, info: Dict | None = None) -> Iterator[CutlistBlock]:
+    """
+    Lees een cutlist rij voor rij (openpyxl read-only, bestand één keer open) en
+    lever profielblokken als generator; het geheugengebruik hangt dus niet af van
+    de lengte van de sheet.
+
+    De kopregel wordt gezocht in de eerste HEADER_SCAN_ROWS rijen (een titelregel
+    boven de tabel mag dus). Lege headervelden erven, net als de ffill in
+    extract_holes, de waarde van het vorige profiel. Rijen vóór de eerste
+    profielnaam worden overgeslagen. block.span geeft de rijen van het blok in de sheet.
+    Zonder kolom 'zijde' zijn alle niet-headerkolommen gatencellen van DEFAULT_SIDE
+    (zelfde terugval als extract_holes).
+    info: optionele dict die gevuld wordt met sheet_name en columns (veld -> kolomindex).
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else (wb[sheet_name] if sheet_name else wb.worksheets[0])
+        rows = ws.iter_rows(values_only=True)
+
+        pos: Dict[str, int] = {}
+        i = 0
+        for i, cells in enumerate(rows):
+            if i >= HEADER_SCAN_ROWS:
+                break
+            found = _map_header(cells)
+            if "name" in found and "lenmm" in found:
+                pos = found
+                break
+        if not pos:
+            raise HeaderNotFound("Geen kopregel met profiel_naam/profile en length_mm/lengte_mm gevonden.")
+        if info is not None:
+            info["sheet_name"] = ws.title
+            info["columns"] = dict(pos)
+
+        hdr_keys = [k for k in ("name", "type", "orient", "lenmm", "qty") if k in pos]
+        side_i = pos.get("side")
+        header_pos = set(pos.values())
+        last: Dict[str, object] = {k: None for k in hdr_keys}
+        block: CutlistBlock | None = None
+        first = end = 0
+        for row, cells in enumerate(rows, start=i + 2):  # i = index van de kopregel
+            if all(c is None for c in cells):
+                continue
+            name = cells[pos["name"]] if pos["name"] < len(cells) else None
+            if name is not None:
+                if block is not None:
+                    yield block._replace(span=(first, end))
+                for k in hdr_keys:
+                    v = cells[pos[k]] if pos[k] < len(cells) else None
+                    if v is not None:
+                        last[k] = v
+                block = CutlistBlock(dict(last), [])
+                first = row
+            end = row
+            if block is None:
+                continue
+            if side_i is None:
+                block.rows.append((DEFAULT_SIDE, tuple(c for j, c in enumerate(cells) if j not in header_pos)))
+                continue
+            if side_i >= len(cells):
+                continue
+            side = cells[side_i]
+            if side is not None:
+                block.rows.append((side, cells[side_i + 1:]))
+        if block is not None:
+            yield block._replace(span=(first, end))
+    finally:
+        wb.close()
@@ -1,20 +1,39 @@
 from __future__ import annotations
 # Versiebeheer: tag 'v1.2-side-info-comments'
-import os, json
-from typing import Dict, List
-import pandas as pd
+import os, sys, json, hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
 
 from cncapp.config import (
     MACHINE_UNITS, SPINDLE_RPM, EXTRA_DEPTH, Z_CLEAR_ADD, SOFT_MM,
     FEED_SOFT, FEED_DRILL, Y_CLEAR, Z_PARK, COMMENT_PREFIX, COMMENT_SUFFIX,
-    resolve_side_height
+    APPROACH_MODE, Z_APPROACH_ADD, Z_RETRACT_ADD, RAPID_RATE_Z,
+    DRILL_CYCLE, PECK_MM, DWELL_S, WORKERS, SUBPROGRAM_START,
+    resolve_side_height, resolve_tool
 )
+from cncapp.pathopt import order_side
+from cncapp.schedule import plan_job, needs_rotation, Slot
+from cncapp.writer import GCodeSink, FileSink, Sink
+from cncapp.post import PostSink
+from cncapp.split import resolve_budget, write_parts
+from cncapp.model import Profile, Side, is_missing
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+def _is_frame(obj) -> bool:
+    """isinstance(obj, pd.DataFrame) zonder pandas te laden (niet geladen = geen DataFrame)."""
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(obj, pd.DataFrame)
 
 def _c(s: str) -> str:
     return f"{COMMENT_PREFIX}{s}{COMMENT_SUFFIX}"
 
-def _emit_header(g: List[str], profile_name: str, profile_type: str | None, length_mm: float):
+def _emit_header(g: Sink, profile_name: str, profile_type: str | None, length_mm: float):
     g.append(_c(f"{profile_name} - {profile_type or ''} L={length_mm:.1f} mm").replace("  ", " ").strip())
+    _emit_preamble(g)
+
+def _emit_preamble(g: Sink):
     g.append("G90 G94 G91.1 G40 G49 G17")
     g.append("G21" if MACHINE_UNITS.lower() == "mm" else "G20")
     g.append("G28 G91 Z0.")
@@ -22,7 +41,7 @@ def _emit_header(g: List[str], profile_name: str, profile_type: str | None, leng
     g.append("G54")
     g.append(f"S{int(SPINDLE_RPM)} M3")
 
-def _emit_end(g: List[str]):
+def _emit_end(g: Sink):
     g.append("M9")
     g.append("M5")
     g.append("G28 G91 Z0.")
@@ -45,8 +64,8 @@ def _parse_y(label: str) -> float:
             return 0.0
     return 0.0
 
-def _group_sides(holes: Dict[str, List[Dict]]) -> Dict[str, Dict[str, List[Dict]]]:
-    groups: Dict[str, Dict[str, List[Dict]]] = {"TOP": {}, "SIDE": {}}
+def _group_sides(holes: Dict[str, Side]) -> Dict[str, Dict[str, Side]]:
+    groups: Dict[str, Dict[str, Side]] = {"TOP": {}, "SIDE": {}}
     for lbl, lst in holes.items():
         u = str(lbl).upper()
         if u.startswith("TOP"):
@@ -58,24 +77,168 @@ def _group_sides(holes: Dict[str, List[Dict]]) -> Dict[str, Dict[str, List[Dict]
     # Filter lege mappen weg
     return {k: v for k, v in groups.items() if v}
 
-def _drill_sequence(g: List[str], x: float, side_height: float):
+def _drill_sequence(g: Sink, x: float, side_height: float, move_x: bool = True, tool: Dict | None = None):
     # Z=0 onderkant. Oppervlak = +side_height.
+    feed_soft = tool["feed_soft"] if tool else FEED_SOFT
+    feed_drill = tool["feed_drill"] if tool else FEED_DRILL
+    z_surface = side_height
+    z_soft_end = z_surface - SOFT_MM
+    z_final = -EXTRA_DEPTH
+    if move_x:
+        g.append(f"G0 X{x:.3f}")
+    if APPROACH_MODE == "rapid":
+        # ijlgang tot net boven het oppervlak; alleen de echte soft-zone traag
+        g.append(f"G0 Z{z_surface + Z_APPROACH_ADD:.3f}")
+    g.append(f"G1 Z{z_soft_end:.3f} F{feed_soft:g}")
+    g.append(f"G1 Z{z_final:.3f} F{feed_drill:g}")
+
+def _canned_cycle_words(side_height: float, tool: Dict | None = None) -> str:
+    """Modale woorden voor de eerste regel van een canned cycle (G99: terug naar R)."""
+    words = f"G99 {DRILL_CYCLE} Z{-EXTRA_DEPTH:.3f} R{side_height + Z_RETRACT_ADD:.3f}"
+    if DRILL_CYCLE == "G82":
+        words += f" P{DWELL_S:g}"
+    elif DRILL_CYCLE == "G83":
+        words += f" Q{PECK_MM:g}"
+    return words + f" F{(tool['feed_drill'] if tool else FEED_DRILL):g}"
+
+def _retract_z(side_height: float, zc: float, last_in_row: bool) -> float:
+    """Terugtrekhoogte na een gat: laag R-vlak binnen een rij, Zc bij rijwissel."""
+    if APPROACH_MODE == "rapid" and not last_in_row:
+        return side_height + Z_RETRACT_ADD
+    return zc
+
+def _hole_cycle_seconds(
+    side_height: float, zc: float, first_in_row: bool, last_in_row: bool, mode: str,
+    feed_soft: float = FEED_SOFT, feed_drill: float = FEED_DRILL,
+) -> float:
+    """Geschatte Z-tijd (s) voor één gat: aanloop, boren en terugtrekken."""
     z_surface = side_height
     z_soft_end = z_surface - SOFT_MM
     z_final = -EXTRA_DEPTH
-    g.append(f"G0 X{x:.3f}")
-    g.append(f"G1 Z{z_soft_end:.3f} F{FEED_SOFT:g}")
-    g.append(f"G1 Z{z_final:.3f} F{FEED_DRILL:g}")
+    if mode == "canned":
+        z_r = z_surface + Z_RETRACT_ADD
+        minutes = ((zc - z_r) if first_in_row else 0.0) / RAPID_RATE_Z + (z_r - z_final) / feed_drill
+        minutes += ((z_r - z_final) + ((zc - z_r) if last_in_row else 0.0)) / RAPID_RATE_Z
+        return minutes * 60.0
+    if mode == "rapid":
+        z_start = zc if first_in_row else z_surface + Z_RETRACT_ADD
+        z_app = z_surface + Z_APPROACH_ADD
+        z_ret = zc if last_in_row else z_surface + Z_RETRACT_ADD
+        minutes = (z_start - z_app) / RAPID_RATE_Z + (z_app - z_soft_end) / feed_soft
+    else:
+        z_ret = zc
+        minutes = (zc - z_soft_end) / feed_soft
+    minutes += (z_soft_end - z_final) / feed_drill + (z_ret - z_final) / RAPID_RATE_Z
+    return minutes * 60.0
+
+def _emit_holes(
+    g: Sink,
+    side_map: Dict[str, Side],
+    side_height: float,
+    zc: float,
+    row_comment: str | None = None,
+    y_offset: float = 0.0,
+    tool: Dict | None = None,
+):
+    """Boor alle gaten van één zijde in de volgorde van cncapp.pathopt."""
+    rows = [(lbl, _parse_y(lbl) + y_offset, side_map[lbl]) for lbl in sorted(side_map.keys(), key=_parse_y) if side_map[lbl]]
+    order, stats = order_side(rows)
+    legacy = stats["strategy"] == "row"
+    g.append(_c(f"PAD: {stats['strategy']}, ijlgang {stats['rapid_mm_before']:.0f} -> {stats['rapid_mm_after']:.0f} mm"))
+
+    canned = DRILL_CYCLE != "explicit"
+    # "tsp" kan een rij in meerdere stukken bezoeken: nummering en rijcommentaar
+    # lopen per label over het hele pad, niet per aaneengesloten stuk
+    hole_no: Dict[str, int] = {}
+    for i, h in enumerate(order):
+        first_in_row = i == 0 or h.label != order[i - 1].label
+        last_in_row = i == len(order) - 1 or order[i + 1].label != h.label
+        if first_in_row and row_comment and h.label not in hole_no:
+            # nieuwe rij: kop staat op Zc
+            g.append(_c(f"{row_comment}: {h.label}"))
+        hole_no[h.label] = hole_no.get(h.label, 0) + 1
+
+        if canned:
+            # modaal: na het eerste gat van de rij volstaat 'X...'
+            if first_in_row:
+                g.append(f"{_canned_cycle_words(side_height, tool)} X{h.x:.3f} Y{h.y:.3f}")
+            else:
+                g.append(f"X{h.x:.3f}")
+            if last_in_row:
+                g.append("G80")
+                g.append(f"G0 Z{zc:.3f}")
+            continue
+
+        if first_in_row:
+            g.append(f"G0 X0.000 Y{h.y:.3f}" if legacy else f"G0 X{h.x:.3f} Y{h.y:.3f}")
+        g.append(_c(f"HOLE {hole_no[h.label]} dia={h.d:g}"))
+        _drill_sequence(g, h.x, side_height, move_x=legacy or not first_in_row, tool=tool)
+        g.append(f"G0 Z{_retract_z(side_height, zc, last_in_row):.3f}")
+    return stats
+
+def _new_state() -> Dict:
+    """Machinetoestand die over een heel programma meeloopt (actief gereedschap/toerental)."""
+    return {"tool": None, "rpm": SPINDLE_RPM}
+
+def _split_by_tool(side_map: Dict[str, Side]) -> Dict[int, Tuple[Dict, Dict[str, Side]]]:
+    """Splits een zijde in {toolnummer: (tool, {label: Side})} via de gereedschapstabel."""
+    out: Dict[int, Tuple[Dict, Dict[str, Side]]] = {}
+    tools: Dict[float, Dict] = {}
+    for lbl, side in side_map.items():
+        for x, d in side:
+            tool = tools.get(d)
+            if tool is None:
+                tool = tools[d] = resolve_tool(d)
+            sub = out.setdefault(tool["tool"], (tool, {}))[1]
+            if lbl not in sub:
+                sub[lbl] = Side(lbl)
+            sub[lbl].add(x, d)
+    return out
+
+def _tool_sequence(tool_nos, state: Dict, next_tools=()) -> List[int]:
+    # het actieve gereedschap eerst (geen wissel); gereedschap dat de volgende
+    # opspanning ook nodig heeft als laatste, zodat het daar meteen klaarstaat
+    return sorted(tool_nos, key=lambda n: (n != state["tool"], n in next_tools, n))
 
-def _side_total(side_map: Dict[str, List[Dict]]) -> int:
+def _emit_tool_change(g: Sink, tool: Dict, state: Dict, zc: float):
+    if state["tool"] == tool["tool"]:
+        return
+    g.append(_c(f"GEREEDSCHAP T{tool['tool']} dia={tool['dia']:g}" + ("" if tool["known"] else " (NIET IN TOOL_TABLE)")))
+    g.append("M5")
+    g.append(f"G0 Z{max(Z_PARK, zc):.3f}")
+    g.append(f"T{tool['tool']} M6")
+    g.append(f"G43 H{tool['tool']}")
+    g.append(f"S{int(tool['rpm'])} M3")
+    g.append(f"G0 Z{zc:.3f}")
+    state["tool"] = tool["tool"]
+    state["rpm"] = tool["rpm"]
+
+def _emit_holes_by_tool(
+    g: Sink,
+    side_map: Dict[str, Side],
+    side_height: float,
+    zc: float,
+    state: Dict,
+    row_comment: str | None = None,
+    next_tools=(),
+):
+    by_tool = _split_by_tool(side_map)
+    for tn in _tool_sequence(by_tool.keys(), state, next_tools):
+        tool, sub_map = by_tool[tn]
+        _emit_tool_change(g, tool, state, zc)
+        _emit_holes(g, sub_map, side_height, zc, row_comment=row_comment, tool=tool)
+
+def _side_total(side_map: Dict[str, Side]) -> int:
     return sum(len(lst) for lst in side_map.values()) if side_map else 0
 
 def _emit_top(
-    g: List[str],
-    side_map_top: Dict[str, List[Dict]],
+    g: Sink,
+    side_map_top: Dict[str, Side],
     profile_type: str | None,
     profile_name: str,
     length_mm: float,
+    state: Dict | None = None,
+    next_tools=(),
 ):
     if not side_map_top:
         return
@@ -88,25 +251,16 @@ def _emit_top(
     g.append(_c("Klem profiel in"))
     g.append(f"G0 Z{zc:.3f}")
 
-    for lbl in sorted(side_map_top.keys(), key=_parse_y):
-        holes = side_map_top[lbl]
-        if not holes:
-            continue
-        y = _parse_y(lbl)
-        g.append(f"G0 X0.000 Y{y:.3f}")
-        for i, h in enumerate(sorted(holes, key=lambda hh: float(hh['x']))):
-            x = float(h["x"]); d = float(h["d"])
-            g.append(_c(f"HOLE {i+1} dia={d:g}"))
-            _drill_sequence(g, x, side_height)
-            g.append(f"G0 Z{zc:.3f}")
+    _emit_holes_by_tool(g, side_map_top, side_height, zc, state if state is not None else _new_state(), next_tools=next_tools)
     g.append(f"G0 X0.000 Y{Y_CLEAR:.3f}")
 
 def _emit_side(
-    g: List[str],
-    side_map: Dict[str, List[Dict]],
+    g: Sink,
+    side_map: Dict[str, Side],
     profile_type: str | None,
     profile_name: str,
     length_mm: float,
+    state: Dict | None = None,
 ):
     if not side_map:
         return
@@ -119,78 +273,447 @@ def _emit_side(
     g.append(_c("Draai profiel X om naar zijkant"))
     g.append("M5")
     g.append(f"G0 Z{Z_PARK:.3f}")
+    state = state if state is not None else _new_state()
     g.append("M0 (<<< DRAAI PROFIEL MANUEEL >>>)")
-    g.append(f"S{int(SPINDLE_RPM)} M3")
+    g.append(f"S{int(state['rpm'])} M3")
     g.append(f"G0 Z{zc:.3f}")
 
-    for lbl in sorted(side_map.keys(), key=_parse_y):
-        holes = side_map[lbl]
-        if not holes:
-            continue
-        y = _parse_y(lbl)
-        g.append(_c(f"ZIJKANT RIJ: {lbl}"))
-        g.append(f"G0 X0.000 Y{y:.3f}")
-        for i, h in enumerate(sorted(holes, key=lambda hh: float(hh['x']))):
-            x = float(h["x"]); d = float(h["d"])
-            g.append(_c(f"HOLE {i+1} dia={d:g}"))
-            _drill_sequence(g, x, side_height)
-            g.append(f"G0 Z{zc:.3f}")
+    _emit_holes_by_tool(g, side_map, side_height, zc, state, row_comment="ZIJKANT RIJ")
     g.append(f"G0 X0.000 Y{Y_CLEAR:.3f}")
 
-def generate_gcode_for_profile(row: Dict, output_dir: str) -> str:
-    name = str(row.get("profile_name") or "Profiel")
-    ptype = (row.get("profiel_type") or "") and str(row.get("profiel_type"))
-    length = float(row.get("length_mm") or 0)
-    holes = json.loads(row["holes_json"]) if isinstance(row.get("holes_json"), str) else (row.get("holes_json") or {})
+def _profile_from_row(row: Dict) -> Dict:
+    """
+    Haal naam/type/lengte/orientatie en gaten (per TOP/SIDE/OTHER) uit een extract_holes-rij.
+    Gebruikt het Profile-object als dat er is; holes_json alleen als terugval.
+    """
+    prof = row.get("profile")
+    holes = prof.sides if isinstance(prof, Profile) else Profile.sides_from_holes(row.get("holes_json"))
+    qty = row.get("qty")
+    return {
+        "name": str(row.get("profile_name") or "Profiel"),
+        "ptype": (row.get("profiel_type") or "") and str(row.get("profiel_type")),
+        "length": float(row.get("length_mm") or 0),
+        "orient": row.get("orientatie"),
+        "qty": int(qty) if qty is not None and not is_missing(qty) and qty > 0 else 1,
+        "holes": holes,
+        "groups": _group_sides(holes),
+        "cut": row.get("zaagplan") or None,
+    }
 
-    g: List[str] = []
+def _face_map(groups: Dict[str, Dict[str, Side]], face: str) -> Dict[str, Side]:
+    if face == "TOP":
+        return groups.get("TOP", {})
+    return {**groups.get("SIDE", {}), **groups.get("OTHER", {})}
+
+def _setup_tools(slots: List[Slot], face_idx: int) -> set:
+    return {tn for s in slots if len(s.faces) > face_idx
+            for tn in _split_by_tool(_face_map(s.profile["groups"], s.faces[face_idx]))}
+
+def _emit_setup(g: Sink, slots: List[Slot], face_idx: int, state: Dict, next_tools=()) -> float:
+    """
+    Eén opspanning: boor per klemplaats de zijde faces[face_idx].
+    Gaten worden over alle klemplaatsen heen per gereedschap gegroepeerd.
+    """
+    work = [(s, s.faces[face_idx]) for s in slots if len(s.faces) > face_idx]
+    # veilige hoogte over alle ingeklemde profielen, ook die hier niets boren (die
+    # liggen nog met hun laatste zijde boven): hoogste oppervlak + Z_CLEAR_ADD
+    zc = max(resolve_side_height(s.profile["ptype"], None, s.faces[min(face_idx, len(s.faces) - 1)])
+             for s in slots) + Z_CLEAR_ADD
+    g.append(f"G0 Z{zc:.3f}")
+    split = [(s, face, _split_by_tool(_face_map(s.profile["groups"], face))) for s, face in work]
+    all_tools = {tn for _, _, by_tool in split for tn in by_tool}
+    for tn in _tool_sequence(all_tools, state, next_tools):
+        for s, face, by_tool in split:
+            if tn not in by_tool:
+                continue
+            tool, side_map = by_tool[tn]
+            _emit_tool_change(g, tool, state, zc)
+            p = s.profile
+            side_height = resolve_side_height(p["ptype"], None, face)
+            zijde = "BOVENKANT" if face == "TOP" else "ZIJKANT"
+            g.append(_c(f"INFO: {p['name']}, L={p['length']:.1f} mm, type={p['ptype'] or '-'}, zijde={zijde}, "
+                        f"{_side_total(side_map)} gaten T{tn}, Y-offset={s.y_offset:g}, hoogte={side_height:g}"))
+            _emit_holes(g, side_map, side_height, zc,
+                        row_comment="ZIJKANT RIJ" if face == "SIDE" else None, y_offset=s.y_offset, tool=tool)
+    g.append(f"G0 X0.000 Y{Y_CLEAR:.3f}")
+    return zc
+
+def _emit_stop(g: Sink, message: str, z_min: float = 0.0, rpm: float = SPINDLE_RPM):
+    g.append("M5")
+    g.append(f"G0 Z{max(Z_PARK, z_min):.3f}")
+    g.append(f"M0 (<<< {message} >>>)")
+    g.append(f"S{int(rpm)} M3")
+
+def _job_setups(plan: List[List[Slot]]) -> Tuple[List[Tuple[int, int]], List[set]]:
+    """Volgorde van alle opspanningen (groep, zijde) en hun gereedschap, voor de lookahead."""
+    setups = [(gi, fi) for gi, grp in enumerate(plan) for fi in ((0, 1) if needs_rotation(grp) else (0,))]
+    return setups, [_setup_tools(plan[gi], fi) for gi, fi in setups]
+
+def _emit_job_setup(g: Sink, plan: List[List[Slot]], setups: List[Tuple[int, int]], tools: List[set],
+                    k: int, state: Dict):
+    """
+    Opspanning k van de job, vanaf de M0 ervoor (profielen wisselen of draaien).
+    state['zc'] onthoudt de veilige hoogte van de vorige opspanning voor die stop.
+    """
+    gi, fi = setups[k]
+    grp = plan[gi]
+    nxt = tools[k + 1] if k + 1 < len(tools) else set()
+    zc = state.get("zc", 0.0)
+    if fi == 0:
+        if gi > 0:
+            _emit_stop(g, "WISSEL PROFIELEN", zc, state["rpm"])
+        g.append(_c(f"GROEP {gi+1}: klem profielen in"))
+        for s in grp:
+            zijde = "BOVENKANT" if s.faces[0] == "TOP" else "ZIJKANT"
+            g.append(_c(f"Y={s.y_offset:g}: {s.profile['name']} ({zijde} boven)"))
+            if s.profile.get("cut"):
+                g.append(_c(f"ZAAGPLAN {s.profile['name']}: {s.profile['cut']}"))
+    else:
+        rotate = [s.profile["name"] for s in grp if len(s.faces) > 1]
+        g.append(_c(f"Draai alleen: {', '.join(rotate)}"))
+        _emit_stop(g, "DRAAI PROFIELEN MANUEEL", zc, state["rpm"])
+    state["zc"] = _emit_setup(g, grp, fi, state, nxt)
+
+def _emit_job(g: Sink, profiles: List[Dict]):
+    """
+    Job-planning over meerdere klemplaatsen: per groep eerst opspanning 1
+    voor alle profielen, één M0 voor rotatie, dan opspanning 2.
+    """
+    plan = plan_job(profiles)
+    g.append(_c(f"JOB: {sum(len(grp) for grp in plan)} profielen in {len(plan)} opspangroep(en)"))
+    _emit_preamble(g)
+    state = _new_state()
+    setups, tools = _job_setups(plan)
+    for k in range(len(setups)):
+        _emit_job_setup(g, plan, setups, tools, k, state)
+    _emit_end(g)
+
+def _emit_profile(g: Sink, prof: Dict, state: Dict):
+    """Volledig programma voor één profiel: header, BOVENKANT, ZIJKANT(en), einde."""
+    name, ptype, length, groups = prof["name"], prof["ptype"], prof["length"], prof["groups"]
     _emit_header(g, name, ptype, length)
+    if prof.get("cut"):
+        g.append(_c(f"ZAAGPLAN: {prof['cut']}"))
 
-    groups = _group_sides(holes)
     top_map = groups.get("TOP", {})
     side_map = groups.get("SIDE", {})
     other_map = groups.get("OTHER", {})
 
-    _emit_top(g, top_map, ptype, name, length)
-    _emit_side(g, side_map, ptype, name, length)
+    side_tools = set(_split_by_tool({**side_map, **other_map}))
+    _emit_top(g, top_map, ptype, name, length, state, next_tools=side_tools)
+    _emit_side(g, side_map, ptype, name, length, state)
     if other_map:
-        _emit_side(g, other_map, ptype, name, length)
+        _emit_side(g, other_map, ptype, name, length, state)
 
     _emit_end(g)
 
-    os.makedirs(output_dir, exist_ok=True)
-    path = os.path.join(output_dir, f"{name.replace(' ', '_')}.tap")
-    with open(path, "w", encoding="ascii", errors="ignore") as f:
-        f.write("\n".join(g) + "\n")
+def pattern_key(prof: Dict) -> str:
+    """
+    Canonieke hash van type, lengte en gatenpatroon (per label, volgorde-onafhankelijk).
+    Profielen met dezelfde sleutel krijgen identieke G-code, ongeacht hun naam.
+    """
+    holes = sorted(
+        (str(lbl), sorted((round(x, 4), round(d, 4)) for x, d in side))
+        for lbl, side in prof["holes"].items() if side
+    )
+    payload = [prof["ptype"] or "", round(prof["length"], 3), holes]
+    return hashlib.sha1(repr(payload).encode("utf-8")).hexdigest()
+
+def series_plan(rows: Iterable[Dict]) -> List[Dict]:
+    """
+    Groepeer profielen op pattern_key (volgorde van eerste voorkomen).
+    Per programma: o (O-nummer), names, qty (totaal aantal stuks), prof (eerste profiel).
+    """
+    plan: Dict[str, Dict] = {}
+    for r in rows:
+        prof = _profile_from_row(r)
+        if not prof["holes"]:
+            continue
+        key = pattern_key(prof)
+        entry = plan.get(key)
+        if entry is None:
+            entry = plan[key] = {"o": SUBPROGRAM_START + len(plan), "names": [], "qty": 0, "prof": prof}
+        entry["names"].append(prof["name"])
+        entry["qty"] += prof["qty"]
+    return list(plan.values())
+
+def _profile_tools(prof: Dict) -> set:
+    return set(_split_by_tool(prof["holes"]))
+
+def _emit_series(g: Sink, plan: List[Dict]):
+    """
+    Serieproductie: hoofdprogramma met per uniek patroon één M98-aanroep (L = aantal
+    stuks), daarna de O-blokken. Elk O-blok begint met een M0 om het volgende stuk in
+    te klemmen en eindigt met M99. Gebruikt een patroon één gereedschap, dan wisselt
+    het hoofdprogramma dat vóór de aanroep; anders zit de wissel in het O-blok.
+    """
+    parts = sum(e["qty"] for e in plan)
+    g.append(_c(f"SERIE: {len(plan)} programma('s), {parts} stuks"))
+    for e in plan:
+        g.append(_c(f"O{e['o']}: {e['qty']}x {', '.join(e['names'])}"))
+    # hoofdprogramma eerst opbouwen: de O-blokken hebben de begintoestand per aanroep nodig
+    main: List[str] = []
+    _emit_preamble(main)
+    state = _new_state()
+    for e in plan:
+        p = e["prof"]
+        main.append("")
+        main.append(_c(f"{' + '.join(e['names'])} - {p['ptype'] or ''} L={p['length']:.1f} mm").replace("  ", " "))
+        tools = _profile_tools(p)
+        if len(tools) == 1:
+            tool = _split_by_tool(p["holes"])[next(iter(tools))][0]
+            _emit_tool_change(main, tool, state, Z_PARK)
+            e["entry_state"] = dict(state)
+        else:
+            e["entry_state"] = _new_state()
+            state = _advance_state(p, e["entry_state"])
+        main.append(f"M98 P{e['o']} L{e['qty']}")
+    main.append("")
+    _emit_end(main)
+
+    # dialecten die een definitie vóór de aanroep willen (cncapp.post) krijgen de O-blokken eerst
+    subs_first = getattr(g, "subs_first", False)
+    if not subs_first:
+        g.extend(main)
+    for e in plan:
+        p = e["prof"]
+        sub_state = dict(e["entry_state"])
+        groups = p["groups"]
+        g.append("")
+        g.append(f"O{e['o']}")
+        _emit_stop(g, "KLEM VOLGEND PROFIEL IN", 0.0, sub_state["rpm"])
+        side_tools = set(_split_by_tool({**groups.get("SIDE", {}), **groups.get("OTHER", {})}))
+        _emit_top(g, groups.get("TOP", {}), p["ptype"], p["name"], p["length"], sub_state, next_tools=side_tools)
+        _emit_side(g, groups.get("SIDE", {}), p["ptype"], p["name"], p["length"], sub_state)
+        if groups.get("OTHER"):
+            _emit_side(g, groups["OTHER"], p["ptype"], p["name"], p["length"], sub_state)
+        g.append("M99")
+    if subs_first:
+        g.append("")
+        g.extend(main)
+
+def _write_atomic(path: str, lines: List[str]):
+    """Schrijf regels atomair naar path (zie writer.FileSink)."""
+    with FileSink(path) as f:
+        f.extend(lines)
+
+def _profile_path(output_dir: str, name: str) -> str:
+    return os.path.join(output_dir, f"{name.replace(' ', '_')}.tap")
+
+def generate_gcode_for_profile(row: Dict, output_dir: str, dialect: str | None = None) -> str:
+    prof = _profile_from_row(row)
+
+    path = _profile_path(output_dir, prof["name"])
+    with PostSink(FileSink(path), dialect) as g:
+        _emit_profile(g, prof, _new_state())
     return path
 
-def generate_all_profiles(df: pd.DataFrame, output_dir: str, one_file: bool = False) -> str | None:
-    if one_file:
-        g_all: List[str] = []
-        for _, r in df.iterrows():
-            tmp = dict(r)
-            name = str(tmp.get("profile_name") or "Profiel")
-            ptype = (tmp.get("profiel_type") or "") and str(tmp.get("profiel_type"))
-            length = float(tmp.get("length_mm") or 0)
-            holes = json.loads(tmp["holes_json"]) if isinstance(tmp.get("holes_json"), str) else (tmp.get("holes_json") or {})
-            _emit_header(g_all, name, ptype, length)
-            groups = _group_sides(holes)
-            top_map = groups.get("TOP", {})
-            side_map = groups.get("SIDE", {})
-            other_map = groups.get("OTHER", {})
-            _emit_top(g_all, top_map, ptype, name, length)
-            _emit_side(g_all, side_map, ptype, name, length)
-            if other_map:
-                _emit_side(g_all, other_map, ptype, name, length)
-            _emit_end(g_all)
-            g_all.append("")
-        os.makedirs(output_dir, exist_ok=True)
+def _advance_state(prof: Dict, state: Dict) -> Dict:
+    """
+    Gereedschapstoestand na _emit_profile, zonder G-code te bouwen. Volgt
+    dezelfde volgorde als _emit_top/_emit_side, zodat parallel gerenderde
+    blokken met de juiste begintoestand starten.
+    """
+    state = dict(state)
+    groups = prof["groups"]
+    side_maps = [groups.get("SIDE", {}), groups.get("OTHER", {})]
+    side_tools = set(_split_by_tool({**side_maps[0], **side_maps[1]}))
+    for side_map, next_tools in [(groups.get("TOP", {}), side_tools)] + [(m, ()) for m in side_maps]:
+        seq = _tool_sequence(_split_by_tool(side_map).keys(), state, next_tools)
+        if seq:
+            tool = _split_by_tool(side_map)[seq[-1]][0]
+            state["tool"], state["rpm"] = tool["tool"], tool["rpm"]
+    return state
+
+def _render_profile(args: Tuple[Dict, Dict]) -> List[str]:
+    row, state = args
+    g: List[str] = []
+    _emit_profile(g, _profile_from_row(row), dict(state))
+    g.append("")
+    return g
+
+def _emit_bundle(g: Sink, rows: List[Dict], schedule: bool, n_workers: int, chunk: int):
+    """Gebundelde job (one-file of schedule) streamen naar g."""
+    if schedule:
+        # meerdere profielen per opspanning, één rotatie per groep
+        _emit_job(g, [_profile_from_row(r) for r in rows])
+        return
+    # gereedschapstoestand loopt door over de hele job: geen onnodige M6 per profiel
+    if n_workers <= 1:
+        state = _new_state()
+        for r in rows:
+            _emit_profile(g, _profile_from_row(r), state)
+            g.append("")
+        return
+    # parallel: begintoestand per blok vooraf bepalen (goedkoop), blokken komen in volgorde binnen
+    states = []
+    state = _new_state()
+    for r in rows:
+        states.append(state)
+        state = _advance_state(_profile_from_row(r), state)
+    with ProcessPoolExecutor(max_workers=n_workers) as ex:
+        for block in ex.map(_render_profile, zip(rows, states), chunksize=chunk):
+            g.extend(block)
+
+def _write_split(rows: List[Dict], output_dir: str, schedule: bool, max_lines: int, max_bytes: int,
+                 dialect: str | None) -> str:
+    """
+    Gebundelde job in delen onder het budget (zie split.write_parts). Veilige grenzen:
+    one-file na elk profiel (eigen header/M30), schedule vóór de M0 van elke opspanning;
+    een deel krijgt dan een eigen preamble en einde. Altijd serieel.
+    """
+    profs = [_profile_from_row(r) for r in rows]
+    if schedule:
+        plan = plan_job(profs)
+        setups, tools = _job_setups(plan)
+        total = sum(len(grp) for grp in plan)
+
+        def render(k: int, g: List[str], state: Dict):
+            _emit_job_setup(g, plan, setups, tools, k, state)
+
+        def names(k: int) -> List[str]:
+            gi, fi = setups[k]
+            return [s.profile["name"] for s in plan[gi] if len(s.faces) > fi]
+
+        def head(g: List[str], k: int):
+            g.append(_c(f"JOB: {total} profielen in {len(plan)} opspangroep(en), DEEL {k}"))
+            _emit_preamble(g)
+
+        return write_parts(len(setups), render, names, head, _emit_end, _new_state, output_dir,
+                           max_lines=max_lines, max_bytes=max_bytes, dialect=dialect)
+
+    def render(i: int, g: List[str], state: Dict):
+        _emit_profile(g, profs[i], state)
+        g.append("")
+
+    def head(g: List[str], k: int):
+        g.append(_c(f"DEEL {k}"))
+
+    return write_parts(len(profs), render, lambda i: [profs[i]["name"]], head, lambda g: None, _new_state,
+                       output_dir, max_lines=max_lines, max_bytes=max_bytes, dialect=dialect)
+
+def _resolve_workers(workers: int | None) -> int:
+    n = WORKERS if workers is None else workers
+    return (os.cpu_count() or 1) if n == 0 else max(1, n)
+
+def generate_all_profiles(
+    df: pd.DataFrame | Iterable[Dict],
+    output_dir: str,
+    one_file: bool = False,
+    schedule: bool = False,
+    workers: int | None = None,
+    sink: GCodeSink | None = None,
+    subprograms: bool = False,
+    dialect: str | None = None,
+    max_lines: int | None = None,
+    max_bytes: int | None = None,
+) -> str | None:
+    """
+    Schrijf .tap-output voor alle profielen in df (uitvoer van extract_holes).
+      - schedule: één job-bestand met klemplaatsen en één rotatie per groep (altijd serieel)
+      - one_file: alle profielprogramma's in all_profiles.tap, in df-volgorde
+      - anders: één bestand per profiel
+    workers > 1 verdeelt het werk over een ProcessPoolExecutor (0 = alle cores).
+    sink: stream de gebundelde job naar deze sink (bv. StreamSink(sys.stdout)) i.p.v.
+    naar all_profiles.tap; impliceert one_file. De sink wordt niet gesloten.
+    df mag ook een iterable van records zijn (bv. holes.iter_profile_records); per
+    profiel en serieel wordt die dan profiel voor profiel verwerkt.
+    subprograms: serieproductie in één bestand; identieke profielen (pattern_key)
+    één keer als O-blok, aangeroepen met M98 P.. L<qty> (zie _emit_series).
+    dialect: besturing voor cncapp.post (None = config.POST_DIALECT); alle uitvoer
+    gaat door een PostSink die herhaalde modale woorden weglaat.
+    max_lines/max_bytes: budget per bestand voor one_file/schedule (None = config
+    SPLIT_MAX_*, 0 = geen limiet). Bij een budget volgen all_profiles_001.tap, ... en
+    all_profiles_index.json (pad daarvan wordt teruggegeven). Niet voor subprograms
+    (de O-blokken horen bij het hoofdprogramma) en niet voor een sink.
+    """
+    bundled = schedule or one_file or subprograms or sink is not None
+    if not _is_frame(df):
+        if not bundled and _resolve_workers(workers) <= 1:
+            path = None
+            for r in df:
+                path = generate_gcode_for_profile(r, output_dir, dialect)
+            return path
+        rows = list(df)
+    else:
+        rows = df.to_dict("records")
+    n_workers = min(_resolve_workers(workers), max(1, len(rows)))
+    chunk = max(1, len(rows) // (n_workers * 4))
+
+    if bundled:
+        budget = resolve_budget(max_lines, max_bytes)
+        if any(budget) and sink is None and (schedule or not subprograms):
+            return _write_split(rows, output_dir, schedule, *budget, dialect)
+        if subprograms and not schedule:
+            emit = lambda g: _emit_series(g, series_plan(rows))
+        else:
+            emit = lambda g: _emit_bundle(g, rows, schedule, n_workers, chunk)
+        if sink is not None:
+            emit(PostSink(sink, dialect))  # niet sluiten: de sink is van de aanroeper
+            return None
         p = os.path.join(output_dir, "all_profiles.tap")
-        with open(p, "w", encoding="ascii", errors="ignore") as f:
-            f.write("\n".join(g_all) + "\n")
+        with PostSink(FileSink(p), dialect) as g:
+            emit(g)
         return p
     else:
-        last = None
-        for _, r in df.iterrows():
-            last = generate_gcode_for_profile(dict(r), output_dir)
-        return last
+        if n_workers > 1:
+            with ProcessPoolExecutor(max_workers=n_workers) as ex:
+                paths = list(ex.map(generate_gcode_for_profile, rows, [output_dir] * len(rows),
+                                    [dialect] * len(rows), chunksize=chunk))
+        else:
+            paths = [generate_gcode_for_profile(r, output_dir, dialect) for r in rows]
+        return paths[-1] if paths else None
+
+def _cycle_mode() -> str:
+    return "canned" if DRILL_CYCLE != "explicit" else APPROACH_MODE
+
+def _side_cycle_seconds(side_map: Dict[str, Side], side_height: float, mode: str,
+                        memo: Dict | None = None) -> float:
+    """
+    Z-cyclustijd van een zijde. memo: (hoogte, modus, d, eerste, laatste) -> s,
+    gedeeld over alle profielen (weinig unieke diameters, veel gaten).
+    """
+    zc = side_height + Z_CLEAR_ADD
+    memo = {} if memo is None else memo
+    total = 0.0
+    for side in side_map.values():
+        last = len(side) - 1
+        for i, d in enumerate(side.d):
+            key = (side_height, mode, d, i == 0, i == last)
+            t = memo.get(key)
+            if t is None:
+                tool = resolve_tool(d)
+                t = memo[key] = _hole_cycle_seconds(side_height, zc, i == 0, i == last, mode,
+                                                    tool["feed_soft"], tool["feed_drill"])
+            total += t
+    return total
+
+def estimate_cycle_saving(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Schat per profiel de Z-cyclustijd (aanloop + boren + terugtrekken) in de
+    oude 'legacy'-modus en in de huidige modus (APPROACH_MODE of canned
+    DRILL_CYCLE), plus de besparing.
+    XY-ijlgangen vallen buiten deze schatting (die zijn in beide modi gelijk).
+    """
+    import pandas as pd
+    records = []
+    memo: Dict = {}
+    for r in (df.to_dict("records") if _is_frame(df) else df):
+        prof = _profile_from_row(r)
+        ptype = prof["ptype"]
+        t_legacy = 0.0
+        t_new = 0.0
+        n_holes = 0
+        for grp, side_map in prof["groups"].items():
+            side_height = resolve_side_height(ptype, None, "TOP" if grp == "TOP" else "SIDE")
+            t_legacy += _side_cycle_seconds(side_map, side_height, "legacy", memo)
+            t_new += _side_cycle_seconds(side_map, side_height, _cycle_mode(), memo)
+            n_holes += _side_total(side_map)
+        records.append({
+            "profile_name": prof["name"],
+            "gaten": n_holes,
+            "t_legacy_s": round(t_legacy, 1),
+            "t_nieuw_s": round(t_new, 1),
+            "besparing_s": round(t_legacy - t_new, 1),
+        })
+    return pd.DataFrame.from_records(records, columns=["profile_name", "gaten", "t_legacy_s", "t_nieuw_s", "besparing_s"])
@@ -1,8 +1,13 @@
 from __future__ import annotations
 import re
-import json
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from cncapp.cache import cached
+from cncapp.config import DEFAULT_SIDE
+from cncapp.excel_import import CutlistBlock, iter_profile_blocks
+from cncapp.model import Profile, Side
 
 HOLE_RE = re.compile(r"\s*(\d+(?:\.\d+)?)\s*@\s*(\d+(?:\.\d+)?)\s*")
 
@@ -32,27 +37,24 @@ def _std_side_label(s: str) -> str:
     tail = s.replace("BOVENKANT", "").replace("ZIJKANT", "").strip().replace(" ", "")
     return f"{part}_{tail}" if tail else part
 
-def _parse_holes_row(vals: List) -> List[Tuple[float, float]]:
-    holes: List[Tuple[float, float]] = []
-    for v in vals:
-        if pd.isna(v):
-            continue
-        m = HOLE_RE.match(str(v))
-        if m:
-            x = float(m.group(1))
-            d = float(m.group(2))
-            holes.append((x, d))
-    return holes
-
-def extract_holes(df: pd.DataFrame) -> pd.DataFrame:
+# Zelfde patroon als HOLE_RE, maar verankerd voor Series.str.extract (HOLE_RE.match-semantiek)
+HOLE_EXTRACT = r"^\s*(\d+(?:\.\d+)?)\s*@\s*(\d+(?:\.\d+)?)"
+
+def extract_holes(df: pd.DataFrame, serialize: bool = True) -> pd.DataFrame:
     """
     Leest de ruwe Excelstructuur (met kolom 'zijde' en de gatenkolommen rechts daarvan)
     en levert 1 rij per profiel met verzamelde gaten per zijde.
 
+    Een profielblok = een rij met profielnaam plus alle rijen tot de volgende naam.
+    Twee blokken met identieke headers blijven dus twee profielen; de tweede krijgt
+    de naam '<naam>_2' (zie unique_name), zodat hij zijn eigen .tap krijgt.
+    out.attrs['duplicates']: {naam: aantal blokken} voor namen die vaker voorkomen.
+
     Outputkolommen:
       - profile_name, profiel_type, orientatie, length_mm, qty
-      - holes_json (JSON met {SIDE_LABEL: [{"x":..,"d":..}, ...]})
-      - holes_flat (compacte string per zijde, bv. 'TOP_Y10: 390@4.3,711@4.3 | SIDE_Y10: ...')
+      - holes_json (JSON met {SIDE_LABEL: [{"x":..,"d":..}, ...]})            [serialize]
+      - holes_flat (compacte string per zijde, bv. 'TOP_Y10: 390@4.3,711@4.3 | SIDE_Y10: ...')  [serialize]
+      - profile (cncapp.model.Profile; dit object gebruikt de rest van de pipeline)
     """
     name_col = _find_col(df, HEADER_COLS_CANON["name"])
     type_col = _find_col(df, HEADER_COLS_CANON["type"])
@@ -64,80 +66,249 @@ def extract_holes(df: pd.DataFrame) -> pd.DataFrame:
     if not name_col or not len_col:
         raise ValueError("Benodigde kolommen ontbreken (profiel_naam/profile of length_mm/lengte_mm).")
 
-    # alle kolommen rechts van 'zijde' bevatten mogelijke gaten
-    possible_hole_cols: List[str] = []
+    # alle kolommen rechts van 'zijde' bevatten mogelijke gaten (als posities, robuust bij dubbele namen)
+    columns = list(df.columns)
     if side_col:
-        side_idx = list(df.columns).index(side_col)
-        possible_hole_cols = list(df.columns)[side_idx+1:]
+        side_idx = columns.index(side_col)
+        hole_pos = list(range(side_idx + 1, len(columns)))
     else:
         # fallback: alle kolommen die niet de headerkolommen zijn
         header_like = {c for c in [name_col, type_col, orient_col, len_col, qty_col] if c}
-        possible_hole_cols = [c for c in df.columns if c not in header_like]
+        hole_pos = [i for i, c in enumerate(columns) if c not in header_like]
 
-    # forward-fill van headerwaarden zodat subrijen dezelfde profielcontext krijgen
-    work = df.copy()
-    for c in [name_col, type_col, orient_col, len_col, qty_col]:
-        if c:
-            work[c] = work[c].ffill()
+    # forward-fill van headerwaarden zodat elk blok zijn profielcontext heeft
+    header_cols = [c for c in [name_col, type_col, orient_col, len_col, qty_col] if c]
+    work = df[header_cols].ffill()
 
     # qty normaliseren
     if qty_col:
         work[qty_col] = pd.to_numeric(work[qty_col], errors="coerce").fillna(1).astype(int)
 
+    # blokgrenzen: elke rij met een profielnaam start een nieuw blok (0 = rijen vóór de eerste header)
+    block = df[name_col].notna().cumsum().to_numpy()
+
+    # zijde-labels: één keer per unieke 'zijde'-waarde omzetten
+    # (een rij zonder zijde kan een pure header-rij zijn; die draagt geen gaten)
+    # zonder kolom 'zijde' hoort elke rij bij DEFAULT_SIDE
+    if side_col:
+        side_codes, side_uniques = pd.factorize(df[side_col])
+        labels = []
+        for v in side_uniques:
+            sv = str(v).strip()
+            labels.append(None if sv == "" or sv.lower().startswith("nan") else _std_side_label(sv))
+        labels.append(None)  # code -1 = lege cel
+        row_label = np.array(labels, dtype=object)[side_codes]
+    else:
+        row_label = np.full(len(df), _std_side_label(DEFAULT_SIDE), dtype=object)
+    row_ok = np.array([lbl is not None for lbl in row_label], dtype=bool)
+
+    # alle gatencellen in één keer: rij-voor-rij, kolom-voor-kolom (= volgorde in de sheet)
+    rows_idx = np.flatnonzero(row_ok)
     records = []
-    # we aggregeren per profielnaam + lengte (unieke header)
-    # subgroup = alle rijen tot het volgende profielheaderblok
-    # We nemen gewoon alle rijen met dezelfde ffilled name & len.
-    group_cols = [name_col, len_col]
-    if type_col: group_cols.append(type_col)
-    if orient_col: group_cols.append(orient_col)
-    if qty_col: group_cols.append(qty_col)
-
-    grouped = work.groupby(group_cols, dropna=False, sort=False)
-
-    for keys, g in grouped:
-        # headershow: alleen opnemen als er holes zijn
-        holes_by_side: Dict[str, List[Tuple[float, float]]] = {}
-
-        for _, row in g.iterrows():
-            side_val = str(row.get(side_col, "")).strip() if side_col else ""
-            if side_val == "" or side_val.lower().startswith("nan"):
-                # kan een pure header-rij zijn; die draagt geen gaten
-                continue
-            side_label = _std_side_label(side_val)
-            vals = [row.get(c, None) for c in possible_hole_cols]
-            parsed = _parse_holes_row(vals)
-            if parsed:
-                holes_by_side.setdefault(side_label, []).extend(parsed)
-
-        if not holes_by_side:
-            # geen gaten -> overslaan (zoals jij wilt)
-            continue
-
-        # bouw outputrij
-        key_map = dict(zip(group_cols, keys if isinstance(keys, tuple) else (keys,)))
-        rec = {
-            "profile_name": key_map.get(name_col),
-            "profiel_type": key_map.get(type_col),
-            "orientatie": key_map.get(orient_col),
-            "length_mm": float(key_map.get(len_col)) if key_map.get(len_col) is not None else None,
-            "qty": int(key_map.get(qty_col)) if key_map.get(qty_col) is not None else 1,
-        }
-
-        # json + compacte string
-        holes_json = {side: [{"x": x, "d": d} for (x, d) in lst] for side, lst in holes_by_side.items()}
-        rec["holes_json"] = json.dumps(holes_json, ensure_ascii=False)
-
-        flat_parts = []
-        for side, lst in holes_by_side.items():
-            flat = ",".join([f"{x:g}@{d:g}" for (x, d) in lst])
-            flat_parts.append(f"{side}: {flat}")
-        rec["holes_flat"] = " | ".join(flat_parts)
-
-        records.append(rec)
+    dupes: Dict[str, int] = {}
+    if len(rows_idx) and hole_pos:
+        cells = df.iloc[rows_idx, hole_pos].to_numpy(dtype=object)
+        flat = cells.ravel()
+        cell_row = np.repeat(rows_idx, len(hole_pos))
+        keep = ~pd.isna(flat)
+        parsed = pd.Series(flat[keep], dtype=object).astype(str).str.extract(HOLE_EXTRACT)
+        hit = parsed[0].notna().to_numpy()
+        xs = parsed[0].to_numpy()[hit].astype(np.float64)
+        ds = parsed[1].to_numpy()[hit].astype(np.float64)
+        hole_row = cell_row[keep][hit]
+    else:
+        xs = ds = np.empty(0, dtype=np.float64)
+        hole_row = np.empty(0, dtype=np.int64)
+
+    if len(hole_row):
+        hole_block = block[hole_row]
+        lbl_codes, lbl_uniques = pd.factorize(row_label[hole_row])
+        # groepeer per (blok, label); binnen een groep blijft de sheetvolgorde behouden
+        key = hole_block.astype(np.int64) * len(lbl_uniques) + lbl_codes
+        perm = np.argsort(key, kind="stable")
+        key_sorted = key[perm]
+        starts = np.flatnonzero(np.r_[True, key_sorted[1:] != key_sorted[:-1]])
+        ends = np.r_[starts[1:], len(key_sorted)]
+        # groepen in volgorde van eerste voorkomen (blok oplopend, zijden zoals in de sheet)
+        group_order = np.argsort(perm[starts], kind="stable")
 
+        first_row = {}  # blok -> eerste rij van het blok
+        for r in np.flatnonzero(np.r_[True, block[1:] != block[:-1]]):
+            first_row[block[r]] = r
+
+        # headerkolommen één keer als arrays (geen pandas-indexering per profiel)
+        hdr = {c: work[c].to_numpy(dtype=object) for c in header_cols}
+        profiles: Dict[int, Profile] = {}
+        for gi in group_order:
+            idx = perm[starts[gi]:ends[gi]]
+            b = int(key_sorted[starts[gi]] // len(lbl_uniques))
+            prof = profiles.get(b)
+            if prof is None:
+                r = first_row[b]
+                length = hdr[len_col][r]
+                prof = profiles[b] = Profile(
+                    hdr[name_col][r],
+                    hdr[type_col][r] if type_col else None,
+                    hdr[orient_col][r] if orient_col else None,
+                    float(length) if length is not None else None,
+                    int(hdr[qty_col][r]) if qty_col else 1,
+                )
+            label = lbl_uniques[lbl_codes[idx[0]]]
+            prof.sides[label] = Side.from_arrays(label, np.ascontiguousarray(xs[idx]), np.ascontiguousarray(ds[idx]))
+
+        seen: Dict[object, int] = {}
+        for b in sorted(profiles):
+            unique_name(profiles[b], seen, dupes)
+        records = [_profile_record(profiles[b], serialize) for b in sorted(profiles)]
+
+    out = _records_frame(records)
+    out.attrs["duplicates"] = dupes
+    return out
+
+def unique_name(prof: Profile, seen: Dict[object, int], dupes: Dict[str, int] | None = None) -> Profile:
+    """
+    Tweede, derde, ... blok met dezelfde profielnaam (in sheetvolgorde) wordt
+    '<naam>_2', '<naam>_3': anders overschrijft het ene .tap-bestand het andere.
+    seen: teller per naam over de sheet; dupes: {naam: aantal} voor de melding.
+    """
+    n = seen[prof.name] = seen.get(prof.name, 0) + 1
+    if n > 1:
+        if dupes is not None:
+            dupes[str(prof.name)] = n
+        prof.name = f"{prof.name}_{n}"
+    return prof
+
+def _profile_record(prof: Profile, serialize: bool) -> Dict:
+    rec = {
+        "profile_name": prof.name,
+        "profiel_type": prof.ptype,
+        "orientatie": prof.orient,
+        "length_mm": prof.length,
+        "qty": prof.qty,
+    }
+    # json + compacte string (optionele serialisatie)
+    if serialize:
+        rec["holes_json"] = prof.holes_json()
+        rec["holes_flat"] = prof.holes_flat()
+    rec["profile"] = prof
+    return rec
+
+def _records_frame(records: Iterable[Dict]) -> pd.DataFrame:
     out = pd.DataFrame.from_records(records)
     # sorteer optisch op profielnaam
     if "profile_name" in out.columns:
         out = out.sort_values(by=["profile_name"], kind="stable")
     return out.reset_index(drop=True)
+
+# --- Streaming: profielblokken uit excel_import.iter_profile_blocks ----------
+
+def _qty(v) -> int:
+    try:
+        return int(float(v))
+    except (TypeError, ValueError):
+        return 1
+
+def iter_profiles(blocks: Iterable[CutlistBlock], dupes: Dict[str, int] | None = None) -> Iterator[Profile]:
+    """
+    Zet profielblokken één voor één om naar Profile-objecten (zelfde parsing als
+    extract_holes, ook de '_2'-namen voor dubbele blokken). Blokken zonder gaten
+    worden overgeslagen. dupes: optionele dict, zie unique_name.
+    """
+    seen: Dict[object, int] = {}
+    labels: Dict[object, str | None] = {}  # 'zijde'-waarde -> label, één keer per unieke waarde
+    for block in blocks:
+        h = block.header
+        prof: Profile | None = None
+        for side, cells in block.rows:
+            label = labels.get(side, "")
+            if label == "":
+                sv = str(side).strip()
+                label = labels[side] = None if sv == "" or sv.lower().startswith("nan") else _std_side_label(sv)
+            if label is None:
+                continue
+            for v in cells:
+                if v is None:
+                    continue
+                m = HOLE_RE.match(str(v))
+                if not m:
+                    continue
+                if prof is None:
+                    length = h.get("lenmm")
+                    prof = Profile(h.get("name"), h.get("type"), h.get("orient"),
+                                   float(length) if length is not None else None,
+                                   _qty(h.get("qty")) if "qty" in h else 1)
+                prof.side(label).add(float(m.group(1)), float(m.group(2)))
+        if prof is not None:
+            yield unique_name(prof, seen, dupes)
+
+def iter_profile_records(path: str, sheet_name: str | int | None = 0, serialize: bool = False,
+                         info: Dict | None = None) -> Iterator[Dict]:
+    """
+    Records zoals extract_holes ze levert, maar gestreamd in sheetvolgorde (niet gesorteerd).
+    info krijgt ook 'duplicates' (zie unique_name).
+    """
+    dupes = info.setdefault("duplicates", {}) if info is not None else None
+    for prof in iter_profiles(iter_profile_blocks(path, sheet_name, info), dupes):
+        yield _profile_record(prof, serialize)
+
+def extract_holes_stream(path: str, sheet_name: str | int | None = 0, serialize: bool = True,
+                         cache: bool = False) -> pd.DataFrame:
+    """
+    Als extract_holes(read_cutlist(path)['df']), maar zonder de hele sheet als
+    DataFrame te laden: alleen de (compacte) profielen blijven in geheugen.
+    De gelezen sheetnaam staat in out.attrs['sheet_name'].
+    cache: het Profile-resultaat bewaren/hergebruiken via cncapp.cache; een warme
+    run leest het xlsx-bestand dan niet meer (alleen de inhoudshash).
+    """
+    def _load() -> pd.DataFrame:
+        info: Dict = {}
+        df = _records_frame(iter_profile_records(path, sheet_name, False, info))
+        df.attrs["sheet_name"] = info.get("sheet_name")
+        df.attrs["duplicates"] = info.get("duplicates", {})
+        return df
+
+    out = cached(path, sheet_name, "extract_holes", _load, enabled=cache)
+    return _serialized(out) if serialize else out
+
+def _serialized(out: pd.DataFrame) -> pd.DataFrame:
+    # JSON/compacte string uit het model afleiden, zelfde kolomvolgorde als extract_holes
+    if not out.empty:
+        pos = out.columns.get_loc("profile")
+        out.insert(pos, "holes_json", [p.holes_json() for p in out["profile"]])
+        out.insert(pos + 1, "holes_flat", [p.holes_flat() for p in out["profile"]])
+    return out
+
+def extract_holes_only(path: str, patterns: Iterable[str], sheet_name: str | int | None = 0,
+                       serialize: bool = True, index: bool = True, info: Dict | None = None) -> pd.DataFrame:
+    """
+    Als extract_holes_stream, maar alleen voor profielen waarvan de naam op een van
+    de patronen past (fnmatch, bv. 'Profiel 6*'). Met index=True komen de blokken
+    uit cncapp.blockindex: na de eerste run leest dit alleen die blokken.
+    index=False: de hele sheet streamen en filteren (geen bestanden in de cache).
+    info: zie blockindex.select_blocks (sheet_name, rebuilt, unmatched, spans).
+    """
+    from cncapp.blockindex import select_blocks, match_names
+
+    info = {} if info is None else info
+    if index:
+        blocks = select_blocks(path, sheet_name, patterns, info)
+    else:
+        patterns = list(patterns)
+        seen: Dict[str, None] = {}
+        spans: Dict[str, List[Tuple[int, int]]] = info.setdefault("spans", {})
+
+        def _filtered() -> Iterator[CutlistBlock]:
+            for block in iter_profile_blocks(path, sheet_name, info):
+                name = str(block.header.get("name"))
+                seen[name] = None
+                if match_names([name], patterns)[0]:
+                    spans.setdefault(name, []).append(block.span)
+                    yield block
+        blocks = _filtered()
+    dupes = info.setdefault("duplicates", {})
+    out = _records_frame(_profile_record(p, False) for p in iter_profiles(blocks, dupes))
+    out.attrs["duplicates"] = dupes
+    if not index:
+        info["unmatched"] = match_names(seen, patterns)[1]
+    out.attrs["sheet_name"] = info.get("sheet_name")
+    return _serialized(out) if serialize else out
@@ -0,0 +1,178 @@
+from __future__ import annotations
+# Incrementele rebuild: alleen .tap-bestanden herschrijven waarvan de invoer veranderd is
+import os, json, hashlib
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+from cncapp import config
+from cncapp.gcode_gen import generate_all_profiles, _is_frame, _profile_path, _write_atomic
+from cncapp.model import Profile, is_missing
+from cncapp.post import get_dialect
+from cncapp.split import resolve_budget, index_path, load_index
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+MANIFEST_NAME = ".cnc_manifest.json"
+MANIFEST_VERSION = 1
+
+# Broncode die de G-code bepaalt; een wijziging hierin maakt alle hashes ongeldig
+_CODE_MODULES = ("config.py", "gcode_gen.py", "pathopt.py", "schedule.py", "post.py", "split.py",
+                 "model.py", "writer.py", "tokens.py")
+
+def _config_fingerprint(dialect: str | None = None) -> str:
+    """Hash van alle HOOFDLETTER-constanten in cncapp.config, het dialect en de generatorbroncode."""
+    h = hashlib.sha256()
+    h.update(get_dialect(dialect).name.encode("ascii"))
+    consts = {k: getattr(config, k) for k in dir(config) if k.isupper()}
+    h.update(json.dumps(consts, sort_keys=True, default=str).encode("utf-8"))
+    pkg_dir = os.path.dirname(os.path.abspath(config.__file__))
+    for mod in _CODE_MODULES:
+        with open(os.path.join(pkg_dir, mod), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+def _normalised_holes(row: Dict) -> List[List]:
+    # in sheetvolgorde, zoals de generator ze krijgt: de padstrategie 'row' en de
+    # volgorde van zijde-labels binnen een opspanning hangen ervan af
+    prof = row.get("profile")
+    sides = prof.sides if isinstance(prof, Profile) else Profile.sides_from_holes(row.get("holes_json"))
+    return [[str(lbl), [[round(x, 6), round(d, 6)] for x, d in side]] for lbl, side in sides.items()]
+
+def profile_hash(row: Dict, fingerprint: str) -> str:
+    """
+    Inhoudshash van één profiel: alles wat de generator uit de rij leest (naam, type,
+    lengte, orientatie voor --schedule, gaten, zaagplan) plus de config/code-fingerprint.
+    """
+    length = row.get("length_mm")
+    orient = row.get("orientatie")
+    payload = {
+        "name": str(row.get("profile_name") or "Profiel"),
+        "type": str(row.get("profiel_type") or ""),
+        "orient": "" if orient is None or is_missing(orient) else str(orient),
+        "length": round(float(length), 6) if length is not None and not is_missing(length) else 0.0,
+        "holes": _normalised_holes(row),
+        "config": fingerprint,
+    }
+    if row.get("zaagplan"):
+        payload["cut"] = str(row["zaagplan"])
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+def load_manifest(output_dir: str) -> Dict:
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == MANIFEST_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "files": {}}
+
+def _save_manifest(output_dir: str, data: Dict):
+    _write_atomic(os.path.join(output_dir, MANIFEST_NAME), [json.dumps(data, indent=1, sort_keys=True)])
+
+def generate_incremental(
+    df: pd.DataFrame | Iterable[Dict],
+    output_dir: str,
+    one_file: bool = False,
+    schedule: bool = False,
+    workers: int | None = None,
+    force: bool = False,
+    subprograms: bool = False,
+    dialect: str | None = None,
+    max_lines: int | None = None,
+    max_bytes: int | None = None,
+    partial: bool = False,
+) -> Dict:
+    """
+    Als generate_all_profiles, maar slaat profielen met een ongewijzigde hash over.
+    Per-profielmodus: alleen nieuwe/gewijzigde .tap's schrijven, verouderde (uit
+    het manifest, niet meer in df) verwijderen. One-file/schedule/subprograms: het
+    bundelbestand alleen herschrijven als de hash over alle profielen veranderd is.
+
+    Met een budget (max_lines/max_bytes, zie generate_all_profiles) is het bundel-item
+    de index van de delen; rapport['parts'] bevat dan de paden van de delen.
+
+    df mag ook een lijst records zijn (bv. uit model.load_model): dan geen pandas nodig.
+
+    partial=True: df is een selectie (--only); bestanden van andere profielen blijven
+    staan en houden hun manifest-item. Alleen in de per-profielmodus.
+
+    Geeft rapport-dict terug: path, added, changed, unchanged, removed (lijsten met namen).
+    """
+    fp = _config_fingerprint(dialect)
+    rows = df.to_dict("records") if _is_frame(df) else list(df)
+    # ook met force: het manifest bepaalt welke bestanden verouderd zijn; force slaat alleen de hashvergelijking over
+    manifest = load_manifest(output_dir)
+    old_files: Dict[str, Dict] = dict(manifest.get("files", {}))
+    report: Dict = {"path": None, "added": [], "changed": [], "unchanged": [], "removed": []}
+
+    if partial and (one_file or schedule or subprograms):
+        raise ValueError("Een selectie van profielen kan alleen per profiel geschreven worden, niet gebundeld.")
+    if one_file or schedule or subprograms:
+        budget = resolve_budget(max_lines, max_bytes)
+        split = any(budget) and (schedule or not subprograms)
+        fname = os.path.basename(index_path(output_dir)) if split else "all_profiles.tap"
+        job = hashlib.sha256()
+        job.update(b"schedule" if schedule else (b"subprograms" if subprograms else b"one_file"))
+        if split:
+            job.update(repr(budget).encode("ascii"))
+        for r in rows:
+            job.update(profile_hash(r, fp).encode("ascii"))
+            if subprograms:
+                job.update(str(r.get("qty")).encode("ascii"))
+        key = job.hexdigest()
+        path = os.path.join(output_dir, fname)
+        prev = old_files.get(fname)
+        parts = [os.path.join(output_dir, p["file"]) for p in load_index(output_dir)["parts"]] if split else []
+        if prev and not force and prev.get("hash") == key and os.path.exists(path) and all(map(os.path.exists, parts)):
+            report["unchanged"].append(fname)
+        else:
+            generate_all_profiles(rows, output_dir, one_file=one_file, schedule=schedule, workers=workers,
+                                  subprograms=subprograms, dialect=dialect, max_lines=budget[0],
+                                  max_bytes=budget[1])
+            report["changed" if prev else "added"].append(fname)
+        report["path"] = path
+        if split:
+            report["parts"] = [os.path.join(output_dir, p["file"]) for p in load_index(output_dir)["parts"]]
+        new_files = {fname: {"name": fname, "hash": key}}
+        # per-profielbestanden uit een eerdere run blijven staan; alleen het manifest-item van de bundel telt
+        new_files.update({k: v for k, v in old_files.items() if k != fname})
+        _save_manifest(output_dir, {"version": MANIFEST_VERSION, "files": new_files})
+        return report
+
+    new_files: Dict[str, Dict] = {}
+    todo: List[int] = []
+    for i, r in enumerate(rows):
+        name = str(r.get("profile_name") or "Profiel")
+        fname = os.path.basename(_profile_path(output_dir, name))
+        key = profile_hash(r, fp)
+        new_files[fname] = {"name": name, "hash": key}
+        prev = old_files.get(fname)
+        if prev and not force and prev.get("hash") == key and os.path.exists(os.path.join(output_dir, fname)):
+            report["unchanged"].append(name)
+        else:
+            report["changed" if prev else "added"].append(name)
+            todo.append(i)
+
+    if todo:
+        report["path"] = generate_all_profiles([rows[i] for i in todo], output_dir, workers=workers, dialect=dialect)
+
+    # verouderde profielbestanden (stonden in het manifest, zitten niet meer in de cutlist)
+    bundles = ("all_profiles.tap", os.path.basename(index_path(output_dir)))
+    for fname, info in old_files.items():
+        if fname in new_files or fname in bundles:
+            continue
+        if partial:
+            new_files[fname] = info
+            continue
+        p = os.path.join(output_dir, fname)
+        if os.path.exists(p):
+            os.remove(p)
+        report["removed"].append(info.get("name", fname))
+    for fname in bundles:
+        if fname in old_files:
+            new_files[fname] = old_files[fname]
+
+    _save_manifest(output_dir, {"version": MANIFEST_VERSION, "files": new_files})
+    return report
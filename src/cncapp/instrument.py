@@ -0,0 +1,114 @@
+from __future__ import annotations
+# Meting per pijplijnstap: wandklok, CPU, geheugen en aantallen (main.py --profile)
+import os, sys, json, time, tracemalloc
+import cProfile
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+try:  # niet beschikbaar op Windows; dan alleen tracemalloc
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+def peak_rss_mb() -> float | None:
+    """Piek-RSS van dit proces tot nu toe (MB), of None als het platform dat niet kent."""
+    if resource is None:
+        return None
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux rapporteert kB, macOS bytes
+    return kb / 1e6 if sys.platform == "darwin" else kb / 1e3
+
+class Instrument:
+    """
+    Verzamelt metingen per stap. Gebruik:
+
+        inst = Instrument(enabled=True)
+        with inst.stage("inlezen") as st:
+            df = ...
+            st["rows"] = len(df)
+
+    Per stap: wall_s, cpu_s, rss_peak_mb (piek van het proces na de stap),
+    alloc_peak_mb (alleen met trace_alloc; tracemalloc vertraagt flink) en de
+    aantallen die de aanroeper in de stap-dict zet (rows, holes, lines, ...).
+    dump_dir: schrijf per stap een cProfile-dump (<dump_dir>/<nr>_<stap>.prof).
+    Uitgeschakeld kost een stap niets behalve een lege dict.
+    """
+
+    def __init__(self, enabled: bool = False, trace_alloc: bool = False, dump_dir: str | None = None):
+        self.enabled = enabled
+        self.trace_alloc = trace_alloc and enabled
+        self.dump_dir = dump_dir if enabled else None
+        self.stages: List[Dict] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict]:
+        info: Dict = {}
+        if not self.enabled:
+            yield info
+            return
+        prof = cProfile.Profile() if self.dump_dir else None
+        if self.trace_alloc:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+        w0, c0 = time.perf_counter(), time.process_time()
+        if prof:
+            prof.enable()
+        try:
+            yield info
+        finally:
+            if prof:
+                prof.disable()
+            rec: Dict = {
+                "stage": name,
+                "wall_s": time.perf_counter() - w0,
+                "cpu_s": time.process_time() - c0,
+                "rss_peak_mb": peak_rss_mb(),
+            }
+            if self.trace_alloc:
+                rec["alloc_peak_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+            rec.update(info)
+            if prof:
+                os.makedirs(self.dump_dir, exist_ok=True)
+                safe = "".join(ch if ch.isalnum() else "_" for ch in name)
+                rec["pstats"] = os.path.join(self.dump_dir, f"{len(self.stages) + 1:02d}_{safe}.prof")
+                prof.dump_stats(rec["pstats"])
+            self.stages.append(rec)
+
+    def close(self):
+        if self.trace_alloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def report(self) -> Dict:
+        """Machineleesbaar rapport (zelfde velden als de samenvatting)."""
+        return {
+            "python": sys.version.split()[0],
+            "pid": os.getpid(),
+            "total_wall_s": sum(s["wall_s"] for s in self.stages),
+            "total_cpu_s": sum(s["cpu_s"] for s in self.stages),
+            "stages": self.stages,
+        }
+
+    def write_json(self, path: str):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=1)
+
+    def summary(self) -> str:
+        """Tabel voor mensen: één regel per stap plus het totaal."""
+        from tabulate import tabulate
+        keys = ["stage", "wall_s", "cpu_s", "rss_peak_mb"]
+        if self.trace_alloc:
+            keys.append("alloc_peak_mb")
+        extra = []
+        for s in self.stages:
+            for k in s:
+                if k not in keys and k not in extra and k != "pstats":
+                    extra.append(k)
+        rows = [[s.get(k) for k in keys + extra] for s in self.stages]
+        rep = self.report()
+        rows.append(["totaal", rep["total_wall_s"], rep["total_cpu_s"]] + [None] * (len(keys) + len(extra) - 3))
+        return tabulate(rows, headers=keys + extra, tablefmt="github", floatfmt=".3f", missingval="")
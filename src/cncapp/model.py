@@ -0,0 +1,156 @@
+from __future__ import annotations
+# Compact in-memory gatenmodel: één Profile per profiel, één Side per zijde-label
+import json
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+class Side:
+    """
+    Gaten van één zijde-label (bv. 'TOP_Y10') als twee float-arrays.
+    Itereren levert (x, d)-tuples op, in invoervolgorde.
+    """
+    __slots__ = ("label", "x", "d")
+
+    def __init__(self, label: str, holes: Iterable[Tuple[float, float]] = ()):
+        self.label = label
+        self.x = array("d")
+        self.d = array("d")
+        for x, d in holes:
+            self.add(x, d)
+
+    @classmethod
+    def from_arrays(cls, label: str, x, d) -> "Side":
+        """Bouw een Side uit twee float64-buffers (array('d') of aaneengesloten numpy-array)."""
+        s = cls(label)
+        s.x.frombytes(memoryview(x).cast("B"))
+        s.d.frombytes(memoryview(d).cast("B"))
+        return s
+
+    def add(self, x: float, d: float):
+        self.x.append(float(x))
+        self.d.append(float(d))
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def __iter__(self) -> Iterator[Tuple[float, float]]:
+        return zip(self.x, self.d)
+
+    def __bool__(self) -> bool:
+        return len(self.x) > 0
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Side) and (self.label, self.x, self.d) == (other.label, other.x, other.d)
+
+    def __getstate__(self):
+        return (self.label, self.x, self.d)
+
+    def __setstate__(self, state):
+        self.label, self.x, self.d = state
+
+    def __repr__(self) -> str:
+        return f"Side({self.label!r}, {len(self)} gaten)"
+
+    def to_list(self) -> List[Dict[str, float]]:
+        return [{"x": x, "d": d} for x, d in self]
+
+class Profile:
+    """
+    Eén profiel met headervelden en gaten per zijde-label (volgorde van de sheet).
+    JSON ({label: [{"x":..,"d":..}]}) is alleen een optionele serialisatie.
+    """
+    __slots__ = ("name", "ptype", "orient", "length", "qty", "sides")
+
+    def __init__(self, name: str, ptype: str | None = None, orient=None,
+                 length: float | None = None, qty: int = 1, sides: Dict[str, Side] | None = None):
+        self.name = name
+        self.ptype = ptype
+        self.orient = orient
+        self.length = length
+        self.qty = qty
+        self.sides: Dict[str, Side] = sides if sides is not None else {}
+
+    def side(self, label: str) -> Side:
+        """Haal (of maak) de Side voor label."""
+        s = self.sides.get(label)
+        if s is None:
+            s = self.sides[label] = Side(label)
+        return s
+
+    @property
+    def hole_count(self) -> int:
+        return sum(len(s) for s in self.sides.values())
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Profile) and all(getattr(self, a) == getattr(other, a) for a in self.__slots__)
+
+    def __getstate__(self):
+        return tuple(getattr(self, a) for a in self.__slots__)
+
+    def __setstate__(self, state):
+        for a, v in zip(self.__slots__, state):
+            setattr(self, a, v)
+
+    def __repr__(self) -> str:
+        return f"Profile({self.name!r}, {len(self.sides)} zijden, {self.hole_count} gaten)"
+
+    # --- serialisatie ---
+    def holes_dict(self) -> Dict[str, List[Dict[str, float]]]:
+        return {lbl: s.to_list() for lbl, s in self.sides.items()}
+
+    def holes_json(self) -> str:
+        return json.dumps(self.holes_dict(), ensure_ascii=False)
+
+    def holes_flat(self) -> str:
+        return " | ".join(f"{lbl}: " + ",".join(f"{x:g}@{d:g}" for x, d in s) for lbl, s in self.sides.items())
+
+    @staticmethod
+    def sides_from_holes(holes) -> Dict[str, Side]:
+        """Zet een holes_json-string of -dict om naar {label: Side}."""
+        data = json.loads(holes) if isinstance(holes, str) else (holes or {})
+        return {lbl: Side(lbl, ((h["x"], h["d"]) for h in lst)) for lbl, lst in data.items()}
+
+    def to_dict(self) -> Dict:
+        return {"name": self.name, "ptype": self.ptype, "orient": self.orient,
+                "length": self.length, "qty": self.qty, "holes": self.holes_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Profile":
+        return cls(data["name"], data.get("ptype"), data.get("orient"), data.get("length"),
+                   int(data.get("qty") or 1), cls.sides_from_holes(data.get("holes")))
+
+    def to_record(self) -> Dict:
+        """Rij zoals extract_holes(serialize=False) die levert (kolomnamen van de cutlist)."""
+        return {"profile_name": self.name, "profiel_type": self.ptype, "orientatie": self.orient,
+                "length_mm": self.length, "qty": self.qty, "profile": self}
+
+def is_missing(v) -> bool:
+    """None/NaN/pd.NA, zonder pandas te importeren."""
+    if v is None:
+        return True
+    try:
+        return bool(v != v)
+    except TypeError:  # pd.NA: vergelijken geeft NA, bool() faalt
+        return True
+
+# --- Opgeslagen gatenmodel (JSON) ---------------------------------------------
+# Het resultaat van extract_holes zonder pandas/Excel: main.py --save-model / --model.
+
+MODEL_VERSION = 1
+
+def save_model(profiles: Iterable[Profile], path: str, **meta) -> str:
+    """Schrijf profielen (+ meta zoals bron, sheet, validatie) atomair als JSON."""
+    from cncapp.writer import FileSink
+    data = dict(meta, version=MODEL_VERSION, profiles=[p.to_dict() for p in profiles])
+    with FileSink(path) as f:
+        f.append(json.dumps(data))
+    return path
+
+def load_model(path: str) -> Tuple[List[Profile], Dict]:
+    """Lees een model van save_model: (profielen in opgeslagen volgorde, meta)."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != MODEL_VERSION:
+        raise ValueError(f"{path}: onbekende modelversie {data.get('version')!r}; sla het model opnieuw op.")
+    profiles = [Profile.from_dict(d) for d in data.pop("profiles")]
+    return profiles, data
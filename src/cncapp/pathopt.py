@@ -0,0 +1,156 @@
+from __future__ import annotations
+# Volgorde-optimalisatie van gaten binnen één zijde (BOVENKANT of ZIJKANT)
+from typing import Callable, Dict, Iterable, List, NamedTuple, Tuple
+
+from cncapp.config import (
+    RAPID_RATE_X, RAPID_RATE_Y, RAPID_RATE_Z, Z_CLEAR_ADD, Z_RETRACT_ADD,
+    APPROACH_MODE, Y_CLEAR, PATH_STRATEGY, TSP_MAX_POINTS
+)
+
+class PathHole(NamedTuple):
+    label: str   # rijlabel, bv. 'TOP_Y10'
+    y: float
+    x: float
+    d: float
+
+Point = Tuple[float, float]  # (x, y)
+Rows = List[Tuple[str, float, Iterable[Tuple[float, float]]]]  # [(label, y, [(x, d), ...]), ...]
+
+# Start- en eindpunt van een zijde: de kop parkeert op X0, Y_CLEAR
+HOME: Point = (0.0, Y_CLEAR)
+
+def _row_change_minutes() -> float:
+    # Bij een rijwissel gaat Z terug naar Zc i.p.v. het lage R-vlak (heen en terug)
+    if APPROACH_MODE == "rapid":
+        return 2.0 * (Z_CLEAR_ADD - Z_RETRACT_ADD) / RAPID_RATE_Z
+    return 0.0
+
+def move_minutes(a: Point, b: Point) -> float:
+    """G0-tijd (min) tussen twee XY-punten; assen bewegen gelijktijdig."""
+    return max(abs(b[0] - a[0]) / RAPID_RATE_X, abs(b[1] - a[1]) / RAPID_RATE_Y)
+
+def _dist(a: Point, b: Point) -> float:
+    return ((b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2) ** 0.5
+
+def _waypoints(order: List[PathHole], row_return_x0: bool) -> List[Point]:
+    pts: List[Point] = [HOME]
+    prev_label = None
+    for h in order:
+        if row_return_x0 and h.label != prev_label:
+            pts.append((0.0, h.y))
+        pts.append((h.x, h.y))
+        prev_label = h.label
+    pts.append(HOME)
+    return pts
+
+def path_stats(order: List[PathHole], row_return_x0: bool = False) -> Dict[str, float]:
+    """Ijlgang-afstand (mm) en -tijd (s) van een volgorde, inclusief rijwissels."""
+    pts = _waypoints(order, row_return_x0)
+    dist = sum(_dist(pts[i], pts[i + 1]) for i in range(len(pts) - 1))
+    minutes = sum(move_minutes(pts[i], pts[i + 1]) for i in range(len(pts) - 1))
+    rows = sum(1 for i in range(1, len(order)) if order[i].label != order[i - 1].label)
+    minutes += rows * _row_change_minutes()
+    return {"rapid_mm": dist, "rapid_s": minutes * 60.0}
+
+# --- Strategieën ---------------------------------------------------------
+
+def _order_rows(rows: Rows) -> List[PathHole]:
+    """Oude volgorde: rijen op Y, binnen de rij oplopend in X."""
+    out: List[PathHole] = []
+    for lbl, y, holes in rows:
+        for x, d in sorted(holes, key=lambda h: h[0]):
+            out.append(PathHole(lbl, y, x, d))
+    return out
+
+def _order_serpentine(rows: Rows) -> List[PathHole]:
+    """Boustrophedon: elke rij begint aan het uiteinde dat het dichtst bij de kop ligt."""
+    out: List[PathHole] = []
+    cur_x = HOME[0]
+    for lbl, y, holes in rows:
+        row = sorted((PathHole(lbl, y, x, d) for x, d in holes), key=lambda p: p.x)
+        if not row:
+            continue
+        if abs(row[-1].x - cur_x) < abs(row[0].x - cur_x):
+            row.reverse()
+        out.extend(row)
+        cur_x = row[-1].x
+    return out
+
+def _edge(a: PathHole | None, b: PathHole | None, row_pen: float) -> float:
+    pa = HOME if a is None else (a.x, a.y)
+    pb = HOME if b is None else (b.x, b.y)
+    t = move_minutes(pa, pb)
+    if a is not None and b is not None and a.label != b.label:
+        t += row_pen
+    return t
+
+def _order_tsp(rows: Rows) -> List[PathHole]:
+    """Nearest-neighbour vanaf HOME, daarna 2-opt over alle rijen van de zijde."""
+    todo = [PathHole(lbl, y, x, d) for lbl, y, holes in rows for x, d in holes]
+    row_pen = _row_change_minutes()
+    tour: List[PathHole] = []
+    cur: PathHole | None = None
+    while todo:
+        j = min(range(len(todo)), key=lambda k: _edge(cur, todo[k], row_pen))
+        cur = todo.pop(j)
+        tour.append(cur)
+
+    n = len(tour)
+    if n < 3 or n > TSP_MAX_POINTS:
+        return tour
+
+    # 2-opt met vaste start/eind (HOME); None staat voor HOME
+    path: List[PathHole | None] = [None] + tour + [None]
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n):
+            for k in range(i + 1, n + 1):
+                a, b = path[i - 1], path[i]
+                c, e = path[k], path[k + 1]
+                delta = (_edge(a, c, row_pen) + _edge(b, e, row_pen)) - (_edge(a, b, row_pen) + _edge(c, e, row_pen))
+                if delta < -1e-9:
+                    path[i:k + 1] = reversed(path[i:k + 1])
+                    improved = True
+    return [p for p in path if p is not None]
+
+STRATEGIES: Dict[str, Callable[[Rows], List[PathHole]]] = {
+    "row": _order_rows,
+    "serpentine": _order_serpentine,
+    "tsp": _order_tsp,
+}
+
+def register_strategy(name: str, fn: Callable[[Rows], List[PathHole]]):
+    """Voeg een eigen volgorde-strategie toe (bruikbaar via PATH_STRATEGY of order_side)."""
+    STRATEGIES[name] = fn
+
+def order_side(
+    rows: Rows,
+    strategy: str | None = None,
+) -> Tuple[List[PathHole], Dict[str, float | str]]:
+    """
+    Bepaal de boorvolgorde voor één zijde.
+    rows: [(label, y, Side of [(x, d), ...]), ...] gesorteerd op Y.
+    strategy: naam uit STRATEGIES of 'auto' (snelste van serpentine en tsp).
+    Geeft (volgorde, statistiek) terug; statistiek vergelijkt met de oude rij-volgorde.
+    """
+    strategy = strategy or PATH_STRATEGY
+    before = path_stats(_order_rows(rows), row_return_x0=True)
+
+    if strategy == "auto":
+        candidates = [(name, STRATEGIES[name](rows)) for name in ("serpentine", "tsp")]
+        strategy, order = min(candidates, key=lambda c: path_stats(c[1])["rapid_s"])
+    elif strategy in STRATEGIES:
+        order = STRATEGIES[strategy](rows)
+    else:
+        raise ValueError(f"Onbekende padstrategie: {strategy!r} (kies uit {sorted(STRATEGIES)} of 'auto').")
+
+    after = path_stats(order, row_return_x0=(strategy == "row"))
+    stats: Dict[str, float | str] = {
+        "strategy": strategy,
+        "rapid_mm_before": before["rapid_mm"],
+        "rapid_mm_after": after["rapid_mm"],
+        "rapid_s_before": before["rapid_s"],
+        "rapid_s_after": after["rapid_s"],
+    }
+    return order, stats
@@ -0,0 +1,449 @@
+from __future__ import annotations
+# Postprocessor: modale toestand bijhouden, overbodige woorden weglaten, dialect per besturing
+from typing import Dict, List, NamedTuple, Tuple
+
+from cncapp.config import POST_DIALECT, POST_SUPPRESS, tool_length
+from cncapp.writer import GCodeSink
+from cncapp.tokens import tokens
+
+Words = List[Tuple[str, str]]  # [(letter, waarde-string)], zoals gcode_gen ze schreef
+
+_MOTION = (0.0, 1.0, 80.0, 81.0, 82.0, 83.0)
+_CYCLES = (81.0, 82.0, 83.0)
+# niet-modaal: assen op zo'n regel nooit weglaten; behalve bij G4 is de positie daarna onbekend
+_NONMODAL = (4.0, 10.0, 28.0, 30.0, 53.0, 92.0)
+
+class _Line(NamedTuple):
+    """Eén geparste coderegel (zonder commentaar); gecachet, want regels herhalen zich veel."""
+    words: Tuple[Tuple[str, str, float, int], ...]  # (letter, waarde zoals geschreven, waarde, soort)
+    gs: Tuple[float, ...]
+    ms: Tuple[float, ...]
+    motion: float | None
+    axes: Dict[str, float]
+    absolute: bool | None      # G90/G91 op deze regel
+    nonmodal: bool
+    homes: bool                # G28/G92/..: positie daarna onbekend
+    feed: float | None
+    rpm: float | None
+    spindle: float | None      # M3/M4/M5
+    unknown: Tuple[str, ...]   # toestand die deze regel onbekend maakt: 'spindle', 'pos', 'Z'
+
+# soort per woord: wat _emit mag weglaten
+_KEEP, _AXIS, _MOVE, _FEED, _RPM, _SPINDLE = range(6)
+
+_PARSE_CACHE: Dict[str, _Line | None] = {}
+_PARSE_CACHE_MAX = 100_000
+
+def _kind(letter: str, f: float) -> int:
+    if letter in "XYZ":
+        return _AXIS
+    if letter == "G" and f in (0.0, 1.0):
+        return _MOVE
+    if letter == "F":
+        return _FEED
+    if letter == "S":
+        return _RPM
+    if letter == "M" and f in (3.0, 4.0, 5.0):
+        return _SPINDLE
+    return _KEEP
+
+def _split_words(code: str) -> List[Tuple[str, str, float]]:
+    """Snel pad voor spatiegescheiden woorden ('G1 Z-1.000 F150'); anders cncapp.tokens."""
+    out = []
+    for tok in code.upper().split():
+        l, v = tok[0], tok[1:]
+        if not ("A" <= l <= "Z") or not v or v[-1] not in "0123456789.":
+            break
+        try:
+            out.append((l, v, float(v)))
+        except ValueError:
+            break
+    else:
+        return out
+    return [(l, v, float(v)) for l, v in tokens(code.upper())]
+
+def _parse(code: str) -> _Line | None:
+    words = tuple((l, v, f, _kind(l, f)) for l, v, f in _split_words(code))
+    if not words:
+        return None
+    gs = tuple(f for l, _, f, _ in words if l == "G")
+    ms = tuple(f for l, _, f, _ in words if l == "M")
+    absolute = None
+    for g in gs:
+        if g in (90.0, 91.0):
+            absolute = g == 90.0
+    nonmodal = any(g in _NONMODAL for g in gs)
+    last = lambda letter: next((f for l, _, f, _ in reversed(words) if l == letter), None)
+    unknown = ()
+    if any(m in (0.0, 1.0, 6.0) for m in ms):
+        unknown += ("spindle",)
+    if 6.0 in ms:
+        unknown += ("pos",)
+    if any(g in (43.0, 49.0) for g in gs):
+        unknown += ("Z",)
+    line = _Line(words, gs, ms, next((g for g in gs if g in _MOTION), None),
+                 {l: f for l, _, f, _ in words if l in "XYZ"}, absolute,
+                 nonmodal, nonmodal and any(g != 4.0 for g in gs if g in _NONMODAL),
+                 last("F"), last("S"), next((m for m in reversed(ms) if m in (3.0, 4.0, 5.0)), None), unknown)
+    if len(_PARSE_CACHE) >= _PARSE_CACHE_MAX:
+        _PARSE_CACHE.clear()
+    _PARSE_CACHE[code] = line
+    return line
+
+def _nested_to_brackets(text: str) -> str:
+    """'(A (b))' -> '(A [b])': besturingen die geen geneste commentaarhaakjes kennen."""
+    inner = text[1:-1].replace("(", "[").replace(")", "]")
+    return f"({inner})"
+
+class Dialect:
+    """
+    Syntaxis van één besturing. De standaard is Mach3 (zoals gcode_gen schrijft);
+    subklassen overschrijven alleen wat anders is.
+      subs_first    subprogramma's vóór het hoofdprogramma (definitie vóór aanroep)
+      inline_subs   geen subprogramma's: elke M98-aanroep wordt uitgeschreven
+      expand_cycles geen G81/G82/G83: boorcycli worden G0/G1-bewegingen
+      rewrites      translate() aanroepen voor elke regel
+      drop_words    woorden die de besturing niet kent (bv. 'G91.1')
+    """
+    name = "mach3"
+    subs_first = False
+    inline_subs = False
+    expand_cycles = False
+    rewrites = False
+    drop_words: Tuple[str, ...] = ()
+
+    def comment(self, text: str) -> str:
+        return text
+
+    def sub_start(self, o: int) -> List[str]:
+        return [f"O{o}"]
+
+    def sub_end(self, o: int) -> List[str]:
+        return ["M99"]
+
+    def call(self, o: int, n: int) -> List[str]:
+        return [f"M98 P{o} L{n}"]
+
+    def translate(self, words: Words) -> List[str] | None:
+        """Regel omzetten naar 0..n regels (code of '(commentaar)'); None = ongewijzigd."""
+        if any(l + v in self.drop_words for l, v in words):
+            return [" ".join(l + v for l, v in words if l + v not in self.drop_words)]
+        return None
+
+class Mach3(Dialect):
+    pass
+
+class LinuxCNC(Dialect):
+    """O-woord-subroutines (o100 sub/endsub/call), geen geneste commentaren."""
+    name = "linuxcnc"
+    subs_first = True
+
+    def comment(self, text: str) -> str:
+        return _nested_to_brackets(text)
+
+    def sub_start(self, o: int) -> List[str]:
+        return [f"o{o} sub"]
+
+    def sub_end(self, o: int) -> List[str]:
+        return [f"o{o} endsub"]
+
+    def call(self, o: int, n: int) -> List[str]:
+        if n == 1:
+            return [f"o{o} call"]
+        return [f"o<herhaal{o}> repeat [{n}]", f"o{o} call", f"o<herhaal{o}> endrepeat"]
+
+class Grbl(Dialect):
+    """
+    GRBL 1.1: geen subprogramma's, canned cycles, G91.1, G43 H of automatische
+    gereedschapswissel. Een wissel wordt een M0-stop met commentaar.
+
+    Lengtecorrectie: G43 H<n> wordt G43.1 Z<lengte> als TOOL_TABLE een 'length'
+    voor T<n> heeft (t.o.v. het gereedschap waarmee Z genuld is). Zonder lengte
+    kan GRBL niet corrigeren: de operator moet Z na de wissel opnieuw nullen; dat
+    staat als commentaar vóór de M0.
+    """
+    name = "grbl"
+    subs_first = True
+    inline_subs = True
+    expand_cycles = True
+    rewrites = True
+    drop_words = ("G91.1",)
+
+    def comment(self, text: str) -> str:
+        return _nested_to_brackets(text)
+
+    def translate(self, words: Words) -> List[str] | None:
+        if ("M", "6") in words:
+            tool = next((v for l, v in words if l == "T"), "?")
+            out = [f"(WISSEL HANDMATIG NAAR T{tool})"]
+            if _length(tool) is None:
+                out.append(f"(NUL Z OPNIEUW MET T{tool}: GEEN LENGTE IN TOOL_TABLE)")
+            return out + ["M0"]
+        if ("G", "43") in words:  # alleen G43.1 (dynamische lengte) bestaat
+            length = _length(next((v for l, v in words if l == "H"), ""))
+            rest = [(l, v) for l, v in words if l != "H" and (l, v) != ("G", "43")]
+            out = [f"G43.1 Z{length:.3f}"] if length is not None else []
+            return out + ([" ".join(l + v for l, v in rest)] if rest else [])
+        return super().translate(words)
+
+def _length(tool: str) -> float | None:
+    try:
+        return tool_length(int(float(tool)))
+    except ValueError:
+        return None
+
+DIALECTS: Dict[str, Dialect] = {d.name: d for d in (Mach3(), LinuxCNC(), Grbl())}
+
+def get_dialect(name: str | None = None) -> Dialect:
+    key = (name or POST_DIALECT).lower()
+    if key not in DIALECTS:
+        raise ValueError(f"Onbekend dialect {name!r}; kies uit {', '.join(DIALECTS)}.")
+    return DIALECTS[key]
+
+class PostSink(GCodeSink):
+    """
+    Zit tussen de emitters en de echte sink. Houdt de modale toestand bij
+    (bewegingsmodus, G90/G91, positie per as, F, S, spindel) en schrijft alleen
+    woorden die iets veranderen: 'G1' na een G1, 'F150' als F al 150 is, 'X0.000'
+    als X al 0 is; een regel zonder overgebleven woorden vervalt. Daarna zet het
+    dialect de regel om (commentaar, subprogramma's, boorcycli, wissels).
+
+    Veilig blijven gaat voor kort zijn: na G28/G92, M6, G43/G49, M98/M99, een
+    O-blok of M30 is de betrokken toestand onbekend en wordt alles weer geschreven;
+    assen in G91 of in een boorcyclus worden nooit weggelaten.
+    close()/abort() gaan door naar de onderliggende sink.
+    """
+
+    def __init__(self, inner, dialect: str | Dialect | None = None, suppress: bool | None = None):
+        self.inner = inner
+        self.dialect = dialect if isinstance(dialect, Dialect) else get_dialect(dialect)
+        self.suppress = POST_SUPPRESS if suppress is None else suppress
+        self.subs_first = self.dialect.subs_first
+        self._plain = not (self.dialect.expand_cycles or self.dialect.rewrites)
+        self._subs: Dict[int, List[str]] = {}
+        self._capture: List[str] | None = None
+        self._sub: int | None = None
+        self._reset()
+
+    def _reset(self):
+        self.motion: float | None = None
+        self.absolute = True
+        self.pos: Dict[str, float | None] = {"X": None, "Y": None, "Z": None}
+        self.feed: float | None = None
+        self.rpm: float | None = None
+        self.spindle: float | None = None
+        # boorcyclus zoals de emitter hem schreef (voor expand_cycles)
+        self.cycle: Dict[str, float] = {"Z": 0.0, "R": 0.0, "Q": 0.0, "P": 0.0}
+        self.cycle_code: float | None = None
+        self.cycle_feed: str | None = None
+        self.cycle_r = True
+        self.cycle_z0: float | None = None
+
+    # --- sink-interface ---
+    def append(self, line: str):
+        s = line.strip()
+        if self._capture is not None and not s.upper().startswith("M99"):
+            self._capture.append(line)
+            return
+        if not s:
+            self._out(line)
+            return
+        code, comment = s, ""
+        if "(" in s:
+            i = s.index("(")
+            code, comment = s[:i].rstrip(), self.dialect.comment(s[i:])
+            if not code:
+                self._out(comment)
+                return
+        p = _PARSE_CACHE.get(code) or _parse(code)
+        if p is None:
+            self._out(s)
+            self._reset()
+            return
+        if (p.ms or p.words[0][0] == "O") and self._structural(p, comment):
+            return
+        if self._plain:
+            self._emit(p, comment)
+        else:
+            self._line(p, comment)
+
+    def close(self):
+        self.inner.close()
+
+    def abort(self):
+        getattr(self.inner, "abort", self.inner.close)()
+
+    def _out(self, line: str):
+        self.inner.append(line)
+        self.lines_written += 1
+
+    # --- subprogramma's en programma-einde ---
+    def _structural(self, p: _Line, comment: str) -> bool:
+        if p.words[0][0] == "O" and len(p.words) == 1:
+            self._sub = int(p.words[0][2])
+            self._reset()
+            if self.dialect.inline_subs:
+                self._capture = self._subs.setdefault(self._sub, [])
+            else:
+                self._lines(self.dialect.sub_start(self._sub), comment)
+            return True
+        if 99.0 in p.ms:
+            if self._capture is not None:
+                self._capture = None
+            else:
+                self._lines(self.dialect.sub_end(self._sub), comment)
+            self._sub = None
+            self._reset()
+            return True
+        if 98.0 in p.ms:
+            w = {l: f for l, _, f, _ in p.words}
+            o, n = int(w.get("P", 0)), int(w.get("L", 1))
+            if self.dialect.inline_subs:
+                if comment:
+                    self._out(comment)
+                for _ in range(n):
+                    for sub_line in self._subs.get(o, ()):
+                        self.append(sub_line)
+            else:
+                self._lines(self.dialect.call(o, n), comment)
+                self._reset()
+            return True
+        if 30.0 in p.ms or 2.0 in p.ms:
+            self._emit(p, comment)
+            self._reset()
+            return True
+        return False
+
+    def _lines(self, lines: List[str], comment: str):
+        for i, line in enumerate(lines):
+            self._out(f"{line} {comment}" if comment and i == 0 else line)
+
+    # --- gewone regels ---
+    def _line(self, p: _Line, comment: str):
+        d = self.dialect
+        if d.expand_cycles:
+            for g in p.gs:
+                if g in (98.0, 99.0):
+                    self.cycle_r = g == 99.0
+                elif g in _MOTION:
+                    self.cycle_code = g if g in _CYCLES else None
+            if self.cycle_code is not None:
+                self._expand_cycle(p, comment)
+                return
+        out = d.translate([(l, v) for l, v, _, _ in p.words]) if d.rewrites else None
+        if out is None:
+            self._emit(p, comment)
+            return
+        if not out and comment:
+            self._out(comment)
+        for i, code in enumerate(out):
+            if code.startswith("("):
+                self._out(d.comment(code))
+            else:
+                q = _PARSE_CACHE.get(code) or _parse(code)
+                if q is not None:
+                    self._emit(q, comment if i == 0 else "")
+
+    def _emit(self, p: _Line, comment: str = ""):
+        """Schrijf de regel zonder de woorden die de modale toestand al heeft."""
+        absolute = self.absolute if p.absolute is None else p.absolute
+        new_motion = self.motion if p.motion is None else p.motion
+        axes = p.axes
+        pos = self.pos
+
+        if self.suppress:
+            same = ()
+            if axes and absolute and not p.nonmodal and new_motion in (0.0, 1.0):
+                same = [a for a, v in axes.items() if pos[a] == v]
+            moves = len(same) < len(axes)
+            # 'G0 Z43.000' terwijl Z al 43 is: ook de G0 valt weg, de modus blijft wat hij was
+            idle = bool(axes) and not moves and not p.nonmodal
+            if idle:
+                new_motion = self.motion
+            drop_move = not p.nonmodal and (idle or (p.motion == self.motion and moves))
+            out = []
+            for l, v, f, k in p.words:
+                if k and ((k == _AXIS and l in same) or (k == _MOVE and drop_move)
+                          or (k == _FEED and f == self.feed) or (k == _RPM and f == self.rpm)
+                          or (k == _SPINDLE and f == self.spindle)):
+                    continue
+                out.append(l + v)
+        else:
+            out = [l + v for l, v, _, _ in p.words]
+
+        # toestand bijwerken
+        self.absolute = absolute
+        self.motion = new_motion
+        if p.homes:
+            for a in (axes or pos):
+                pos[a] = None
+        elif new_motion in _CYCLES:
+            for a in "XY":
+                if a in axes:
+                    pos[a] = axes[a] if absolute else None
+            pos["Z"] = None
+        else:
+            for a, v in axes.items():
+                pos[a] = v if absolute else None
+        if p.feed is not None:
+            self.feed = p.feed
+        if p.rpm is not None:
+            self.rpm = p.rpm
+        if p.spindle is not None:
+            self.spindle = p.spindle
+        for what in p.unknown:
+            if what == "spindle":
+                self.spindle = None
+            elif what == "pos":
+                self.pos = dict.fromkeys(pos)
+            else:
+                pos["Z"] = None
+
+        if out:
+            self._out(" ".join(out) + (f" {comment}" if comment else ""))
+        elif comment:
+            self._out(comment)
+
+    def _code(self, code: str):
+        self._emit(_PARSE_CACHE.get(code) or _parse(code))
+
+    def _expand_cycle(self, p: _Line, comment: str):
+        """G81/G82/G83 uitschrijven als G0/G1 (G83: pecken met volledige terugtrek naar R)."""
+        axes = p.axes
+        for l, v, f, _ in p.words:
+            if l in "RQP":
+                self.cycle[l] = f
+            elif l == "F":
+                self.cycle_feed = v
+        if "Z" in axes:
+            self.cycle["Z"] = axes["Z"]
+        if any(g in _CYCLES for g in p.gs) or self.cycle_z0 is None:
+            self.cycle_z0 = self.pos["Z"] if self.pos["Z"] is not None else self.cycle["R"]
+        if comment:
+            self._out(comment)
+        if not axes:
+            return
+        r, z, q = self.cycle["R"], self.cycle["Z"], self.cycle["Q"]
+        feed = f" F{self.cycle_feed}" if self.cycle_feed else ""
+        xy = " ".join(f"{a}{axes[a]:.3f}" for a in "XY" if a in axes)
+        if xy:
+            self._code(f"G0 {xy}")
+        self._code(f"G0 Z{r:.3f}")
+        steps = []
+        depth = r
+        if self.cycle_code == 83.0 and q > 0:
+            while depth - q > z:
+                depth -= q
+                steps.append(depth)
+        steps.append(z)
+        for i, target in enumerate(steps):
+            if i:
+                # terug naar net boven de vorige diepte, dan verder boren
+                self._code(f"G0 Z{steps[i - 1] + 0.5:.3f}")
+            self._code(f"G1 Z{target:.3f}{feed}")
+            if target != z:
+                self._code(f"G0 Z{r:.3f}")
+        if self.cycle_code == 82.0 and self.cycle["P"] > 0:
+            self._code(f"G4 P{self.cycle['P']:g}")
+        retract = r if self.cycle_r else max(r, self.cycle_z0)
+        self._code(f"G0 Z{retract:.3f}")
@@ -0,0 +1,51 @@
+from __future__ import annotations
+# Job-planning: profielen over klemplaatsen verdelen en per opspanning één zijde boren
+from typing import Dict, List, NamedTuple, Tuple
+
+from cncapp.config import FIXTURE_Y_OFFSETS, ORIENT_SIDE_UP
+
+class Slot(NamedTuple):
+    y_offset: float         # Y-offset van de klemplaats
+    profile: Dict           # profieldict zoals gebruikt door gcode_gen (name, ptype, length, groups)
+    faces: Tuple[str, ...]  # zijden in volgorde van opspanning: ('TOP',), ('SIDE',) of beide
+
+def faces_needed(groups: Dict[str, Dict]) -> List[str]:
+    """Welke zijden heeft een profiel nodig? OTHER wordt als ZIJKANT geboord."""
+    faces = []
+    if groups.get("TOP"):
+        faces.append("TOP")
+    if groups.get("SIDE") or groups.get("OTHER"):
+        faces.append("SIDE")
+    return faces
+
+def _side_up_first(orient) -> bool:
+    s = str(orient or "").strip().lower()
+    return bool(s) and s != "nan" and s.startswith(ORIENT_SIDE_UP)
+
+def face_order(groups: Dict[str, Dict], orient=None) -> Tuple[str, ...]:
+    """
+    Volgorde van de zijden voor één profiel:
+      - maar één zijde nodig -> die zijde ligt meteen boven (geen rotatie)
+      - twee zijden -> 'orientatie' bepaalt welke eerst boven ligt (default BOVENKANT)
+    """
+    faces = faces_needed(groups)
+    if len(faces) == 2 and _side_up_first(orient):
+        faces.reverse()
+    return tuple(faces)
+
+def plan_job(profiles: List[Dict], y_offsets: List[float] | None = None) -> List[List[Slot]]:
+    """
+    Verdeel profielen in groepen van len(y_offsets) klemplaatsen.
+    Per groep: opspanning 1 boort faces[0] van elk profiel, daarna één M0
+    en opspanning 2 boort faces[1] van de profielen die twee zijden nodig hebben.
+    """
+    offsets = list(y_offsets if y_offsets is not None else FIXTURE_Y_OFFSETS) or [0.0]
+    todo = [p for p in profiles if face_order(p["groups"], p.get("orient"))]
+    groups: List[List[Slot]] = []
+    for i in range(0, len(todo), len(offsets)):
+        chunk = todo[i:i + len(offsets)]
+        groups.append([Slot(off, p, face_order(p["groups"], p.get("orient"))) for off, p in zip(offsets, chunk)])
+    return groups
+
+def needs_rotation(group: List[Slot]) -> bool:
+    return any(len(s.faces) > 1 for s in group)
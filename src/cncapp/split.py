@@ -0,0 +1,129 @@
+from __future__ import annotations
+# Gebundelde job in genummerde delen schrijven, elk onder een regel-/bytebudget
+import os, json
+from typing import Callable, Dict, List, Tuple
+
+from cncapp.config import SPLIT_MAX_LINES, SPLIT_MAX_BYTES
+from cncapp.post import PostSink, get_dialect
+from cncapp.writer import FileSink
+
+INDEX_SUFFIX = "_index.json"
+
+def resolve_budget(max_lines: int | None = None, max_bytes: int | None = None) -> Tuple[int, int]:
+    """(regels, bytes) per deel; None = config, 0 = geen limiet."""
+    lines = SPLIT_MAX_LINES if max_lines is None else max_lines
+    size = SPLIT_MAX_BYTES if max_bytes is None else max_bytes
+    return max(0, int(lines or 0)), max(0, int(size or 0))
+
+def index_path(output_dir: str, stem: str = "all_profiles") -> str:
+    return os.path.join(output_dir, f"{stem}{INDEX_SUFFIX}")
+
+def part_path(output_dir: str, stem: str, k: int) -> str:
+    return os.path.join(output_dir, f"{stem}_{k:03d}.tap")
+
+def load_index(output_dir: str, stem: str = "all_profiles") -> Dict:
+    try:
+        with open(index_path(output_dir, stem), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"parts": []}
+
+def _nbytes(lines: List[str]) -> int:
+    # FileSink schrijft ascii met '\n' per regel
+    return sum(len(s) for s in lines) + len(lines)
+
+def _post(lines: List[str], dialect) -> List[str]:
+    """Postprocessor met een lege modale toestand: elk stuk staat op zichzelf."""
+    out: List[str] = []
+    PostSink(out, dialect).extend(lines)
+    return out
+
+def write_parts(
+    n_units: int,
+    render: Callable[[int, List[str], Dict], None],
+    names: Callable[[int], List[str]],
+    head: Callable[[List[str], int], None],
+    foot: Callable[[List[str]], None],
+    new_state: Callable[[], Dict],
+    output_dir: str,
+    stem: str = "all_profiles",
+    max_lines: int = 0,
+    max_bytes: int = 0,
+    dialect: str | None = None,
+) -> str:
+    """
+    Schrijf een job als <stem>_001.tap, <stem>_002.tap, ... plus <stem>_index.json.
+    De job bestaat uit n_units veilige eenheden (een profiel, of een opspanning
+    die met een M0 begint); alleen tussen eenheden wordt gesplitst.
+      - render(i, g, state): G-code van eenheid i; state loopt door binnen een deel
+      - names(i): profielnamen in eenheid i (voor de index)
+      - head(g, k) / foot(g): begin en einde van deel k (preamble, M30)
+    Een nieuw deel start met new_state(): de eenheid wordt opnieuw gerenderd, zodat
+    gereedschapswissel en toerental in het deel zelf staan. Eén eenheid groter dan
+    het budget krijgt een eigen deel ("over_budget" in de index).
+    Delen uit een vorige run die niet meer bestaan, worden verwijderd.
+    Geeft het pad van de index terug.
+    """
+    def fits(n: int, b: int) -> bool:
+        return (not max_lines or n <= max_lines) and (not max_bytes or b <= max_bytes)
+
+    tail = []
+    foot(tail)
+    tail = _post(tail, dialect)
+    parts: List[Dict] = []
+    sink: FileSink | None = None
+    state = new_state()
+
+    def _write(lines: List[str]):
+        sink.extend(lines)
+        parts[-1]["lines"] += len(lines)
+        parts[-1]["bytes"] += _nbytes(lines)
+
+    def _close():
+        _write(tail)
+        sink.close()
+        parts[-1]["over_budget"] = not fits(parts[-1]["lines"], parts[-1]["bytes"])
+
+    try:
+        for i in range(n_units):
+            body: List[str] = []
+            render(i, body, state)
+            body = _post(body, dialect)
+            if sink is not None and parts[-1]["units"] and not fits(
+                    parts[-1]["lines"] + len(body) + len(tail),
+                    parts[-1]["bytes"] + _nbytes(body) + _nbytes(tail)):
+                _close()
+                sink = None
+                state = new_state()
+                body = []
+                render(i, body, state)
+                body = _post(body, dialect)
+            if sink is None:
+                k = len(parts) + 1
+                path = part_path(output_dir, stem, k)
+                parts.append({"file": os.path.basename(path), "lines": 0, "bytes": 0, "units": 0, "profiles": []})
+                sink = FileSink(path)
+                start: List[str] = []
+                head(start, k)
+                _write(_post(start, dialect))
+            _write(body)
+            parts[-1]["units"] += 1
+            seen = parts[-1]["profiles"]
+            seen.extend(n for n in names(i) if n not in seen)
+        if sink is not None:
+            _close()
+    except BaseException:
+        if sink is not None:
+            sink.abort()
+        raise
+
+    old = {p.get("file") or "" for p in load_index(output_dir, stem).get("parts", [])}
+    for fname in old - {p["file"] for p in parts} - {""}:
+        p = os.path.join(output_dir, os.path.basename(fname))
+        if os.path.exists(p):
+            os.remove(p)
+    idx = index_path(output_dir, stem)
+    with FileSink(idx) as f:
+        f.append(json.dumps({"max_lines": max_lines, "max_bytes": max_bytes, "dialect": get_dialect(dialect).name,
+                             "parts": parts}, indent=1))
+    return idx
@@ -1,58 +1,131 @@
 from __future__ import annotations
-import json
+import os
+from array import array
+import numpy as np
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, List, Tuple
+
+from cncapp.model import Profile, Side
+
+# Kolommen van de long-form tabel (één rij per gat)
+LONG_COLUMNS = ["profile_name", "profiel_type", "orientatie", "length_mm", "qty", "side", "x_mm", "d_mm"]
+EXPORT_FORMATS = {".parquet": "parquet", ".pq": "parquet", ".arrow": "arrow", ".feather": "arrow", ".csv": "csv"}
+
+def _sides_per_row(df: pd.DataFrame) -> List[Dict[str, Side]]:
+    """Gaten per rij als {label: Side}: uit de 'profile'-kolom, anders uit 'holes_json'."""
+    if "profile" in df.columns:
+        return [p.sides if isinstance(p, Profile) else {} for p in df["profile"]]
+    if "holes_json" not in df.columns:
+        raise ValueError("Kolom 'profile'/'holes_json' ontbreekt; voer eerst extract_holes() uit.")
+    out: List[Dict[str, Side]] = []
+    for j in df["holes_json"]:
+        try:
+            out.append(Profile.sides_from_holes(j))
+        except Exception:
+            out.append({})
+    return out
+
+def _hole_arrays(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, List[str], np.ndarray, np.ndarray]:
+    """
+    Alle gaten als kolommen: (rij-index, zijde-code, zijde-labels, x, d).
+    De lus loopt per zijde, niet per gat: de float-buffers van elke Side worden
+    achter elkaar gekopieerd (array.extend = memcpy) en één keer naar numpy gezet.
+    """
+    codes: Dict[str, int] = {}
+    rows, sides, counts = array("q"), array("i"), array("q")
+    xs, ds = array("d"), array("d")
+    for i, holes in enumerate(_sides_per_row(df)):
+        for label, s in holes.items():
+            n = len(s)
+            if not n:
+                continue
+            rows.append(i)
+            sides.append(codes.setdefault(label, len(codes)))
+            counts.append(n)
+            xs.extend(s.x)
+            ds.extend(s.d)
+    n = np.frombuffer(counts, dtype=np.int64)
+    row_idx = np.repeat(np.frombuffer(rows, dtype=np.int64), n)
+    side_idx = np.repeat(np.frombuffer(sides, dtype=np.int32), n)
+    return row_idx, side_idx, list(codes), np.frombuffer(xs, dtype=np.float64), np.frombuffer(ds, dtype=np.float64)
+
+def _take_categorical(col: pd.Series, row_idx: np.ndarray) -> pd.Categorical:
+    """Waarde per gat als categorical: alleen een code per gat, de tekst één keer per profiel."""
+    cat = pd.Categorical(col.astype(object).where(col.notna(), None))
+    return pd.Categorical.from_codes(cat.codes[row_idx], categories=cat.categories)
+
+def _float_text(v: np.ndarray) -> np.ndarray:
+    """str() per waarde ('390.0', '4.3'), maar elke unieke maat maar één keer opgemaakt."""
+    uniq, inv = np.unique(v, return_inverse=True)
+    return np.array([str(u) for u in uniq.tolist()], dtype=object)[inv]
 
 def expand_holes_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Breidt een dataframe met kolom 'holes_json' uit naar aparte kolommen per zijde.
+    Breidt een dataframe met kolom 'profile' (of 'holes_json') uit naar aparte kolommen per zijde.
     """
     out = df.copy()
-    if "holes_json" not in out.columns:
-        raise ValueError("Kolom 'holes_json' ontbreekt; voer eerst extract_holes() uit.")
-
-    # parse JSON
-    all_sides: List[str] = []
-    parsed_json: List[Dict] = []
-    for j in out["holes_json"]:
-        try:
-            data = json.loads(j)
-            parsed_json.append(data)
-            all_sides.extend(data.keys())
-        except Exception:
-            parsed_json.append({})
-    unique_sides = sorted(set(all_sides))
+    row_idx, side_idx, labels, x, d = _hole_arrays(out)
+    token = (_float_text(x) + "@" + _float_text(d)).tolist()
+    # gaten van één (rij, zijde) liggen aaneengesloten: één join per segment
+    starts = np.flatnonzero(np.r_[True, (np.diff(row_idx) != 0) | (np.diff(side_idx) != 0)]) if len(x) else np.empty(0, dtype=np.int64)
+    bounds = np.r_[starts, len(x)].tolist()
+    joined = [",".join(token[a:b]) for a, b in zip(bounds, bounds[1:])]
+    seg_row, seg_side = row_idx[starts], side_idx[starts]
 
     # Voeg per zijde een kolom toe
-    for side in unique_sides:
-        out[f"holes_{side.lower()}"] = [
-            ",".join([f"{h['x']}@{h['d']}" for h in parsed_json[i].get(side, [])])
-            for i in range(len(out))
-        ]
+    for code, side in sorted(enumerate(labels), key=lambda t: t[1]):
+        col = np.full(len(out), "", dtype=object)
+        hit = np.flatnonzero(seg_side == code)
+        col[seg_row[hit]] = [joined[k] for k in hit]
+        out[f"holes_{side.lower()}"] = col
     return out
 
-
 def flatten_to_long(df: pd.DataFrame) -> pd.DataFrame:
     """
     Zet dataframe om naar long-form: één rij per gat.
-    Verwacht kolom 'holes_json'.
+    Verwacht kolom 'profile' of 'holes_json'.
+    Kolomsgewijs opgebouwd: tekstkolommen categorical, maten float32, dus het
+    geheugen groeit met het aantal gaten en niet met het aantal Python-objecten.
+    Extra kolom 'blok': rijnummer van het profiel in df (niet in de export), zodat
+    controles per profielblok kunnen groeperen, ook bij dubbele namen.
     """
-    rows = []
-    for _, row in df.iterrows():
-        try:
-            holes = json.loads(row["holes_json"])
-        except Exception:
-            holes = {}
-        for side, lst in holes.items():
-            for h in lst:
-                rows.append({
-                    "profile_name": row.get("profile_name"),
-                    "profiel_type": row.get("profiel_type"),
-                    "orientatie": row.get("orientatie"),
-                    "length_mm": row.get("length_mm"),
-                    "qty": row.get("qty"),
-                    "side": side,
-                    "x_mm": h["x"],
-                    "d_mm": h["d"]
-                })
-    return pd.DataFrame(rows)
+    row_idx, side_idx, labels, x, d = _hole_arrays(df)
+    data = {}
+    for col in ("profile_name", "profiel_type", "orientatie"):
+        src = df[col] if col in df.columns else pd.Series([None] * len(df), index=df.index)
+        data[col] = _take_categorical(src, row_idx)
+    length = pd.to_numeric(df["length_mm"], errors="coerce") if "length_mm" in df.columns else pd.Series(np.nan, index=df.index)
+    qty = pd.to_numeric(df["qty"], errors="coerce") if "qty" in df.columns else pd.Series(np.nan, index=df.index)
+    data["length_mm"] = length.to_numpy(dtype=np.float32)[row_idx]
+    data["qty"] = pd.array(qty.to_numpy(dtype=np.float64)[row_idx], dtype="Int32")
+    data["side"] = pd.Categorical.from_codes(side_idx, categories=labels)
+    data["x_mm"] = x.astype(np.float32)
+    data["d_mm"] = d.astype(np.float32)
+    data["blok"] = row_idx.astype(np.int32)
+    return pd.DataFrame(data, columns=LONG_COLUMNS + ["blok"])
+
+def export_long(dfl: pd.DataFrame, path: str, fmt: str | None = None) -> str:
+    """
+    Schrijf de long-form tabel voor MES/nesting: Parquet, Arrow IPC (Feather v2) of CSV.
+    fmt: 'parquet', 'arrow' of 'csv'; standaard afgeleid van de extensie.
+    Parquet/Arrow hebben pyarrow nodig (optioneel; CSV werkt altijd).
+    """
+    fmt = fmt or EXPORT_FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt not in ("parquet", "arrow", "csv"):
+        raise ValueError(f"Onbekend exportformaat voor {path!r}; kies .parquet, .arrow/.feather of .csv.")
+    dfl = dfl[[c for c in LONG_COLUMNS if c in dfl.columns]]
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    if fmt == "csv":
+        dfl.to_csv(path, index=False)
+        return path
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(f"Export naar {fmt} vraagt pyarrow (pip install pyarrow); gebruik anders .csv.") from None
+    if fmt == "parquet":
+        dfl.to_parquet(path, index=False)
+    else:
+        dfl.reset_index(drop=True).to_feather(path)
+    return path
@@ -0,0 +1,19 @@
+from __future__ import annotations
+# G-code-woorden splitsen: gedeeld door de backplot en de postprocessor
+import re
+from typing import List, Tuple
+
+WORD_RE = re.compile(r"([A-Z])\s*([-+]?(?:\d+\.?\d*|\.\d+))")
+_NUM_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)")
+
+def tokens(line: str) -> List[Tuple[str, str]]:
+    """
+    [(letter, waarde-string)] voor een regel in hoofdletters, zonder commentaar.
+    Snel pad voor spatiegescheiden woorden zoals gcode_gen ze schrijft; anders WORD_RE.
+    """
+    out = []
+    for tok in line.split():
+        if len(tok) < 2 or not tok[0].isalpha() or not _NUM_RE.fullmatch(tok, 1):
+            return WORD_RE.findall(line)
+        out.append((tok[0], tok[1:]))
+    return out
@@ -0,0 +1,125 @@
+from __future__ import annotations
+# Geometriecontrole van alle gaten in één keer (long-form tabel, gevectoriseerd)
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+from cncapp.config import resolve_side_height, VALIDATE_TOL_MM, VALIDATE_MIN_WEB_MM
+from cncapp.gcode_gen import _parse_y
+
+ISSUE_COLUMNS = ["niveau", "code", "profile_name", "side", "x_mm", "d_mm", "melding"]
+LEVELS = ("fout", "waarschuwing")
+# G-code heeft 3 decimalen; verschillen daaronder (o.a. float32-afronding) tellen niet
+_EPS = 1e-3
+
+def _face_dims(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Y-positie en vlakbreedte per rij. Per unieke (type, zijde) één keer berekend:
+    de breedte van een vlak is de andere maat dan de hoogte uit resolve_side_height
+    (TOP ligt op de grote maat, dus is de kleine maat breed; SIDE omgekeerd).
+    Labels zonder Y of buiten TOP/SIDE krijgen NaN (niet te controleren).
+    """
+    keys = df[["profiel_type", "side"]].astype(object).drop_duplicates()
+    rows = []
+    for ptype, side in keys.itertuples(index=False):
+        u = str(side).upper()
+        group = "TOP" if u.startswith("TOP") else "SIDE" if u.startswith("SIDE") else None
+        known = group is not None and "Y" in u.split("_", 1)[-1]
+        pt = None if ptype is None or pd.isna(ptype) else str(ptype)
+        rows.append({
+            "profiel_type": ptype, "side": side,
+            "y_mm": _parse_y(side) if known else np.nan,
+            "face_w": resolve_side_height(pt, None, "SIDE" if group == "TOP" else "TOP") if known else np.nan,
+        })
+    dims = pd.DataFrame(rows, columns=["profiel_type", "side", "y_mm", "face_w"])
+    return df[["profiel_type", "side"]].astype(object).merge(dims, how="left", on=["profiel_type", "side"])
+
+def validate_holes(dfl: pd.DataFrame, tol: float | None = None, min_web: float | None = None) -> pd.DataFrame:
+    """
+    Controleer de long-form tabel van flatten_to_long() (één rij per gat) en geef
+    een tabel met bevindingen terug (kolommen ISSUE_COLUMNS; leeg = alles in orde).
+
+    fout:
+      - d_ongeldig     diameter <= 0
+      - x_buiten       x buiten 0..length_mm
+      - over_rand      gat steekt over het profieleinde
+      - dubbel         zelfde profiel/zijde, x binnen tol
+      - overlap        afstand kleiner dan (d1 + d2) / 2
+      - y_buiten       gat (y ± d/2) valt buiten het vlak van de zijde
+    waarschuwing:
+      - rand           gatrand binnen min_web van het profieleinde
+      - dunne_wand     minder dan min_web materiaal tussen twee gaten
+    Alles gebeurt per kolom (sorteren op profiel/zijde/x, dan diff), zonder lus per gat.
+    Buren worden per profielblok vergeleken (kolom 'blok' van flatten_to_long; zonder
+    die kolom per profile_name): gaten van twee blokken met dezelfde naam overlappen niet.
+    """
+    tol = VALIDATE_TOL_MM if tol is None else tol
+    min_web = VALIDATE_MIN_WEB_MM if min_web is None else min_web
+    if dfl.empty:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+
+    df = dfl[["profile_name", "profiel_type", "length_mm", "side", "x_mm", "d_mm"]].reset_index(drop=True)
+    df["blok"] = dfl["blok"].to_numpy() if "blok" in dfl.columns else pd.factorize(df["profile_name"])[0]
+    df = df.sort_values(["blok", "side", "x_mm"], kind="stable").reset_index(drop=True)
+    x = df["x_mm"].to_numpy(dtype=float)
+    d = df["d_mm"].to_numpy(dtype=float)
+    length = pd.to_numeric(df["length_mm"], errors="coerce").to_numpy(dtype=float)
+    r = d / 2
+
+    checks: List[tuple] = []  # (niveau, code, rij-indices, meldingen)
+
+    def add(level: str, code: str, mask: np.ndarray, fmt: str, *values: np.ndarray):
+        # meldingen alleen opmaken voor de (weinige) rijen die het betreft
+        idx = np.flatnonzero(mask)
+        if len(idx):
+            text = [fmt.format(*v) for v in zip(*(a[idx] for a in values))] if values else [fmt] * len(idx)
+            checks.append((level, code, idx, text))
+
+    add("fout", "d_ongeldig", ~(d > 0), "diameter {:g}", d)
+
+    has_len = length > 0
+    out_x = has_len & ((x < -_EPS) | (x > length + _EPS))
+    add("fout", "x_buiten", out_x, "x buiten 0..{:g}", length)
+    edge = np.minimum(x - r, length - x - r)
+    near = has_len & ~out_x & (d > 0)
+    add("fout", "over_rand", near & (edge < -_EPS), "gat steekt {:.2f} mm over het profieleinde", -edge)
+    add("waarschuwing", "rand", near & (edge >= -_EPS) & (edge < min_web - _EPS), "{:.2f} mm materiaal tot profieleinde", edge)
+
+    # buren binnen hetzelfde profiel en dezelfde zijde-rij
+    same = np.zeros(len(df), dtype=bool)
+    if len(df) > 1:
+        same[1:] = ((df["blok"].to_numpy()[1:] == df["blok"].to_numpy()[:-1])
+                    & (df["side"].to_numpy()[1:] == df["side"].to_numpy()[:-1]))
+    gap = np.full(len(df), np.inf)
+    gap[1:] = np.diff(x)
+    gap = np.where(same, gap, np.inf)
+    web = gap - (r + np.roll(r, 1))
+    dup = gap <= tol
+    over = ~dup & (web < -tol)
+    thin = ~dup & ~over & (web < min_web - _EPS)
+    add("fout", "dubbel", dup, "dubbel gat (x gelijk aan vorig gat)")
+    add("fout", "overlap", over, "overlapt vorig gat ({:.2f} mm)", web)
+    add("waarschuwing", "dunne_wand", thin, "{:.2f} mm materiaal tot vorig gat", web)
+
+    dims = _face_dims(df)
+    y = dims["y_mm"].to_numpy(dtype=float)
+    w = dims["face_w"].to_numpy(dtype=float)
+    out_y = ~np.isnan(w) & ((y - r < -_EPS) | (y + r > w + _EPS))
+    add("fout", "y_buiten", out_y, "Y{:g} ± {:g} buiten vlak 0..{:g}", y, r, w)
+
+    if not checks:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    parts = []
+    for level, code, idx, text in checks:
+        part = df.iloc[idx][["profile_name", "side", "x_mm", "d_mm"]]
+        part.insert(0, "code", code)
+        part.insert(0, "niveau", level)
+        part["melding"] = text
+        parts.append(part)
+    out = pd.concat(parts, ignore_index=True)
+    out["niveau"] = pd.Categorical(out["niveau"], categories=list(LEVELS), ordered=True)
+    return out.sort_values(["niveau", "profile_name", "side", "x_mm"], kind="stable").reset_index(drop=True)
+
+def summarize(issues: pd.DataFrame) -> Dict[str, int]:
+    """Aantallen per niveau, bv. {'fout': 2, 'waarschuwing': 5}."""
+    return {lvl: int((issues["niveau"] == lvl).sum()) for lvl in LEVELS}
@@ -0,0 +1,61 @@
+from __future__ import annotations
+# --watch: werkboek in de gaten houden en na een (gedebouncede) opslag opnieuw bouwen
+import os, time, threading
+from typing import Callable, Tuple
+
+from cncapp.config import WATCH_INTERVAL_S, WATCH_DEBOUNCE_S
+
+Signature = Tuple[int, int] | None  # (mtime_ns, grootte) of None als het bestand (even) weg is
+
+def is_lock_file(path: str) -> bool:
+    """Office-lockbestand ('~$naam.xlsx') dat Excel naast een geopend werkboek zet."""
+    return os.path.basename(path).startswith("~$")
+
+def signature(path: str) -> Signature:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def watch_file(
+    path: str,
+    on_change: Callable[[str], None],
+    interval: float | None = None,
+    debounce: float | None = None,
+    stop: threading.Event | None = None,
+    max_events: int | None = None,
+) -> int:
+    """
+    Poll path en roep on_change(path) aan zodra een wijziging debounce seconden stabiel
+    is (Excel schrijft via een tijdelijk bestand + hernoemen; tussendoor kan het
+    bestand even ontbreken). Stopt op stop.set(), na max_events of bij Ctrl+C.
+    Geeft het aantal afgehandelde wijzigingen terug.
+    """
+    if is_lock_file(path):
+        raise ValueError(f"{path} is een Office-lockbestand, geen werkboek.")
+    interval = WATCH_INTERVAL_S if interval is None else interval
+    debounce = WATCH_DEBOUNCE_S if debounce is None else debounce
+    stop = stop or threading.Event()
+
+    seen = signature(path)
+    pending: Signature = None
+    pending_since = 0.0
+    events = 0
+    try:
+        while not stop.is_set():
+            sig = signature(path)
+            now = time.monotonic()
+            if sig != seen and sig is not None:
+                if sig != pending:
+                    pending, pending_since = sig, now
+                elif now - pending_since >= debounce:
+                    seen, pending = sig, None
+                    on_change(path)
+                    events += 1
+                    if max_events is not None and events >= max_events:
+                        break
+            stop.wait(interval)
+    except KeyboardInterrupt:
+        pass
+    return events
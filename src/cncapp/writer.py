@@ -0,0 +1,111 @@
+from __future__ import annotations
+# Uitvoer-sinks voor G-code: emitters roepen alleen g.append(regel) aan
+import io, os, tempfile
+from typing import IO, Iterable, List, Union
+
+class GCodeSink:
+    """
+    Basisklasse voor een G-code-uitvoer. Emitters streamen regel voor regel
+    via append(); een sink bepaalt waar die regels heen gaan.
+    Bruikbaar als context manager: close() bij succes, abort() bij een fout.
+    """
+    lines_written = 0
+
+    def append(self, line: str):
+        raise NotImplementedError
+
+    def extend(self, lines: Iterable[str]):
+        for line in lines:
+            self.append(line)
+
+    def close(self):
+        pass
+
+    def abort(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+# Emitters accepteren zowel een sink als een gewone lijst (beide hebben append)
+Sink = Union[GCodeSink, List[str]]
+
+class MemorySink(GCodeSink):
+    """Houdt alle regels in een lijst; handig voor tests en kleine programma's."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def append(self, line: str):
+        self.lines.append(line)
+        self.lines_written += 1
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n" if self.lines else ""
+
+class StreamSink(GCodeSink):
+    """
+    Schrijft elke regel direct naar een bestaand tekstobject (sys.stdout,
+    sock.makefile('w'), io.StringIO, ...). De sink sluit het object niet.
+    """
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+
+    def append(self, line: str):
+        self.stream.write(line + "\n")
+        self.lines_written += 1
+
+    def close(self):
+        self.stream.flush()
+
+_umask: int | None = None
+
+def _default_mode() -> int:
+    """Rechten die open() een nieuw bestand zou geven (0o666 min de umask)."""
+    global _umask
+    if _umask is None:
+        # os.umask kan alleen lezen door te zetten: meteen terugzetten
+        _umask = os.umask(0)
+        os.umask(_umask)
+    return 0o666 & ~_umask
+
+class FileSink(GCodeSink):
+    """
+    Gebufferd schrijven naar een tijdelijk bestand naast 'path'; pas bij close()
+    volgt een atomaire os.replace. De machine-pc ziet dus nooit een half .tap-bestand
+    en het geheugengebruik blijft constant, ook voor zeer grote jobs.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 1 << 20):
+        self.path = path
+        d = os.path.dirname(path) or "."
+        os.makedirs(d, exist_ok=True)
+        fd, self.tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=d)
+        raw = os.fdopen(fd, "wb", buffering=0)
+        self._f = io.TextIOWrapper(io.BufferedWriter(raw, buffer_size), encoding="ascii", errors="ignore", newline="\n")
+
+    def append(self, line: str):
+        self._f.write(line + "\n")
+        self.lines_written += 1
+
+    def close(self):
+        if self._f.closed:
+            return
+        self._f.close()
+        # mkstemp maakt 0600; het .tap-bestand moet net als vroeger leesbaar zijn
+        os.chmod(self.tmp, _default_mode())
+        os.replace(self.tmp, self.path)
+
+    def abort(self):
+        if not self._f.closed:
+            self._f.close()
+        if os.path.exists(self.tmp):
+            os.remove(self.tmp)
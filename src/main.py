@@ -1,57 +1,449 @@
 import argparse
-from tabulate import tabulate
-from cncapp.excel_import import read_cutlist
-from cncapp.holes import extract_holes
-from cncapp.structure import flatten_to_long
-from cncapp.gcode_gen import generate_all_profiles
+import json
+import os
+import sys
+import time
+# pandas/tabulate/Excel-import pas laden in de stap die ze nodig heeft (--help, --model: snelle start)
+from cncapp.instrument import Instrument
+from cncapp.post import DIALECTS
+from cncapp.config import POST_DIALECT
 
 def main():
     parser = argparse.ArgumentParser(description="cnc-profiles v1.0 – Excel->G-code (Mach3 .tap)")
     parser.add_argument("-f", "--file", default="sample_cutlist.xlsx", help="Pad naar Excelbestand")
+    parser.add_argument("--batch", nargs="+", metavar="PAD", help="Batch: mappen, globs of bestanden met werkboeken (i.p.v. --file)")
+    parser.add_argument("--all-sheets", action="store_true", help="Batch: alle sheets per werkboek (uitvoer per sheet in een submap)")
+    parser.add_argument("--model", default=None, metavar="PAD",
+                        help="Snel pad: G-code uit een opgeslagen gatenmodel (zie --save-model) i.p.v. --file; zonder Excel/pandas")
+    parser.add_argument("--save-model", default=None, metavar="PAD",
+                        help="Bewaar het gatenmodel (na de gatencontrole) als JSON voor latere runs met --model")
+    parser.add_argument("--only", action="append", default=None, metavar="PATROON",
+                        help="Alleen deze profielen opnieuw maken (naam of patroon, bv. \"Profiel 6*\"; herhaalbaar); per profiel, via een blokindex")
     parser.add_argument("-s", "--sheet", default=0, help="Sheet naam of index (default: 0)")
     parser.add_argument("--preview", action="store_true", help="Toon console-preview i.p.v. meteen G-code")
     parser.add_argument("--export-dir", default="./out", help="Map voor .tap output")
     parser.add_argument("--one-file", action="store_true", help="Alle profielen in één .tap samenvoegen")
+    parser.add_argument("--schedule", action="store_true", help="Job-planning: meerdere profielen per opspanning, één rotatie per groep (één .tap)")
+    parser.add_argument("--subprograms", action="store_true", help="Serieproductie: identieke profielen één keer als O-blok, M98-aanroep met L=aantal (één .tap)")
+    parser.add_argument("--dialect", choices=sorted(DIALECTS), default=None,
+                        help=f"Besturing voor de postprocessor (default {POST_DIALECT})")
+    parser.add_argument("--max-lines", type=int, default=None, metavar="N",
+                        help="Gebundelde .tap (--one-file/--schedule) splitsen in delen van max. N regels (default: config.SPLIT_MAX_LINES)")
+    parser.add_argument("--max-bytes", type=_byte_size, default=None, metavar="N",
+                        help="Idem, max. N bytes per deel; achtervoegsel k/M toegestaan, bv. 2M (default: config.SPLIT_MAX_BYTES)")
+    parser.add_argument("--workers", type=int, default=None, help="Aantal processen voor G-code generatie (0 = alle cores, default: config.WORKERS)")
+    parser.add_argument("--force", action="store_true", help="Alles opnieuw genereren, ook ongewijzigde profielen")
+    parser.add_argument("--no-cache", action="store_true", help="Werkboek altijd opnieuw inlezen (cache niet gebruiken of bijwerken)")
+    parser.add_argument("--export-holes", default=None, metavar="PAD",
+                        help="Schrijf de gatentabel (één rij per gat) naar .parquet, .arrow of .csv (MES/nesting)")
+    parser.add_argument("--cutplan", action="store_true",
+                        help="Zaagplan: stukken over handelslengtes verdelen (zaagplan.csv) en staaf/positie als commentaar in de .tap")
+    parser.add_argument("--strict", action="store_true", help="Geen export als de gatencontrole fouten vindt")
+    parser.add_argument("--watch", action="store_true", help="Blijf draaien: bij elke opslag van het werkboek alleen gewijzigde profielen opnieuw genereren")
+    parser.add_argument("--stdout", action="store_true", help="Schrijf de gebundelde G-code naar stdout (meldingen naar stderr)")
+    parser.add_argument("--backplot", action="store_true", help="Geschatte machinetijd per profiel uit de geschreven .tap-bestanden")
     parser.add_argument("--max-rows", type=int, default=15, help="Maximaal aantal rijen in preview")
+    parser.add_argument("--profile", action="store_true", help="Meet tijd/geheugen/aantallen per stap; samenvatting + JSON-rapport")
+    parser.add_argument("--profile-json", default=None, help="Pad voor het JSON-rapport (default: <export-dir>/profile_report.json)")
+    parser.add_argument("--profile-dump", default=None, help="Map voor een cProfile-dump (.prof) per stap")
+    parser.add_argument("--profile-alloc", action="store_true", help="Ook tracemalloc-piek per stap meten (trager)")
     args = parser.parse_args()
+    if args.only:
+        if args.batch or args.watch:
+            parser.error("--only werkt niet met --batch of --watch")
+        if (args.one_file or args.schedule or args.subprograms) and not args.stdout:
+            parser.error("--only schrijft per profiel; niet te combineren met --one-file/--schedule/--subprograms (wel met --stdout)")
 
-    sheet_arg = args.sheet
+    inst = Instrument(enabled=args.profile or bool(args.profile_json) or bool(args.profile_dump),
+                      trace_alloc=args.profile_alloc, dump_dir=args.profile_dump)
     try:
-        sheet_arg = int(sheet_arg)
+        if args.batch:
+            _run_batch(args, inst)
+        elif args.model:
+            _run_model(args, inst)
+        else:
+            _run(args, inst)
+            if args.watch and not (args.preview or args.stdout):
+                _watch(args)
+    finally:
+        if inst.enabled:
+            out = sys.stderr if args.stdout else sys.stdout
+            json_path = args.profile_json or os.path.join(args.export_dir, "profile_report.json")
+            inst.write_json(json_path)
+            print(inst.summary(), file=out)
+            print(f"[INFO] Profielrapport: {json_path}", file=out)
+            inst.close()
+
+def _byte_size(text: str) -> int:
+    """'500000', '500k' of '2M' -> aantal bytes (argparse-type voor --max-bytes)."""
+    t = text.strip().lower().rstrip("b")
+    mult = {"k": 1024, "m": 1024 * 1024}.get(t[-1:], 1)
+    try:
+        return int(float(t[:-1] if mult > 1 else t) * mult)
     except ValueError:
-        pass
+        raise argparse.ArgumentTypeError(f"ongeldige grootte: {text!r}") from None
+
+def _warn_over_budget(index: str):
+    with open(index, "r", encoding="utf-8") as f:
+        parts = json.load(f)["parts"]
+    for p in parts:
+        if p.get("over_budget"):
+            print(f"[INFO] {p['file']} ({p['lines']} regels, {p['bytes']} bytes) is groter dan het budget: "
+                  f"één profiel/opspanning ({', '.join(p['profiles'])}) kan niet verder gesplitst worden")
+
+def _written_lines(export_dir: str, report: dict) -> int:
+    """Regels in de zojuist geschreven .tap-bestanden (alleen voor --profile)."""
+    from cncapp.gcode_gen import _profile_path
+    n = 0
+    if report.get("parts"):
+        paths = report["parts"] if report["added"] + report["changed"] else []
+    else:
+        paths = [os.path.join(export_dir, name) if name.endswith(".tap") else _profile_path(export_dir, name)
+                 for name in report["added"] + report["changed"]]
+    for p in paths:
+        with open(p, "rb") as f:
+            n += sum(1 for _ in f)
+    return n
+
+def _run_batch(args, inst: Instrument):
+    """Meerdere werkboeken/sheets in één proces(pool); fouten per bron in één rapport."""
+    from tabulate import tabulate
+    from cncapp.batch import discover_sources, plan_batch, run_batch, write_report
+
+    sources = discover_sources(args.batch)
+    if not sources:
+        print("[FOUT] Geen werkboeken gevonden voor: " + " ".join(args.batch))
+        sys.exit(2)
+    sheet_arg = _sheet_arg(args.sheet)
+    jobs, errors = plan_batch(sources, args.export_dir, all_sheets=args.all_sheets, sheet=sheet_arg)
+    options = {"one_file": args.one_file, "schedule": args.schedule, "subprograms": args.subprograms,
+               "dialect": args.dialect, "max_lines": args.max_lines, "max_bytes": args.max_bytes,
+               "force": args.force, "cache": not args.no_cache}
+
+    def _progress(rec):
+        sheet = f" [{rec['sheet']}]" if args.all_sheets and rec["sheet"] is not None else ""
+        tail = rec["error"] if rec["error"] else f"{rec['profiles']} profielen, {rec['written']} geschreven"
+        print(f"[{rec['status'].upper()}] {rec['file']}{sheet}: {tail}")
+
+    with inst.stage("batch") as st:
+        results = errors + run_batch(jobs, workers=args.workers, options=options, progress=_progress)
+        st["jobs"] = len(results)
+        st["profiles"] = sum(r["profiles"] for r in results)
+    for rec in errors:
+        _progress(rec)
+    path = write_report(results, args.export_dir)
+    failed = [r for r in results if r["status"] == "fout"]
+    print(tabulate([[r["file"], r["sheet"], r["status"], r["profiles"], r["written"], r["unchanged"], f"{r['seconds']:.2f}"]
+                    for r in results],
+                   headers=["werkboek", "sheet", "status", "profielen", "geschreven", "ongewijzigd", "s"],
+                   tablefmt="github"))
+    print(f"[OK] {len(results) - len(failed)} van {len(results)} bronnen verwerkt; rapport: {path}")
+    if failed:
+        print(f"[FOUT] {len(failed)} bron(nen) mislukt, zie het rapport")
+        sys.exit(1)
+
+def _report_issues(issues, counts, args) -> bool:
+    """Print de bevindingen van de gatencontrole; False als er fouten zijn."""
+    from tabulate import tabulate
+    out = sys.stderr if args.stdout else sys.stdout
+    if issues.empty:
+        print("[OK] Gatencontrole: geen bevindingen", file=out)
+        return True
+    tag = "[FOUT]" if counts["fout"] else "[INFO]"
+    print(f"{tag} Gatencontrole: {counts['fout']} fout(en), {counts['waarschuwing']} waarschuwing(en)", file=out)
+    print(tabulate(issues.head(args.max_rows), headers="keys", tablefmt="github", showindex=False), file=out)
+    if len(issues) > args.max_rows:
+        print(f"... ({len(issues) - args.max_rows} bevindingen niet getoond)", file=out)
+    if not args.preview:
+        os.makedirs(args.export_dir, exist_ok=True)
+        path = os.path.join(args.export_dir, "validatie.csv")
+        issues.to_csv(path, index=False)
+        print(f"[INFO] Volledige lijst: {path}", file=out)
+    return counts["fout"] == 0
+
+def _watch(args):
+    """Warm proces: werkboek pollen en na elke opslag incrementeel opnieuw bouwen."""
+    from cncapp.watch import watch_file
+    from cncapp.holes import extract_holes_stream
+    from cncapp.structure import flatten_to_long
+    from cncapp.validate import validate_holes, summarize
+    from cncapp.incremental import generate_incremental
 
-    data = read_cutlist(args.file, sheet_name=sheet_arg)
-    df_raw = data["df"]
+    sheet_arg = _sheet_arg(args.sheet)
 
-    # 1) holes per profiel
-    dfh = extract_holes(df_raw)
+    def _rebuild(path: str):
+        t0 = time.perf_counter()
+        try:
+            dfh = extract_holes_stream(path, sheet_name=sheet_arg, serialize=False)
+            counts = summarize(validate_holes(flatten_to_long(dfh)))
+            if counts["fout"]:
+                print(f"[FOUT] {time.strftime('%H:%M:%S')} gatencontrole: {counts['fout']} fout(en)"
+                      + (", niet geëxporteerd (--strict)" if args.strict else ""), flush=True)
+                if args.strict:
+                    return
+            report = generate_incremental(dfh, output_dir=args.export_dir, one_file=args.one_file,
+                                          schedule=args.schedule, workers=args.workers,
+                                          subprograms=args.subprograms, dialect=args.dialect,
+                                          max_lines=args.max_lines, max_bytes=args.max_bytes)
+        except Exception as exc:  # bv. een werkboek dat Excel nog aan het wegschrijven is: blijf kijken
+            print(f"[FOUT] {time.strftime('%H:%M:%S')} {type(exc).__name__}: {exc}")
+            return
+        changed = report["added"] + report["changed"]
+        detail = f": {', '.join(changed)}" if changed and len(changed) <= 10 else ""
+        print(f"[OK] {time.strftime('%H:%M:%S')} {len(changed)} opnieuw, {len(report['removed'])} verwijderd, "
+              f"{len(report['unchanged'])} ongewijzigd in {time.perf_counter() - t0:.2f} s{detail}", flush=True)
+
+    print(f"[INFO] Wacht op wijzigingen in {args.file} (Ctrl+C om te stoppen)", flush=True)
+    watch_file(args.file, _rebuild)
+
+def _sheet_arg(sheet):
+    try:
+        return int(sheet)
+    except ValueError:
+        return sheet
+
+def _run(args, inst: Instrument):
+    from tabulate import tabulate
+    from cncapp.holes import extract_holes_stream
+    from cncapp.structure import flatten_to_long, export_long
+    from cncapp.validate import validate_holes, summarize
+    from cncapp.gcode_gen import estimate_cycle_saving
+
+    sheet_arg = _sheet_arg(args.sheet)
+
+    # 1) holes per profiel, rij voor rij uit de sheet gestreamd (bestand één keer open)
+    # (JSON/compacte string alleen nodig voor de preview; de rest gebruikt het Profile-model)
+    # warme runs op een ongewijzigd werkboek komen uit de cache (geen xlsx-parsing)
+    with inst.stage("inlezen+gaten") as st:
+        if args.only:
+            dfh = _read_only(args, sheet_arg)
+        else:
+            dfh = extract_holes_stream(args.file, sheet_name=sheet_arg, serialize=args.preview,
+                                       cache=not args.no_cache)
+        st["profiles"] = len(dfh)
+        st["holes"] = sum(p.hole_count for p in dfh["profile"]) if not dfh.empty else 0
     if dfh.empty:
         print("Geen profielen met gaten gevonden.")
         return
+    for name, n in dfh.attrs.get("duplicates", {}).items():
+        renamed = ", ".join(f"{name}_{k}" for k in range(2, n + 1))
+        print(f"[INFO] Profielnaam {name!r} komt {n}x voor; volgende blok(ken) hernoemd: {renamed}",
+              file=sys.stderr if args.stdout else sys.stdout)
 
     # 2) long-form voor interne logica / debug
-    dfl = flatten_to_long(dfh)
+    with inst.stage("flatten_to_long") as st:
+        dfl = flatten_to_long(dfh)
+        st["rows"] = len(dfl)
+
+    # 2b) geometriecontrole over alle gaten (x/Y binnen het profiel, dubbel, overlap)
+    with inst.stage("validatie") as st:
+        issues = validate_holes(dfl)
+        counts = summarize(issues)
+        st.update(counts)
+    if not _report_issues(issues, counts, args) and args.strict:
+        print("[FOUT] Export geblokkeerd (--strict): los eerst de fouten in de cutlist op.", file=sys.stderr)
+        sys.exit(1)
+
+    if args.export_holes:
+        with inst.stage("export gaten") as st:
+            path = export_long(dfl, args.export_holes)
+            st["rows"] = len(dfl)
+        print(f"[OK] Gatentabel ({len(dfl)} gaten): {path}", file=sys.stderr if args.stdout else sys.stdout)
+
+    if args.save_model:
+        from cncapp.model import save_model
+        save_model(dfh["profile"], args.save_model, source=os.path.abspath(args.file),
+                   sheet=dfh.attrs.get("sheet_name"), validation={k: int(v) for k, v in counts.items()})
+        print(f"[OK] Gatenmodel ({len(dfh)} profielen): {args.save_model}", file=sys.stderr if args.stdout else sys.stdout)
 
     if args.preview:
         print("=" * 100)
         print(f"Bestand : {args.file}")
-        print(f"Sheet   : {data['sheet_name']}")
+        print(f"Sheet   : {dfh.attrs['sheet_name']}")
         print(f"Aantal profielen met gaten : {len(dfh)}")
         print("-" * 100)
-        from tabulate import tabulate
-        print(tabulate(dfh.head(args.max_rows), headers="keys", tablefmt="github", showindex=False))
+        print(tabulate(dfh.drop(columns=["profile"]).head(args.max_rows), headers="keys", tablefmt="github", showindex=False))
         if len(dfh) > args.max_rows:
             print(f"... ({len(dfh) - args.max_rows} profielen niet getoond)")
         print("=" * 100)
         return
 
-    # 3) schrijf .tap (per profiel of gebundeld)
-    path = generate_all_profiles(dfh, output_dir=args.export_dir, one_file=args.one_file)
-    if path:
-        print(f"[OK] G-code geschreven naar: {path}")
+    rows = dfh.to_dict("records")
+    if args.cutplan:
+        tags = _cutplan(args, inst)
+        for r in rows:
+            r["zaagplan"] = tags.get(r["profile_name"])
+    report = _generate(args, inst, rows)
+    if report is None:
+        return
+
+    # 4) geschatte cyclustijdwinst van aanloop/terugtrek per profiel
+    with inst.stage("schatting") as st:
+        saving = estimate_cycle_saving(dfh)
+        st["rows"] = len(saving)
+    print(tabulate(saving.head(args.max_rows), headers="keys", tablefmt="github", showindex=False))
+    if len(saving) > args.max_rows:
+        print(f"... ({len(saving) - args.max_rows} profielen niet getoond)")
+    print(f"[INFO] Totale geschatte besparing Z-cyclus: {saving['besparing_s'].sum():.1f} s")
+
+    if args.backplot:
+        _backplot(args, inst, report, rows)
+
+def _cutplan(args, inst: Instrument) -> dict:
+    """
+    Zaagplan over de hele cutlist (ook profielen zonder gaten): zaagplan.csv in de
+    exportmap, samenvatting per profieltype; geeft {profielnaam: staaf/positie-tekst}.
+    Met --only komen de stukken uit de blokindex (het werkboek wordt niet opnieuw gelezen).
+    """
+    from tabulate import tabulate
+    from cncapp.cutting import plan_cuts, cut_tags, blocks_frame
+
+    out = sys.stderr if args.stdout else sys.stdout
+    sheet_arg = _sheet_arg(args.sheet)
+    with inst.stage("zaagplan") as st:
+        if args.only and not args.no_cache:
+            from cncapp.blockindex import all_blocks
+            df = blocks_frame(all_blocks(args.file, sheet_arg))
+        elif args.only:
+            from cncapp.excel_import import iter_profile_blocks
+            df = blocks_frame(iter_profile_blocks(args.file, sheet_arg))
+        else:
+            from cncapp.excel_import import read_cutlist
+            from cncapp.clean import clean_cutlist
+            df, _ = clean_cutlist(read_cutlist(args.file, sheet_name=sheet_arg)["df"])
+        plan = plan_cuts(df)
+        st["pieces"] = len(plan.cuts)
+        st["bars"] = len(plan.bars)
+    os.makedirs(args.export_dir, exist_ok=True)
+    path = os.path.join(args.export_dir, "zaagplan.csv")
+    plan.cuts.to_csv(path, index=False)
+    print(tabulate(plan.summary, headers="keys", tablefmt="github", showindex=False), file=out)
+    for name in plan.too_long:
+        print(f"[FOUT] {name}: langer dan de langste handelslengte, niet in het zaagplan", file=out)
+    print(f"[OK] Zaagplan ({len(plan.bars)} staven, {len(plan.cuts)} stukken): {path}", file=out)
+    return cut_tags(plan)
+
+def _read_only(args, sheet_arg):
+    """--only: alleen de gevraagde profielblokken inlezen (blokindex, of streamen met --no-cache)."""
+    from cncapp.holes import extract_holes_only
+
+    out = sys.stderr if args.stdout else sys.stdout
+    info: dict = {}
+    dfh = extract_holes_only(args.file, args.only, sheet_name=sheet_arg, serialize=args.preview,
+                             index=not args.no_cache, info=info)
+    _report_unmatched(info["unmatched"], len(info["spans"]))
+    rows = ", ".join(f"{name} (rij {a}-{b})" for name, spans in info["spans"].items() for a, b in spans)
+    source = "" if args.no_cache else (", blokindex opnieuw opgebouwd" if info["rebuilt"] else ", uit de blokindex")
+    print(f"[INFO] Alleen {len(info['spans'])} profiel(en){source}: {rows}", file=out)
+    return dfh
+
+def _report_unmatched(unmatched: list, matched: int):
+    for pat in unmatched:
+        print(f"[FOUT] --only {pat!r}: geen profiel met deze naam", file=sys.stderr)
+    if not matched:
+        sys.exit(1)
+
+def _run_model(args, inst: Instrument):
+    """
+    Snel pad: G-code uit een opgeslagen gatenmodel (--save-model). Geen Excel,
+    pandas of validatie (die liep bij het opslaan); alleen het model inlezen.
+    """
+    from cncapp.model import load_model
+
+    with inst.stage("model") as st:
+        profiles, meta = load_model(args.model)
+        if args.only:
+            from cncapp.blockindex import match_names
+            names, unmatched = match_names([p.name for p in profiles], args.only)
+            _report_unmatched(unmatched, len(names))
+            profiles = [p for p in profiles if p.name in set(names)]
+        rows = [p.to_record() for p in profiles]
+        st["profiles"] = len(rows)
+        st["holes"] = sum(p.hole_count for p in profiles)
+    out = sys.stderr if args.stdout else sys.stdout
+    counts = meta.get("validation") or {}
+    print(f"[INFO] Model: {len(rows)} profielen uit {meta.get('source')} [{meta.get('sheet')}], "
+          f"gatencontrole {counts.get('fout', '?')} fout(en), {counts.get('waarschuwing', '?')} waarschuwing(en)", file=out)
+    if counts.get("fout") and args.strict:
+        print("[FOUT] Export geblokkeerd (--strict): los eerst de fouten in de cutlist op.", file=sys.stderr)
+        sys.exit(1)
+    if not rows:
+        print("Geen profielen met gaten gevonden.")
+        return
+    report = _generate(args, inst, rows)
+    if report is not None and args.backplot:
+        _backplot(args, inst, report, rows)
+
+def _generate(args, inst: Instrument, rows: list):
+    """G-code schrijven (of naar stdout streamen) en het rapport tonen; None bij --stdout."""
+    from cncapp.gcode_gen import generate_all_profiles, series_plan
+    from cncapp.incremental import generate_incremental
+
+    # 3a) G-code als stream naar stdout (pipe naar een ander programma)
+    if args.stdout:
+        from cncapp.writer import StreamSink
+        sink = StreamSink(sys.stdout)
+        with inst.stage("gcode") as st:
+            generate_all_profiles(rows, output_dir=args.export_dir, schedule=args.schedule,
+                                  workers=args.workers, sink=sink, subprograms=args.subprograms,
+                                  dialect=args.dialect)
+            sink.close()
+            st["lines"] = sink.lines_written
+        print(f"[OK] {sink.lines_written} regels G-code naar stdout", file=sys.stderr)
+        return None
+
+    # 3) schrijf .tap (per profiel of gebundeld); ongewijzigde profielen worden overgeslagen
+    with inst.stage("gcode") as st:
+        report = generate_incremental(rows, output_dir=args.export_dir, one_file=args.one_file,
+                                      schedule=args.schedule, workers=args.workers, force=args.force,
+                                      subprograms=args.subprograms, dialect=args.dialect,
+                                      max_lines=args.max_lines, max_bytes=args.max_bytes,
+                                      partial=bool(args.only))
+        st["files"] = len(report["added"]) + len(report["changed"])
+    if inst.enabled:
+        inst.stages[-1]["lines"] = _written_lines(args.export_dir, report)
+    print(f"[OK] {len(report['added'])} nieuw, {len(report['changed'])} gewijzigd, "
+          f"{len(report['unchanged'])} ongewijzigd, {len(report['removed'])} verwijderd in: {args.export_dir}")
+    for key, label in (("added", "nieuw"), ("changed", "gewijzigd"), ("removed", "verwijderd")):
+        if report[key]:
+            print(f"  {label}: {', '.join(report[key])}")
+    if report.get("parts"):
+        print(f"[INFO] Job in {len(report['parts'])} delen, index: {report['path']}")
+        _warn_over_budget(report["path"])
+
+    # 3b) serieoverzicht: hoeveel stuks elk programma oplevert
+    if args.subprograms and not args.schedule:
+        from tabulate import tabulate
+        plan = series_plan(rows)
+        print(tabulate([[f"O{e['o']}", ", ".join(e["names"]), e["qty"]] for e in plan],
+                       headers=["programma", "profielen", "stuks"], tablefmt="github"))
+        print(f"[INFO] {len(plan)} programma's voor {sum(e['qty'] for e in plan)} stuks "
+              f"({len(rows)} profielregels)")
+    return report
+
+def _backplot(args, inst: Instrument, report: dict, rows: list):
+    """5) machinetijd uit de .tap-bestanden zelf (modale backplot, incl. stops en wissels)."""
+    from tabulate import tabulate
+    from cncapp.backplot import analyse_files, result_rows
+    from cncapp.gcode_gen import _profile_path
+
+    with inst.stage("backplot") as st:
+        if report.get("parts"):
+            paths = report["parts"]
+        elif args.one_file or args.schedule or args.subprograms:
+            paths = [report["path"]]
+        else:
+            paths = [_profile_path(args.export_dir, str(r["profile_name"] or "Profiel")) for r in rows]
+        res = analyse_files(paths)
+        st["lines"] = res["job"]["lines"]
+    print(tabulate(result_rows(res), headers="keys", tablefmt="github", showindex=False, floatfmt=".1f"))
+    if args.subprograms:
+        series = res["job"]["total_s"]  # M98 L<qty> zit al in de backplot
     else:
-        print("[OK] G-code bestanden per profiel aangemaakt in:", args.export_dir)
+        qty = {r["profile_name"]: r["qty"] for r in rows}
+        series = sum(b["total_s"] * int(qty.get(b["name"], 1)) for b in res["profiles"])
+    print(f"[INFO] Geschatte machinetijd: {res['job']['total_s'] / 60.0:.1f} min per set, "
+          f"{series / 60.0:.1f} min inclusief aantallen (qty)")
 
 if __name__ == "__main__":
     main()
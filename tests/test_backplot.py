@@ -0,0 +1,37 @@
+import pytest
+import cncapp.backplot as bp
+from cncapp.backplot import analyse_lines, move_seconds
+
+def test_move_seconds_trapezoid():
+    # 100 mm/s, 1000 mm/s²: lang traject = L/v + v/a, kort traject = 2*sqrt(L/a)
+    assert move_seconds(100.0, 6000.0, 1000.0) == pytest.approx(1.0 + 0.1)
+    assert move_seconds(1.0, 6000.0, 1000.0) == pytest.approx(2 * (1.0 / 1000.0) ** 0.5)
+    assert move_seconds(0.0, 6000.0, 1000.0) == 0.0
+
+def test_modal_program_per_profile(monkeypatch):
+    monkeypatch.setattr(bp, "ACCEL_MM_S2", 0.0)
+    monkeypatch.setattr(bp, "MACHINE_HOME", (0.0, 0.0, 50.0))
+    lines = [
+        "(A - 20x20 L=500.0 mm)",
+        "G90",
+        "(BEWERKING: BOVENKANT (hoogte=20 -> Zc=35))",
+        "G0 X100.000 Y10.000",
+        "G0 Z22.000",
+        "G1 Z-1.000 F60",          # 23 mm aan 1 mm/s, waarvan 2 mm boven het materiaal
+        "G0 Z35.000",
+        "M0 (draai)",
+        "(B - 20x20 L=500.0 mm)",
+        "T2 M6",
+        "G99 G81 Z-1.000 R22.000 F60",
+        "X10.000",                 # modaal: tweede gat op de cyclus
+        "G80",
+    ]
+    res = analyse_lines(lines)
+    a, b = res["profiles"]
+    assert (a["name"], b["name"]) == ("A", "B")
+    assert a["cut_mm"] == pytest.approx(23.0)
+    assert a["cut_s"] == pytest.approx(23.0)
+    assert a["air_cut_mm"] == pytest.approx(2.0)
+    assert a["stops"] == 1 and b["tool_changes"] == 1
+    assert b["drill_cycles"] == 2
+    assert res["job"]["total_s"] == pytest.approx(a["total_s"] + b["total_s"])
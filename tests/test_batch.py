@@ -0,0 +1,33 @@
+import pandas as pd
+from cncapp.batch import discover_sources, plan_batch, run_batch
+
+def _cutlist(path, sheets=("Blad1",)):
+    df = pd.DataFrame([
+        {"profiel_naam": "P1", "length_mm": 1000, "qty": 1, "zijde": None, "g1": None},
+        {"profiel_naam": None, "length_mm": None, "qty": None, "zijde": "BOVENKANT Y10", "g1": "100@4.3"},
+    ])
+    with pd.ExcelWriter(path) as w:
+        for s in sheets:
+            df.to_excel(w, sheet_name=s, index=False)
+        pd.DataFrame({"notitie": ["x"]}).to_excel(w, sheet_name="Notities", index=False)
+
+def test_batch_all_sheets_continues_past_errors(tmp_path):
+    src = tmp_path / "in"
+    (src / "sub").mkdir(parents=True)
+    _cutlist(src / "a.xlsx", sheets=("Assy1", "Assy2"))
+    _cutlist(src / "sub" / "a.xlsx")
+    (src / "sub" / "kapot.xlsx").write_bytes(b"geen zip")
+    (src / "~$a.xlsx").write_bytes(b"lock")
+    (src / "lees.txt").write_text("x")
+
+    sources = discover_sources([str(src)])
+    assert [p.replace(str(src), "") for p in sources] == ["/a.xlsx", "/sub/a.xlsx", "/sub/kapot.xlsx"]
+
+    out = tmp_path / "out"
+    jobs, errors = plan_batch(sources, str(out), all_sheets=True)
+    assert len(errors) == 1 and errors[0]["status"] == "fout"
+    results = run_batch(jobs, workers=1, options={"cache": False})
+    status = {(r["out"].replace(str(out), ""), r["status"]) for r in results}
+    assert status == {("/a/Assy1", "ok"), ("/a/Assy2", "ok"), ("/a/Notities", "overgeslagen"),
+                      ("/a_2/Blad1", "ok"), ("/a_2/Notities", "overgeslagen")}
+    assert (out / "a" / "Assy2" / "P1.tap").exists()
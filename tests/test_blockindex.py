@@ -0,0 +1,57 @@
+import os
+import pandas as pd
+import cncapp.blockindex as blockindex
+import cncapp.cache as cache
+import cncapp.excel_import as excel_import
+from cncapp.holes import extract_holes_only
+
+def _cutlist(path, x=100):
+    pd.DataFrame([
+        {"profiel_naam": "P1", "length_mm": 1000, "qty": 1, "zijde": None, "g1": None},
+        {"profiel_naam": None, "length_mm": None, "qty": None, "zijde": "BOVENKANT Y10", "g1": f"{x}@4.3"},
+        {"profiel_naam": "P20", "length_mm": 800, "qty": 2, "zijde": None, "g1": None},
+        {"profiel_naam": None, "length_mm": None, "qty": None, "zijde": "ZIJKANT Y10", "g1": "50@6.5"},
+        {"profiel_naam": "Q3", "length_mm": 600, "qty": 1, "zijde": "BOVENKANT Y10", "g1": "30@4.3"},
+    ]).to_excel(path, index=False)
+
+def test_match_names():
+    names, unmatched = blockindex.match_names(["P1", "P20", "Q3"], ["P2*", "Q3", "X"])
+    assert names == ["P20", "Q3"] and unmatched == ["X"]
+
+def test_index_reused_until_workbook_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path / "cache"))
+    xlsx = str(tmp_path / "cut.xlsx")
+    _cutlist(xlsx)
+    info = {}
+    df = extract_holes_only(xlsx, ["P2*"], info=info)
+    assert df["profile_name"].tolist() == ["P20"] and info["rebuilt"]
+    assert info["spans"] == {"P20": [(4, 5)]}
+    assert extract_holes_only(xlsx, ["P*"], index=False)["holes_flat"].tolist() == \
+        ["TOP_Y10: 100@4.3", "SIDE_Y10: 50@6.5"]
+
+    real = excel_import.iter_profile_blocks
+    def _no_parse(*a, **k):
+        raise AssertionError("sheet opnieuw gelezen")
+    monkeypatch.setattr(excel_import, "iter_profile_blocks", _no_parse)
+    info = {}
+    df = extract_holes_only(xlsx, ["P1", "Q3"], info=info)
+    assert df["profile_name"].tolist() == ["P1", "Q3"] and not info["rebuilt"]
+    # alleen mtime gewijzigd, inhoud gelijk: index blijft geldig
+    os.utime(xlsx, (1, 1))
+    assert extract_holes_only(xlsx, ["Q3"])["profile_name"].tolist() == ["Q3"]
+
+    monkeypatch.setattr(excel_import, "iter_profile_blocks", real)
+    _cutlist(xlsx, x=200)
+    info = {}
+    df = extract_holes_only(xlsx, ["P1"], info=info)
+    assert info["rebuilt"] and df["holes_flat"].tolist() == ["TOP_Y10: 200@4.3"]
+
+def test_cut_plan_from_index_matches_cutlist(tmp_path, monkeypatch):
+    from cncapp.clean import clean_cutlist
+    from cncapp.cutting import plan_cuts, blocks_frame
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path / "cache"))
+    xlsx = str(tmp_path / "cut.xlsx")
+    _cutlist(xlsx)
+    ref = plan_cuts(clean_cutlist(excel_import.read_cutlist(xlsx)["df"])[0])
+    got = plan_cuts(blocks_frame(blockindex.all_blocks(xlsx)))
+    assert got.cuts.to_dict("records") == ref.cuts.to_dict("records")
@@ -0,0 +1,38 @@
+import os
+import pandas as pd
+import cncapp.cache as cache
+import cncapp.holes as holes
+
+def _cutlist(path):
+    pd.DataFrame([
+        {"profiel_naam": "P1", "length_mm": 1000, "qty": 1, "zijde": None, "g1": None},
+        {"profiel_naam": None, "length_mm": None, "qty": None, "zijde": "BOVENKANT Y10", "g1": "100@4.3"},
+    ]).to_excel(path, index=False)
+
+def test_warm_run_skips_xlsx_parsing(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path / "cache"))
+    xlsx = tmp_path / "cut.xlsx"
+    _cutlist(xlsx)
+    cold = holes.extract_holes_stream(str(xlsx), cache=True)
+
+    def _no_parse(*a, **k):
+        raise AssertionError("xlsx opnieuw geparsed")
+    monkeypatch.setattr(holes, "iter_profile_records", _no_parse)
+    warm = holes.extract_holes_stream(str(xlsx), cache=True)
+    assert list(warm.columns) == list(cold.columns)
+    assert warm["holes_json"].tolist() == cold["holes_json"].tolist()
+    assert warm.attrs["sheet_name"] == cold.attrs["sheet_name"]
+
+    # andere inhoud -> andere sleutel
+    pd.DataFrame([{"profiel_naam": "P2", "length_mm": 5}]).to_excel(xlsx, index=False)
+    assert cache.cache_key(str(xlsx), 0, "extract_holes") not in {
+        os.path.splitext(n)[0] for n in os.listdir(tmp_path / "cache")}
+
+def test_evict_removes_least_recent(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path))
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.store(key, b"x" * 400_000, max_mb=10)
+        os.utime(tmp_path / f"{key}.pkl", (1000 + i, 1000 + i))
+    cache.load("a")  # recent gebruikt
+    cache.evict(0.9)
+    assert sorted(os.listdir(tmp_path)) == ["a.pkl", "c.pkl"]
@@ -0,0 +1,26 @@
+import pandas as pd
+import cncapp.config as cfg
+from cncapp.cutting import plan_cuts, cut_tags
+
+def _df(rows):
+    return pd.DataFrame(rows, columns=["profile_name", "profiel_type", "length_mm", "qty"])
+
+def test_exact_beats_ffd(monkeypatch):
+    # FFD: 500+400 / 400+300+200 / 200 -> 3 staven; optimaal 500+300+200 / 400+400+200 -> 2
+    df = _df([("A", "T", 500, 1), ("B", "T", 400, 2), ("C", "T", 300, 1), ("D", "T", 200, 2)])
+    monkeypatch.setitem(cfg.STOCK_LENGTHS, "T", [1000.0])
+    assert len(plan_cuts(df, kerf=0, trim=0, exact=False).bars) == 3
+    plan = plan_cuts(df, kerf=0, trim=0)
+    assert len(plan.bars) == 2
+    assert plan.summary.iloc[0]["methode"] == "exact"
+
+def test_kerf_trim_positions_and_too_long():
+    df = _df([("A", "20x40", 1000, 2), ("L", "20x40", 7000, 1)])
+    plan = plan_cuts(df, kerf=3, trim=10)
+    assert plan.too_long == ["L"]
+    cuts = plan.cuts
+    assert list(cuts["start_mm"]) == [10.0, 1013.0]
+    assert list(cuts["einde_mm"]) == [1010.0, 2013.0]
+    tags = cut_tags(plan)
+    assert tags["A"] == "20x40 staaf 1/1 van 6000 mm pos 1,2"
+    assert "(" not in tags["A"] and "L" not in tags
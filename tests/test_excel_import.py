@@ -15,3 +15,58 @@ def test_normalize_columns_basic():
     assert "qty" in df2.columns
     assert isinstance(used_targets, dict)
     assert isinstance(missing, list)
+
+def test_stream_matches_dataframe_path(tmp_path):
+    from cncapp.excel_import import read_cutlist
+    from cncapp.holes import extract_holes, extract_holes_stream
+
+    rows = [
+        {"profiel_naam": "P1", "profiel_type": "20x40", "length_mm": 1000, "qty": 2, "zijde": None, "g1": None, "g2": None},
+        {"profiel_naam": None, "profiel_type": None, "length_mm": None, "qty": None, "zijde": "BOVENKANT Y10", "g1": "100@4.3", "g2": "900@4.3"},
+        {"profiel_naam": None, "profiel_type": None, "length_mm": None, "qty": None, "zijde": "ZIJKANT Y30", "g1": "500@6.5", "g2": None},
+        {"profiel_naam": "P2", "profiel_type": None, "length_mm": 800, "qty": None, "zijde": None, "g1": None, "g2": None},
+        {"profiel_naam": None, "profiel_type": None, "length_mm": None, "qty": None, "zijde": "BOVENKANT Y10", "g1": "400@4.3", "g2": "x"},
+    ]
+    path = tmp_path / "cut.xlsx"
+    pd.DataFrame(rows).to_excel(path, index=False, sheet_name="Lijst")
+
+    ref = extract_holes(read_cutlist(str(path))["df"])
+    got = extract_holes_stream(str(path))
+    assert got.attrs["sheet_name"] == "Lijst"
+    cols = ["profile_name", "profiel_type", "length_mm", "qty", "holes_json"]
+    assert got[cols].to_dict("records") == ref[cols].to_dict("records")
+
+def test_stream_matches_dataframe_path_without_side_column(tmp_path):
+    from cncapp.excel_import import read_cutlist
+    from cncapp.holes import extract_holes, extract_holes_stream
+
+    rows = [
+        {"profiel_naam": "P1", "length_mm": 1000, "qty": 2, "g1": "100@4.3", "g2": "900@4.3"},
+        {"profiel_naam": None, "length_mm": None, "qty": None, "g1": "500@6.5", "g2": None},
+        {"profiel_naam": "P2", "length_mm": 800, "qty": None, "g1": "400@4.3", "g2": "x"},
+    ]
+    path = tmp_path / "cut.xlsx"
+    pd.DataFrame(rows).to_excel(path, index=False)
+
+    ref = extract_holes(read_cutlist(str(path))["df"])
+    got = extract_holes_stream(str(path))
+    cols = ["profile_name", "length_mm", "qty", "holes_flat"]
+    assert got[cols].to_dict("records") == ref[cols].to_dict("records")
+    assert ref["holes_flat"].tolist() == ["TOP_Y10: 100@4.3,900@4.3,500@6.5", "TOP_Y10: 400@4.3"]
+
+def test_stream_matches_dataframe_path_with_alias_headers(tmp_path):
+    from cncapp.excel_import import read_cutlist
+    from cncapp.holes import extract_holes, extract_holes_stream
+
+    rows = [
+        {"Profiel": "P1", "Type": "20x40", "Lengte": 1000, "Aantal": 2, "zijde": None, "g1": None},
+        {"Profiel": None, "Type": None, "Lengte": None, "Aantal": None, "zijde": "BOVENKANT Y10", "g1": "100@4.3"},
+    ]
+    path = tmp_path / "cut.xlsx"
+    pd.DataFrame(rows).to_excel(path, index=False)
+
+    ref = extract_holes(read_cutlist(str(path))["df"])
+    got = extract_holes_stream(str(path))
+    cols = ["profile_name", "profiel_type", "length_mm", "qty", "holes_json"]
+    assert got[cols].to_dict("records") == ref[cols].to_dict("records")
+    assert got.loc[0, "profile_name"] == "P1" and got.loc[0, "length_mm"] == 1000 and got.loc[0, "qty"] == 2
@@ -0,0 +1,138 @@
+import json
+import pandas as pd
+from cncapp.gcode_gen import generate_gcode_for_profile, estimate_cycle_saving
+
+def _row():
+    holes = {
+        "TOP_Y10": [{"x": 390.0, "d": 4.3}, {"x": 711.0, "d": 4.3}],
+        "SIDE_Y10": [{"x": 390.0, "d": 4.3}],
+    }
+    return {
+        "profile_name": "Profiel 47",
+        "profiel_type": "20x40",
+        "length_mm": 1280.0,
+        "qty": 1,
+        "holes_json": json.dumps(holes),
+    }
+
+def test_rapid_approach_and_low_retract(tmp_path):
+    path = generate_gcode_for_profile(_row(), str(tmp_path))
+    lines = open(path).read().splitlines()
+    # ijlgang tot 2 mm boven het BOVENKANT-oppervlak (40 mm), niet voeden vanaf Zc
+    assert "Z42.000" in lines  # G0 is modaal na 'G0 X.. Y..'
+    # tussen gaten in dezelfde rij naar het lage R-vlak, na de rij naar Zc
+    # G1 is modaal na de soft plunge (cncapp.post laat het herhaalde woord weg)
+    drilled = [i for i, l in enumerate(lines) if l == "Z-1.000 F150"]
+    assert lines[drilled[0] + 1] == "G0 Z43.000"
+    assert lines[drilled[1] + 1] == "G0 Z55.000"
+
+def test_estimate_cycle_saving_positive():
+    out = estimate_cycle_saving(pd.DataFrame([_row()]))
+    assert out.loc[0, "gaten"] == 3
+    assert out.loc[0, "besparing_s"] > 0
+
+def test_canned_cycle_mode_emits_modal_x_lines(tmp_path, monkeypatch):
+    import cncapp.gcode_gen as gg
+    monkeypatch.setattr(gg, "DRILL_CYCLE", "G83")
+    path = generate_gcode_for_profile(_row(), str(tmp_path))
+    lines = open(path).read().splitlines()
+    assert "G99 G83 Z-1.000 R43.000 Q3 F150 X390.000 Y10.000" in lines
+    assert "X711.000" in lines
+    assert lines.count("G80") == 2
+    assert not any(l.startswith("G1 ") for l in lines)
+
+def test_schedule_groups_tools_across_profiles(tmp_path):
+    from cncapp.gcode_gen import generate_all_profiles
+    rows = []
+    for name in ("Profiel 1", "Profiel 2", "Profiel 3"):
+        holes = {"TOP_Y10": [{"x": 100.0, "d": 4.3}, {"x": 500.0, "d": 6.5}]}
+        rows.append({"profile_name": name, "profiel_type": "20x20", "length_mm": 800.0, "qty": 1,
+                     "holes_json": json.dumps(holes)})
+    path = generate_all_profiles(pd.DataFrame(rows), str(tmp_path), schedule=True)
+    lines = open(path).read().splitlines()
+    assert [l for l in lines if l.endswith(" M6")] == ["T1 M6", "T2 M6"]
+    assert "Z-1.000 F120" in lines  # voeding uit TOOL_TABLE voor 6.5 mm
+
+def test_schedule_rotation_clears_single_face_neighbour(tmp_path):
+    # B (40x40, alleen BOVENKANT) blijft ingeklemd tijdens de draai van A en C:
+    # de rotatie-opspanning boort op 20 mm maar moet over B's 40 mm heen
+    from cncapp.gcode_gen import generate_all_profiles
+    both = {"TOP_Y10": [{"x": 100.0, "d": 4.3}], "SIDE_Y10": [{"x": 300.0, "d": 4.3}]}
+    rows = [{"profile_name": n, "profiel_type": t, "length_mm": 800.0, "qty": 1, "holes_json": json.dumps(h)}
+            for n, t, h in (("A", "20x40", both), ("B", "40x40", {"TOP_Y10": [{"x": 100.0, "d": 4.3}]}),
+                            ("C", "20x40", both))]
+    lines = open(generate_all_profiles(pd.DataFrame(rows), str(tmp_path), schedule=True)).read().splitlines()
+    stop = next(i for i, l in enumerate(lines) if "DRAAI PROFIELEN" in l)
+    first_z = next(l for l in lines[stop:] if l.startswith("G0 Z"))
+    assert first_z == "G0 Z55.000"
+
+def test_parallel_one_file_matches_serial(tmp_path):
+    from cncapp.gcode_gen import generate_all_profiles
+    df = pd.DataFrame([dict(_row(), profile_name=f"Profiel {i}") for i in range(6)])
+    serial = generate_all_profiles(df, str(tmp_path / "s"), one_file=True, workers=1)
+    parallel = generate_all_profiles(df, str(tmp_path / "p"), one_file=True, workers=3)
+    assert open(serial).read() == open(parallel).read()
+    # geen achtergebleven tijdelijke bestanden
+    assert sorted(p.name for p in (tmp_path / "p").iterdir()) == ["all_profiles.tap"]
+
+def test_subprograms_reuse_identical_patterns(tmp_path):
+    from cncapp.gcode_gen import generate_all_profiles
+    from cncapp.backplot import analyse_file
+    a = dict(_row(), qty=2)
+    b = dict(_row(), profile_name="Profiel 51", qty=3)   # zelfde type/lengte/gaten
+    c = dict(_row(), profile_name="Profiel 52", length_mm=800.0)
+    path = generate_all_profiles(pd.DataFrame([a, b, c]), str(tmp_path), subprograms=True)
+    lines = open(path).read().splitlines()
+    assert "M98 P1000 L5" in lines and "M98 P1001 L1" in lines
+    assert lines.count("O1000") == 1 and lines.count("M99") == 2
+    # één gereedschap: de wissel staat in het hoofdprogramma, niet in het O-blok
+    sub = lines[lines.index("O1000"):lines.index("M99")]
+    assert not any(l.endswith("M6") for l in sub)
+    # backplot speelt elke aanroep L keer na: 6 stuks -> 6 inklem-stops + 6 draai-stops
+    assert analyse_file(path)["job"]["stops"] == 12
+
+def test_one_file_split_under_line_budget(tmp_path):
+    from cncapp.gcode_gen import generate_all_profiles
+    df = pd.DataFrame([dict(_row(), profile_name=f"Profiel {i}") for i in range(5)])
+    whole = open(generate_all_profiles(df, str(tmp_path / "a"), one_file=True)).read().splitlines()
+    idx = generate_all_profiles(df, str(tmp_path / "b"), one_file=True, max_lines=len(whole) // 2)
+    parts = json.load(open(idx))["parts"]
+    assert len(parts) > 1 and not any(p["over_budget"] for p in parts)
+    assert [n for p in parts for n in p["profiles"]] == [f"Profiel {i}" for i in range(5)]
+    for p in parts:
+        lines = open(tmp_path / "b" / p["file"]).read().splitlines()
+        assert len(lines) == p["lines"] <= len(whole) // 2
+        assert lines[-2] == "M30"
+        # elk deel wisselt zelf het gereedschap in (de besturing weet niets van het vorige deel)
+        assert "T1 M6" in lines and "G43 H1" in lines
+    # groter budget: één deel blijft over, de oude delen worden verwijderd
+    generate_all_profiles(df, str(tmp_path / "b"), one_file=True, max_lines=10**6)
+    assert sorted(p.name for p in (tmp_path / "b").iterdir()) == ["all_profiles_001.tap", "all_profiles_index.json"]
+
+def test_schedule_split_starts_part_with_rotation_stop(tmp_path):
+    from cncapp.gcode_gen import generate_all_profiles
+    from cncapp.backplot import analyse_file
+    df = pd.DataFrame([_row()])   # BOVENKANT + ZIJKANT: twee opspanningen met een M0 ertussen
+    idx = generate_all_profiles(df, str(tmp_path), schedule=True, max_lines=1)
+    parts = json.load(open(idx))["parts"]
+    assert len(parts) == 2 and all(p["over_budget"] for p in parts)
+    second = open(tmp_path / parts[1]["file"]).read().splitlines()
+    assert second[1] == "G90 G94 G91.1 G40 G49 G17"
+    assert any("DRAAI PROFIELEN MANUEEL" in l for l in second) and second[-1] == "M30"
+    assert [analyse_file(str(tmp_path / p["file"]))["job"]["stops"] for p in parts] == [0, 1]
+
+def test_row_revisited_by_path_keeps_numbering(tmp_path, monkeypatch):
+    import cncapp.gcode_gen as gg
+    from cncapp.pathopt import PathHole
+    # pad dat een rij twee keer bezoekt (kan bij "tsp"): A, B, A
+    def _interleaved(rows, strategy=None):
+        (la, ya, ha), (lb, yb, hb) = [(l, y, list(s)) for l, y, s in rows[:2]]
+        order = [PathHole(la, ya, *ha[0]), PathHole(lb, yb, *hb[0]), PathHole(la, ya, *ha[1])]
+        return order, {"strategy": "tsp", "rapid_mm_before": 0.0, "rapid_mm_after": 0.0}
+    monkeypatch.setattr(gg, "order_side", _interleaved)
+    row = _row()
+    row["holes_json"] = json.dumps({"SIDE_Y10": [{"x": 100.0, "d": 4.3}, {"x": 900.0, "d": 4.3}],
+                                    "SIDE_Y30": [{"x": 500.0, "d": 4.3}]})
+    text = open(generate_gcode_for_profile(row, str(tmp_path))).read()
+    assert text.count("ZIJKANT RIJ: SIDE_Y10") == 1
+    assert text.count("HOLE 1 ") == 2 and text.count("HOLE 2 ") == 1
@@ -0,0 +1,37 @@
+import pickle
+import pandas as pd
+from cncapp.holes import extract_holes
+from cncapp.model import Profile
+
+def _raw():
+    return pd.DataFrame([
+        {"profiel_naam": "Profiel 47", "profiel_type": "20x40", "length_mm": 1280, "qty": 2, "zijde": None, "g1": None, "g2": None},
+        {"profiel_naam": None, "profiel_type": None, "length_mm": None, "qty": None, "zijde": "BOVENKANT Y10", "g1": "390.0@4.3", "g2": "711@4.3"},
+        {"profiel_naam": None, "profiel_type": None, "length_mm": None, "qty": None, "zijde": "ZIJKANT Y30", "g1": "100@6.5", "g2": None},
+        {"profiel_naam": "Profiel 48", "profiel_type": "20x20", "length_mm": 500, "qty": 1, "zijde": None, "g1": None, "g2": None},
+    ])
+
+def test_extract_holes_builds_profile_model():
+    dfh = extract_holes(_raw())
+    assert list(dfh["profile_name"]) == ["Profiel 47"]
+    prof = dfh.loc[0, "profile"]
+    assert isinstance(prof, Profile)
+    assert list(prof.sides) == ["TOP_Y10", "SIDE_Y30"]
+    assert list(prof.sides["TOP_Y10"]) == [(390.0, 4.3), (711.0, 4.3)]
+    assert dfh.loc[0, "holes_json"] == prof.holes_json()
+    assert dfh.loc[0, "holes_flat"] == "TOP_Y10: 390@4.3,711@4.3 | SIDE_Y30: 100@6.5"
+
+def test_profile_roundtrip_and_pickle():
+    prof = extract_holes(_raw(), serialize=False).loc[0, "profile"]
+    assert Profile.from_dict(prof.to_dict()) == prof
+    assert pickle.loads(pickle.dumps(prof)) == prof
+
+def test_identical_profile_headers_stay_separate_blocks():
+    raw = pd.concat([_raw().iloc[:2], _raw().iloc[:2]], ignore_index=True)
+    dfh = extract_holes(raw)
+    assert len(dfh) == 2
+    assert [p.hole_count for p in dfh["profile"]] == [2, 2]
+    # eigen naam per blok (eigen .tap), de dubbele naam staat in attrs
+    name = raw.iloc[0]["profiel_naam"]
+    assert dfh["profile_name"].tolist() == [name, f"{name}_2"]
+    assert dfh.attrs["duplicates"] == {name: 2}
@@ -0,0 +1,53 @@
+import json
+import os
+import pandas as pd
+from cncapp.incremental import generate_incremental
+
+def _df(names, x=390.0):
+    holes = json.dumps({"TOP_Y10": [{"x": x, "d": 4.3}]})
+    return pd.DataFrame([{"profile_name": n, "profiel_type": "20x40", "length_mm": 1000.0, "qty": 1,
+                          "holes_json": holes} for n in names])
+
+def test_incremental_skips_unchanged_and_removes_stale(tmp_path):
+    out = str(tmp_path)
+    rep = generate_incremental(_df(["Profiel 1", "Profiel 2"]), out)
+    assert rep["added"] == ["Profiel 1", "Profiel 2"]
+    mtime = os.path.getmtime(os.path.join(out, "Profiel_1.tap"))
+
+    rep = generate_incremental(_df(["Profiel 1"]), out)
+    assert rep["unchanged"] == ["Profiel 1"] and rep["removed"] == ["Profiel 2"]
+    assert os.path.getmtime(os.path.join(out, "Profiel_1.tap")) == mtime
+    assert not os.path.exists(os.path.join(out, "Profiel_2.tap"))
+
+    rep = generate_incremental(_df(["Profiel 1"], x=400.0), out)
+    assert rep["changed"] == ["Profiel 1"]
+
+def test_partial_keeps_other_profiles(tmp_path):
+    out = str(tmp_path)
+    generate_incremental(_df(["Profiel 1", "Profiel 2"]), out)
+    rep = generate_incremental(_df(["Profiel 1"], x=400.0), out, force=True, partial=True)
+    assert rep["changed"] == ["Profiel 1"] and rep["removed"] == []
+    assert os.path.exists(os.path.join(out, "Profiel_2.tap"))
+    rep = generate_incremental(_df(["Profiel 1", "Profiel 2"], x=400.0), out)
+    assert rep["unchanged"] == ["Profiel 1"] and rep["changed"] == ["Profiel 2"]
+
+def test_force_rewrites_and_still_removes_stale(tmp_path):
+    out = str(tmp_path)
+    generate_incremental(_df(["Profiel 1", "Profiel 2"]), out)
+    rep = generate_incremental(_df(["Profiel 1"]), out, force=True)
+    assert rep["changed"] == ["Profiel 1"] and rep["removed"] == ["Profiel 2"]
+    assert not os.path.exists(os.path.join(out, "Profiel_2.tap"))
+    rep = generate_incremental(_df(["Profiel 1"]), out)
+    assert rep["unchanged"] == ["Profiel 1"]
+
+def test_schedule_rebuilds_on_orientatie_change(tmp_path):
+    out = str(tmp_path)
+    holes = json.dumps({"TOP_Y10": [{"x": 390.0, "d": 4.3}], "SIDE_Y10": [{"x": 500.0, "d": 4.3}]})
+    df = pd.DataFrame([{"profile_name": "Profiel 1", "profiel_type": "20x40", "orientatie": None,
+                        "length_mm": 1000.0, "qty": 1, "holes_json": holes}])
+    generate_incremental(df, out, schedule=True)
+    before = open(os.path.join(out, "all_profiles.tap")).read()
+    df["orientatie"] = "staand"
+    rep = generate_incremental(df, out, schedule=True)
+    assert rep["changed"] == ["all_profiles.tap"]
+    assert open(os.path.join(out, "all_profiles.tap")).read() != before
@@ -0,0 +1,22 @@
+import json
+from cncapp.instrument import Instrument
+
+def test_stages_recorded_with_counts_and_dumps(tmp_path):
+    inst = Instrument(enabled=True, trace_alloc=True, dump_dir=str(tmp_path / "prof"))
+    with inst.stage("a") as st:
+        st["rows"] = len([0] * 1000)
+    with inst.stage("b"):
+        pass
+    inst.close()
+    assert [s["stage"] for s in inst.stages] == ["a", "b"]
+    assert inst.stages[0]["rows"] == 1000 and inst.stages[0]["wall_s"] >= 0
+    assert (tmp_path / "prof" / "01_a.prof").exists()
+    inst.write_json(str(tmp_path / "r.json"))
+    assert json.loads((tmp_path / "r.json").read_text())["stages"][1]["stage"] == "b"
+    assert "totaal" in inst.summary()
+
+def test_disabled_records_nothing():
+    inst = Instrument()
+    with inst.stage("a") as st:
+        st["rows"] = 1
+    assert inst.stages == []
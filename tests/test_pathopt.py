@@ -0,0 +1,16 @@
+from cncapp.pathopt import order_side
+
+ROWS = [
+    ("TOP_Y10", 10.0, [(100.0, 4.3), (1700.0, 4.3)]),
+    ("TOP_Y30", 30.0, [(50.0, 4.3), (1650.0, 4.3)]),
+]
+
+def test_serpentine_reverses_second_row():
+    order, stats = order_side(ROWS, "serpentine")
+    assert [h.x for h in order] == [100.0, 1700.0, 1650.0, 50.0]
+    assert stats["rapid_mm_after"] < stats["rapid_mm_before"]
+
+def test_tsp_visits_every_hole_once():
+    order, stats = order_side(ROWS, "tsp")
+    assert sorted((h.label, h.x) for h in order) == sorted((lbl, x) for lbl, _, hs in ROWS for x, _ in hs)
+    assert stats["rapid_s_after"] <= stats["rapid_s_before"]
@@ -0,0 +1,49 @@
+from cncapp.post import PostSink
+from cncapp.writer import MemorySink
+
+def _run(lines, dialect="mach3"):
+    out = MemorySink()
+    g = PostSink(out, dialect)
+    g.extend(lines)
+    return out.lines
+
+def test_suppresses_repeated_modal_words():
+    lines = _run([
+        "G90", "S6000 M3", "G0 Z55.000", "G0 X390.000 Y10.000", "G0 Z42.000",
+        "G1 Z37.000 F50", "G1 Z-1.000 F150", "G0 Z43.000",
+        "G0 X711.000", "G0 Z42.000", "G1 Z37.000 F50", "G1 Z-1.000 F150",
+        "G0 Z43.000", "G0 Z43.000 (al daar)", "M5", "S6000 M3",
+        "G28 G91 Z0.", "G90", "G0 Z43.000",
+    ])
+    assert lines == [
+        "G90", "S6000 M3", "G0 Z55.000", "X390.000 Y10.000", "Z42.000",
+        "G1 Z37.000 F50", "Z-1.000 F150", "G0 Z43.000",
+        "X711.000", "Z42.000", "G1 Z37.000 F50", "Z-1.000 F150",
+        "G0 Z43.000", "(al daar)", "M5", "M3",
+        "G28 G91 Z0.", "G90", "Z43.000",   # na G28 is Z onbekend; G0 blijft modaal
+    ]
+
+def test_canned_cycle_lines_are_never_dropped():
+    lines = _run(["G0 X10.000 Y10.000", "G99 G81 Z-1.000 R22.000 F60 X10.000 Y10.000", "X10.000", "G80"])
+    assert lines[1:] == ["G99 G81 Z-1.000 R22.000 F60 X10.000 Y10.000", "X10.000", "G80"]
+
+def test_linuxcnc_subroutines_and_comments():
+    lines = _run(["(A (b))", "O1000", "G0 Z5.000", "M99", "M98 P1000 L2", "M30"], "linuxcnc")
+    assert lines == ["(A [b])", "o1000 sub", "G0 Z5.000", "o1000 endsub",
+                     "o<herhaal1000> repeat [2]", "o1000 call", "o<herhaal1000> endrepeat", "M30"]
+
+def test_grbl_inlines_subs_and_expands_cycles():
+    lines = _run(["G90 G94 G91.1 G17", "O1000", "G0 X5.000", "M99",
+                  "M98 P1000 L2", "T2 M6", "G43 H2",
+                  "G0 Z30.000", "G99 G82 Z-1.000 R23.000 P0.5 F120 X100.000 Y10.000", "G80"], "grbl")
+    assert lines[0] == "G90 G94 G17"
+    assert lines[1:3] == ["G0 X5.000", "(WISSEL HANDMATIG NAAR T2)"]   # tweede aanroep: X staat al op 5
+    assert lines[3:5] == ["(NUL Z OPNIEUW MET T2: GEEN LENGTE IN TOOL_TABLE)", "M0"]
+    assert not any(l.startswith(("G43", "M98", "O1000", "G82")) for l in lines)
+    assert lines[-6:] == ["X100.000 Y10.000", "Z23.000", "G1 Z-1.000 F120", "G4 P0.5", "G0 Z23.000", "G80"]
+
+def test_grbl_tool_length_from_tool_table(monkeypatch):
+    import cncapp.config as cfg
+    monkeypatch.setitem(cfg.TOOL_TABLE, 6.5, dict(cfg.TOOL_TABLE[6.5], length=12.5))
+    lines = _run(["T2 M6", "G43 H2", "S5000 M3"], "grbl")
+    assert lines == ["(WISSEL HANDMATIG NAAR T2)", "M0", "G43.1 Z12.500", "S5000 M3"]
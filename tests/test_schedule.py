@@ -0,0 +1,19 @@
+from cncapp.schedule import face_order, plan_job, needs_rotation
+
+def _prof(name, groups, orient=None):
+    return {"name": name, "groups": groups, "orient": orient}
+
+TOP = {"TOP_Y10": [{"x": 1.0, "d": 4.3}]}
+SIDE = {"SIDE_Y10": [{"x": 1.0, "d": 4.3}]}
+
+def test_face_order_uses_orientatie_and_skips_single_face_rotation():
+    assert face_order({"TOP": TOP, "SIDE": SIDE}) == ("TOP", "SIDE")
+    assert face_order({"TOP": TOP, "SIDE": SIDE}, "staand") == ("SIDE", "TOP")
+    assert face_order({"SIDE": SIDE}) == ("SIDE",)
+
+def test_plan_job_groups_by_fixture_slots():
+    profs = [_prof(f"P{i}", {"TOP": TOP}) for i in range(3)] + [_prof("P3", {"TOP": TOP, "SIDE": SIDE})]
+    plan = plan_job(profs, y_offsets=[0.0, 60.0])
+    assert [[s.profile["name"] for s in grp] for grp in plan] == [["P0", "P1"], ["P2", "P3"]]
+    assert [s.y_offset for s in plan[1]] == [0.0, 60.0]
+    assert not needs_rotation(plan[0]) and needs_rotation(plan[1])
@@ -0,0 +1,34 @@
+import json, os, subprocess, sys
+from cncapp.model import Profile, Side, save_model, load_model
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+# main() draaien en rapporteren welke zware modules geladen zijn
+_PROBE = """
+import runpy, sys, json
+sys.argv = ["main.py"] + json.loads(sys.argv[1])
+try:
+    runpy.run_path(sys.argv[0], run_name="__main__")
+except SystemExit:
+    pass
+print(json.dumps([m for m in ("pandas", "numpy", "openpyxl", "tabulate") if m in sys.modules]))
+"""
+
+def _loaded(argv):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    out = subprocess.run([sys.executable, "-c", _PROBE, json.dumps(argv)], cwd=SRC, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def _profile(name="Profiel 1"):
+    return Profile(name, "20x40", None, 1280.0, 2, {"TOP_Y10": Side("TOP_Y10", [(390.0, 4.3), (711.0, 4.3)])})
+
+def test_model_roundtrip(tmp_path):
+    path = save_model([_profile()], str(tmp_path / "m.json"), source="cutlist.xlsx", validation={"fout": 0})
+    profiles, meta = load_model(path)
+    assert profiles == [_profile()] and meta["source"] == "cutlist.xlsx"
+
+def test_help_and_model_fast_path_skip_heavy_imports(tmp_path):
+    assert _loaded(["--help"]) == []
+    model = save_model([_profile(), _profile("Profiel 2")], str(tmp_path / "m.json"))
+    assert _loaded(["--model", model, "--export-dir", str(tmp_path / "out")]) == []
+    assert sorted(os.listdir(tmp_path / "out")) == [".cnc_manifest.json", "Profiel_1.tap", "Profiel_2.tap"]
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+from cncapp.model import Profile, Side
+from cncapp.structure import export_long, expand_holes_columns, flatten_to_long
+
+def _dfh():
+    p1 = Profile("P1", "20x40", None, 1000.0, 2, {"TOP_Y10": Side("TOP_Y10", [(100, 4.3), (200, 4.3)]),
+                                                   "SIDE_Y20": Side("SIDE_Y20", [(150, 6.5)])})
+    p2 = Profile("P2", "20x20", None, 500.0, 1, {"TOP_Y10": Side("TOP_Y10", [(50, 4.3)])})
+    return pd.DataFrame({"profile_name": ["P1", "P2"], "profiel_type": ["20x40", "20x20"], "orientatie": [None, None],
+                         "length_mm": [1000.0, 500.0], "qty": [2, 1], "profile": [p1, p2]})
+
+def test_flatten_to_long_is_columnar():
+    dfl = flatten_to_long(_dfh())
+    assert list(dfl["profile_name"]) == ["P1", "P1", "P1", "P2"]
+    assert list(dfl["side"]) == ["TOP_Y10", "TOP_Y10", "SIDE_Y20", "TOP_Y10"]
+    assert dfl["profile_name"].dtype == "category" and dfl["side"].dtype == "category"
+    assert dfl["x_mm"].dtype == np.float32 and dfl["d_mm"].dtype == np.float32
+    assert list(dfl["qty"]) == [2, 2, 2, 1]
+
+def test_expand_holes_columns_per_side():
+    out = expand_holes_columns(_dfh())
+    assert list(out["holes_top_y10"]) == ["100.0@4.3,200.0@4.3", "50.0@4.3"]
+    assert list(out["holes_side_y20"]) == ["150.0@6.5", ""]
+
+def test_export_long_csv_and_parquet(tmp_path):
+    dfl = flatten_to_long(_dfh())
+    back = pd.read_csv(export_long(dfl, str(tmp_path / "gaten.csv")))
+    assert len(back) == 4 and back["x_mm"].tolist() == [100, 200, 150, 50]
+    with pytest.raises(ValueError):
+        export_long(dfl, str(tmp_path / "gaten.xlsx"))
+    pytest.importorskip("pyarrow")
+    assert pd.read_parquet(export_long(dfl, str(tmp_path / "gaten.parquet")))["side"].tolist() == list(dfl["side"])
@@ -0,0 +1,32 @@
+import pandas as pd
+from cncapp.validate import validate_holes, summarize
+
+def _row(side, x, d=4.3, length=100, ptype="20x40", name="A"):
+    return {"profile_name": name, "profiel_type": ptype, "orientatie": None, "length_mm": length,
+            "qty": 1, "side": side, "x_mm": x, "d_mm": d}
+
+def test_validate_flags_geometry_errors():
+    dfl = pd.DataFrame([
+        _row("TOP_Y10", 50), _row("TOP_Y10", 50),   # dubbel
+        _row("TOP_Y10", 53),                         # overlapt 50
+        _row("TOP_Y10", 58),                         # 0.7 mm wand -> waarschuwing
+        _row("TOP_Y30", 80),                         # TOP-vlak van 20x40 is 20 breed
+        _row("SIDE_Y30", 120),                       # voorbij length_mm
+        _row("SIDE_Y30", 90, name="B"),              # in orde
+    ])
+    issues = validate_holes(dfl)
+    assert sorted(issues.loc[issues["niveau"] == "fout", "code"]) == ["dubbel", "overlap", "x_buiten", "y_buiten"]
+    assert list(issues.loc[issues["niveau"] == "waarschuwing", "code"]) == ["dunne_wand"]
+    assert "B" not in set(issues["profile_name"])
+    assert summarize(issues) == {"fout": 4, "waarschuwing": 1}
+
+def test_validate_clean_job_is_empty():
+    dfl = pd.DataFrame([_row("TOP_Y10", 30), _row("TOP_Y10", 60), _row("SIDE_Y20", 30)])
+    assert validate_holes(dfl).empty
+
+def test_validate_groups_neighbours_by_block():
+    # twee blokken met dezelfde naam: x=50 en x=51 liggen in verschillende profielen
+    dfl = pd.DataFrame([_row("TOP_Y10", 50), _row("TOP_Y10", 51)])
+    assert list(validate_holes(dfl)["code"]) == ["overlap"]
+    dfl["blok"] = [0, 1]
+    assert validate_holes(dfl).empty
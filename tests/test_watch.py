@@ -0,0 +1,28 @@
+import threading, time
+import pytest
+from cncapp.watch import watch_file
+
+def test_watch_debounces_burst_of_saves(tmp_path):
+    p = tmp_path / "cutlist.xlsx"
+    p.write_bytes(b"v0")
+    calls = []
+
+    def writer():
+        time.sleep(0.05)
+        for i in range(1, 4):  # drie snelle schrijfacties = één opslag
+            p.write_bytes(b"v" * (i + 1))
+            time.sleep(0.01)
+
+    t = threading.Thread(target=writer)
+    t.start()
+    stop = threading.Event()
+    threading.Timer(3.0, stop.set).start()
+    n = watch_file(str(p), calls.append, interval=0.02, debounce=0.1, stop=stop, max_events=1)
+    t.join()
+    stop.set()
+    assert n == 1 and calls == [str(p)]
+    assert p.read_bytes() == b"vvvv"
+
+def test_watch_refuses_lock_file(tmp_path):
+    with pytest.raises(ValueError):
+        watch_file(str(tmp_path / "~$cutlist.xlsx"), lambda p: None)
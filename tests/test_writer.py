@@ -0,0 +1,36 @@
+import io
+import pytest
+from cncapp.writer import FileSink, MemorySink, StreamSink
+
+def test_file_sink_is_atomic(tmp_path):
+    path = tmp_path / "a.tap"
+    with pytest.raises(RuntimeError):
+        with FileSink(str(path)) as g:
+            g.append("G0 X1")
+            raise RuntimeError("stop")
+    assert list(tmp_path.iterdir()) == []
+
+    with FileSink(str(path)) as g:
+        g.extend(["G0 X1", "M30"])
+    assert path.read_text() == "G0 X1\nM30\n"
+
+def test_memory_and_stream_sink_agree():
+    mem, buf = MemorySink(), io.StringIO()
+    stream = StreamSink(buf)
+    for sink in (mem, stream):
+        sink.extend(["G21", "M30"])
+    assert mem.text() == buf.getvalue() == "G21\nM30\n"
+    assert stream.lines_written == 2
+
+def test_file_sink_uses_umask_mode(tmp_path, monkeypatch):
+    import os
+    import cncapp.writer as writer
+    monkeypatch.setattr(writer, "_umask", None)
+    path = tmp_path / "out.tap"
+    old = os.umask(0o022)
+    try:
+        with FileSink(str(path)) as f:
+            f.append("M30")
+    finally:
+        os.umask(old)
+    assert path.stat().st_mode & 0o777 == 0o644